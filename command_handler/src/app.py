@@ -1,34 +1,46 @@
-from os import environ, getenv
+from os import getenv
 from typing import Any
-from nacl.signing import VerifyKey
 from logging import getLogger, INFO
 
 
+from commands import registry
 from utils.decorator import discord_command
-from typedefs.enums import (
-    InteractionCallbackType,
-    InteractionType,
-)
+from typedefs.enums import InteractionCallbackType, InteractionType
 from typedefs.models import (
+    AutocompleteCallbackData,
     DiscordInteractionResponse,
-    InteractionCommandData,
-    InteractionResponseBody,
-    InteractionCallbackData,
     InteractionRequestBody,
+    InteractionResponseBody,
+)
+from typedefs.exceptions import BadRequest, InvalidOption
+from utils.messages import invalid_option
+from utils.registry import CommandContext
+from utils.responses import (
+    BAD_REQUEST_RESPONSE,
+    DUPLICATE_RESPONSE,
+    PONG_RESPONSE,
+    TECHNICAL_ERROR_RESPONSE,
+    PreparedResponse,
 )
-from typedefs.exceptions import BadRequest
-from utils.ec2 import Ec2Instance
+from utils.metrics import set_dimensions, set_properties, stage
+from utils.runtime import get_runtime
 from utils.verify import get_verified
 
-
 getLogger().setLevel(getenv("LOG_LEVEL", INFO))
 logger = getLogger(__name__)
 
+# Done during init, so that SnapStart snapshots and provisioned concurrency keep
+# the primed state instead of the first request paying for it.
+if getenv("PRIME_ON_INIT") == "true":
+    from utils.priming import prime
+
+    prime(get_runtime())
+
 
 @discord_command
 def lambda_handler(
     event: dict[str, Any], context: dict[str, Any]
-) -> DiscordInteractionResponse:
+) -> DiscordInteractionResponse | PreparedResponse:
     """Sample pure Lambda function
 
     Parameters
@@ -43,88 +55,67 @@ def lambda_handler(
     """
 
     try:
-        server_instance_id = environ["SERVER_INSTANCE_ID"]
-        server_region_name = environ["SERVER_REGION_NAME"]
-        verify_key = VerifyKey(bytes.fromhex(environ["APP_PUBLIC_KEY"]))
-
-        logger.info(event)
-        body: InteractionRequestBody = get_verified(
-            event, verify_key, InteractionRequestBody
-        )
+        runtime = get_runtime()
+
+        with stage("verify"):
+            body: InteractionRequestBody = get_verified(
+                event,
+                runtime.verify_key,
+                InteractionRequestBody,
+                max_age=runtime.signature_max_age,
+            )
         interaction_type = body.type
+        set_properties(interaction_id=body.id, interaction_type=int(interaction_type))
 
         if interaction_type == InteractionType.PING:
             # Pong
+            return PONG_RESPONSE
+
+        elif interaction_type == InteractionType.APPLICATION_COMMAND:
+            if not runtime.deduplicator.first_delivery(body.id):
+                # Retried delivery. Do not touch EC2 again.
+                logger.warning("Duplicate interaction: body.id=%r", body.id)
+                return DUPLICATE_RESPONSE
+
+            logger.debug(body.data)
+            handler, options = registry.resolve(body.data)
+            command = registry.commands[body.data.name]  # type: ignore[union-attr]
+            # Only resolved values become dimensions, to bound their cardinality.
+            set_dimensions(command=command.name, action=options[command.route.name])
+            with stage("dispatch"):
+                return handler(CommandContext(runtime, body, options))
+
+        elif interaction_type == InteractionType.APPLICATION_COMMAND_AUTOCOMPLETE:
+            # Fires on every keystroke: answered from memory, no dedup, no AWS.
+            command, completer, options, value = registry.complete(body.data)
+            set_dimensions(command=command.name, action="autocomplete")
+            with stage("dispatch"):
+                choices = completer(CommandContext(runtime, body, options), value)
             return DiscordInteractionResponse(
                 body=InteractionResponseBody(
-                    type=InteractionCallbackType.PONG,
+                    type=InteractionCallbackType.APPLICATION_COMMAND_AUTOCOMPLETE_RESULT,
+                    data=AutocompleteCallbackData(choices=choices),
                 )
             )
 
-        elif interaction_type == InteractionType.APPLICATION_COMMAND:
-            command_data: InteractionCommandData | None = body.data
-
-            # validate command
-            if (
-                command_data
-                and "be" == command_data.name
-                and command_data.options
-                and 1 == len(command_data.options)
-            ):
-                logger.debug(command_data)
-                option = command_data.options[0]
-
-                server_instance = Ec2Instance(
-                    instance_id=server_instance_id, region_name=server_region_name
-                )
-
-                if "start" == option.value:
-                    logger.info("(BE) Starting server instance")
-                    result = server_instance.start()
-                    return DiscordInteractionResponse(
-                        body=InteractionResponseBody(
-                            type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
-                            data=InteractionCallbackData(
-                                content=f'State changed: {result["previous_state_name"]} -> {result["current_state_name"]}'
-                            ),
-                        )
-                    )
-                elif "stop" == option.value:
-                    logger.info("(BE) Stopping server instance")
-                    result = server_instance.stop()
-                    return DiscordInteractionResponse(
-                        body=InteractionResponseBody(
-                            type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
-                            data=InteractionCallbackData(
-                                content=f'State changed: {result["previous_state_name"]} -> {result["current_state_name"]}'
-                            ),
-                        )
-                    )
-
         raise BadRequest(f"Command is invalid: {body.data=}")
 
-    except BadRequest as e:
-        # Log as warning. Do not give reason to the client.
-        logger.warning(e, exc_info=True)
+    except InvalidOption as e:
+        # A genuine request with a mistyped value: tell the user what is valid.
+        logger.info(e)
         return DiscordInteractionResponse(
-            statusCode=401,
             body=InteractionResponseBody(
                 type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
-                data=InteractionCallbackData(
-                    content="Bad Request. For security reasons, the reason is not given.",
-                ),
-            ),
+                data=invalid_option(e),
+            )
         )
 
+    except BadRequest as e:
+        # Log as warning. Do not give reason to the client.
+        logger.warning(e, exc_info=True)
+        return BAD_REQUEST_RESPONSE
+
     except Exception as e:
         # Log as error. Do not give reason to the client.
         logger.error(e, exc_info=True)
-        return DiscordInteractionResponse(
-            statusCode=200,
-            body=InteractionResponseBody(
-                type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
-                data=InteractionCallbackData(
-                    content="Technical error. Please contact author.",
-                ),
-            ),
-        )
+        return TECHNICAL_ERROR_RESPONSE
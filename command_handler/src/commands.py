@@ -0,0 +1,133 @@
+from typing import TYPE_CHECKING, Literal
+from logging import getLogger
+
+from typedefs.enums import InteractionCallbackType
+from typedefs.exceptions import BadRequest
+from typedefs.models import (
+    CommandChoice,
+    DiscordInteractionResponse,
+    InteractionResponseBody,
+)
+from utils.deferred import dispatch_followup
+from utils.messages import UNKNOWN_STATUS, servers_status, states_changed
+from utils.metrics import add_stage, set_properties, stage
+from utils.registry import CommandContext, CommandRegistry, OptionSpec
+
+if TYPE_CHECKING:
+    from utils.status import Freshness
+
+logger = getLogger(__name__)
+
+registry = CommandRegistry()
+
+# Choices are registered in the order they are shown to users.
+be = registry.command(
+    name="be",
+    description="BEサーバの起動や確認",
+    route=OptionSpec(
+        name="action",
+        description="開始(start)・停止(stop)・状態確認(status)",
+        autocomplete=True,
+    ),
+    options=[
+        OptionSpec(
+            name="server",
+            description="対象サーバ名 (all: 全サーバ)",
+            required=False,
+            autocomplete=True,
+        ),
+    ],
+)
+
+
+@be.completer("server")
+def complete_server(ctx: CommandContext, value: str) -> list[CommandChoice]:
+    # Answered from memory: autocomplete fires on every keystroke.
+    return ctx.runtime.server_index.search(value)
+
+
+def _defer(
+    ctx: CommandContext,
+    action: Literal["start", "stop"],
+    servers: list[str],
+    worker_function: str,
+) -> DiscordInteractionResponse:
+    """Answer within 3 seconds and let the worker edit the response."""
+    if not ctx.body.token:
+        raise BadRequest("Interaction token is missing")
+    logger.info("(BE) Deferring %s to worker", action)
+    dispatch_followup(
+        worker_function,
+        {
+            "action": action,
+            "application_id": ctx.body.application_id,
+            "token": ctx.body.token,
+            "servers": servers,
+        },
+    )
+    return DiscordInteractionResponse(
+        body=InteractionResponseBody(
+            type=InteractionCallbackType.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE,
+        )
+    )
+
+
+@be.choice("start")
+def be_start(ctx: CommandContext) -> DiscordInteractionResponse:
+    servers = ctx.runtime.resolve_servers(ctx.options.get("server"), False)
+    if ctx.runtime.deferred_worker_function:
+        return _defer(ctx, "start", servers, ctx.runtime.deferred_worker_function)
+    logger.info("(BE) Starting server instances: %s", servers)
+    with stage("ec2"):
+        results = ctx.runtime.fleet.start(servers)
+    return DiscordInteractionResponse(
+        body=InteractionResponseBody(
+            type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+            data=states_changed(results),
+        )
+    )
+
+
+@be.choice("stop")
+def be_stop(ctx: CommandContext) -> DiscordInteractionResponse:
+    servers = ctx.runtime.resolve_servers(ctx.options.get("server"), False)
+    if ctx.runtime.deferred_worker_function:
+        return _defer(ctx, "stop", servers, ctx.runtime.deferred_worker_function)
+    logger.info("(BE) Stopping server instances: %s", servers)
+    with stage("ec2"):
+        results = ctx.runtime.fleet.stop(servers)
+    return DiscordInteractionResponse(
+        body=InteractionResponseBody(
+            type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+            data=states_changed(results),
+        )
+    )
+
+
+@be.choice("status")
+def be_status(ctx: CommandContext) -> DiscordInteractionResponse:
+    servers = ctx.runtime.resolve_servers(ctx.options.get("server"), True)
+    logger.info("(BE) Getting server instance status: %s", servers)
+    with stage("status"):
+        results = ctx.runtime.gather_status(servers)
+    degraded: dict[str, "Freshness"] = {}
+    for source, result in results.items():
+        add_stage(source, result["elapsed"])
+        if result["freshness"] != "fresh":
+            degraded[source] = result["freshness"]
+    if degraded:
+        set_properties(degraded=",".join(degraded))
+    statuses = {n: results["ec2"]["values"].get(n, UNKNOWN_STATUS) for n in servers}
+    # Stale answers of servers that are no longer running are not shown.
+    live = {
+        n: v
+        for n, v in results["bedrock"]["values"].items()
+        if statuses[n]["state_name"] == "running"
+    }
+    cpu = results["cpu"]["values"] if "cpu" in results else None
+    return DiscordInteractionResponse(
+        body=InteractionResponseBody(
+            type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+            data=servers_status(statuses, live, cpu, degraded),
+        )
+    )
@@ -0,0 +1,51 @@
+from os import getenv
+from typing import Any, Optional
+from logging import getLogger, INFO
+
+from utils.projection import InstanceRecord, parse_state_change
+from utils.runtime import get_runtime
+
+getLogger().setLevel(getenv("LOG_LEVEL", INFO))
+logger = getLogger(__name__)
+
+
+def lambda_handler(event: dict[str, Any], context: Any) -> Optional[InstanceRecord]:
+    """EC2 state-change projector
+
+    Records the new state of a configured server, with the time it entered it,
+    in the state projection that status lookups read from.
+
+    Parameters
+    ----------
+    event: EventBridge "EC2 Instance State-change Notification" event
+    context: Lambda Context runtime methods and attributes
+
+    Returns
+    ------
+    The recorded entry, for the logs, or None for other instances
+
+    """
+
+    runtime = get_runtime()
+    change = parse_state_change(event)
+    instance = next(
+        (
+            i
+            for i in runtime.fleet.instances.values()
+            if i.instance_id == change["instance_id"]
+        ),
+        None,
+    )
+    if instance is None:
+        logger.info("Not a configured server: %s", change)
+        return None
+
+    # The IP address and the like are not in the notification.
+    try:
+        status = instance.refresh()
+    except Exception as e:
+        logger.warning("Describe failed, keeping the last known details: %s", e)
+        status = None
+    record = runtime.state_projection.apply(change, status)
+    logger.info("State projected: %s", record)
+    return record
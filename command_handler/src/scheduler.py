@@ -0,0 +1,46 @@
+from os import getenv
+from typing import Any, Optional
+from logging import getLogger, INFO
+
+from utils.ec2 import InstanceStatus
+from utils.idle import DEFAULT_IDLE_STOP_CHECKS, IdleCheck, IdleStopper
+from utils.runtime import get_runtime
+
+getLogger().setLevel(getenv("LOG_LEVEL", INFO))
+logger = getLogger(__name__)
+
+
+def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, IdleCheck]:
+    """Scheduled idle check
+
+    Stops every configured server that has been empty for IDLE_STOP_CHECKS
+    consecutive runs.
+
+    Parameters
+    ----------
+    event: EventBridge scheduled event (unused)
+    context: Lambda Context runtime methods and attributes
+
+    Returns
+    ------
+    The check of each server, for the logs
+
+    """
+
+    runtime = get_runtime()
+
+    def player_counts(
+        running: dict[str, InstanceStatus],
+    ) -> dict[str, Optional[int]]:
+        live = runtime.live_status(running)
+        return {name: live[name]["players_online"] for name in live}
+
+    stopper = IdleStopper(
+        runtime.fleet,
+        runtime.store,
+        player_counts,
+        stop_after=runtime.idle_stop_checks or DEFAULT_IDLE_STOP_CHECKS,
+    )
+    checks = stopper.run(list(runtime.servers))
+    logger.info("Idle checks: %s", checks)
+    return checks
@@ -0,0 +1,181 @@
+"""Self-hosted HTTP entry point for the interaction handler.
+
+Serves Discord's interaction POSTs without API Gateway and Lambda:
+
+    PYTHONPATH=./command_handler/src python -m server --port 8080
+
+Each request to /commands is turned into the HTTP API (v2) proxy event that
+``lambda_handler`` gets from API Gateway, so both entry points share every code
+path. Connections are kept alive and served on a bounded thread pool. All
+requests share one runtime context, i.e. one verify key and one set of EC2
+clients, built before the first request is accepted.
+"""
+
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from os import getenv
+from socket import socket
+from typing import Any, Final
+from logging import getLogger, INFO
+
+from app import lambda_handler
+from utils.runtime import get_runtime
+
+COMMANDS_PATH: Final[str] = "/commands"
+DEFAULT_PORT: Final[int] = 8080
+DEFAULT_WORKERS: Final[int] = 16
+# Idle connections are closed after this many seconds to free their worker.
+KEEP_ALIVE_TIMEOUT: Final[float] = 30.0
+# Interaction payloads are a few KB; anything much larger is not from Discord.
+MAX_BODY_BYTES: Final[int] = 1 << 20
+
+getLogger().setLevel(getenv("LOG_LEVEL", INFO))
+logger = getLogger(__name__)
+
+
+def proxy_event(
+    method: str, path: str, headers: dict[str, str], body: str, source_ip: str
+) -> dict[str, Any]:
+    """The HTTP API (v2) proxy event of a request, as API Gateway builds it."""
+    raw_path, _, raw_query = path.partition("?")
+    return {
+        "version": "2.0",
+        "routeKey": f"{method} {raw_path}",
+        "rawPath": raw_path,
+        "rawQueryString": raw_query,
+        # HTTP APIs lower-case the header names.
+        "headers": {k.lower(): v for k, v in headers.items()},
+        "requestContext": {
+            "http": {
+                "method": method,
+                "path": raw_path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": source_ip,
+                "userAgent": headers.get("User-Agent", ""),
+            },
+        },
+        "body": body,
+        "isBase64Encoded": False,
+    }
+
+
+class InteractionRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive unless the client closes them.
+    protocol_version = "HTTP/1.1"
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Responses are small: send them without waiting for more data.
+    disable_nagle_algorithm = True
+    server_version = "command-handler"
+
+    def do_POST(self) -> None:
+        if self.path.partition("?")[0] != COMMANDS_PATH:
+            self._send(404, {"Content-Type": "text/plain"}, b"Not Found")
+            return
+        if "Content-Length" not in self.headers:
+            self._send(411, {"Content-Type": "text/plain"}, b"Length Required")
+            return
+        content_length = self.headers["Content-Length"]
+        # int() would take "-1", "+1" or "1_0", and rfile.read(-1) waits for EOF.
+        if not (content_length.isascii() and content_length.isdigit()):
+            self.close_connection = True
+            self._send(400, {"Content-Type": "text/plain"}, b"Bad Request")
+            return
+        length = int(content_length)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send(413, {"Content-Type": "text/plain"}, b"Payload Too Large")
+            return
+        body = self.rfile.read(length).decode("utf-8", errors="replace")
+        event = proxy_event(
+            "POST", self.path, dict(self.headers), body, self.client_address[0]
+        )
+        response = lambda_handler(event, {})
+        self._send(
+            response["statusCode"],
+            response.get("headers") or {},
+            (response.get("body") or "").encode(),
+        )
+
+    def _send(self, status: int, headers: dict[str, str], body: bytes) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # The handler logs a summary of every interaction already.
+        logger.debug(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that serves each connection on a bounded thread pool.
+
+    A kept-alive connection holds its worker until it closes or idles out, so
+    workers bounds the number of connections served at once; further ones wait
+    in the pool's queue.
+    """
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        workers: int = DEFAULT_WORKERS,
+    ):
+        super().__init__(server_address, InteractionRequestHandler)
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="http")
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.executor.submit(self._serve_connection, request, client_address)
+
+    def _serve_connection(self, request: socket, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def prime() -> None:
+    """Build and warm up the shared runtime context before serving.
+
+    cached_property takes no lock (Python 3.12+), so the state requests share is
+    built here, before the workers start, and a failure stops the server. Two
+    workers building it at once would each get a deduplicator of their own.
+    """
+    from utils.priming import prime as prime_runtime
+
+    runtime = get_runtime()
+    runtime.deduplicator
+    runtime.server_aliases
+    runtime.server_index
+    runtime.fleet
+    prime_runtime(runtime)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    prime()
+    with PooledHTTPServer((args.host, args.port), args.workers) as server:
+        logger.info("Serving %s on %s:%s", COMMANDS_PATH, args.host, args.port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from enum import IntEnum
+from enum import IntEnum, IntFlag
 
 
 class InteractionType(IntEnum):
@@ -38,3 +38,8 @@ class CommandOptionType(IntEnum):
     MENTIONALBE = 9
     NUMBER = 10
     ATTACHMENT = 11
+
+
+class MessageFlags(IntFlag):
+    SUPPRESS_EMBEDS = 1 << 2
+    EPHEMERAL = 1 << 6
@@ -2,3 +2,17 @@ class BadRequest(Exception):
     """Custom exception for bad requests (client side)."""
 
     pass
+
+
+class InvalidOption(Exception):
+    """An option value the user typed that matches no valid value.
+
+    Unlike BadRequest, the request itself is genuine: the user is told which
+    values are valid.
+    """
+
+    def __init__(self, name: str, value: str, valid: list[str]):
+        super().__init__(f"Option value is invalid: {name=} {value=}")
+        self.name = name
+        self.value = value
+        self.valid = valid
@@ -17,6 +17,8 @@ class CommandOptions(BaseModel):
     name: str
     type: CommandOptionType
     value: str
+    # Set on the option being typed in an autocomplete interaction
+    focused: Optional[bool] = None
     model_config = {"extra": "ignore"}
 
 
@@ -35,11 +37,24 @@ class InteractionRequestBody(BaseModel):
     channel_id: Optional[str] = None
     guild_id: Optional[str] = None
     data: Optional[InteractionCommandData] = None
+    token: Optional[str] = None
     type: InteractionType
 
     model_config = {"extra": "ignore"}
 
 
+# for Configuration
+
+
+class ServerConfig(BaseModel):
+    instance_id: str
+    region_name: str
+    # UDP port of the Bedrock server (its default)
+    port: int = 19132
+    # Other names the server option accepts
+    aliases: list[str] = []
+
+
 # for Response
 
 
@@ -60,9 +75,18 @@ class InteractionCallbackData(BaseModel):
     flags: Optional[int] = None
 
 
+class CommandChoice(BaseModel):
+    name: str
+    value: str
+
+
+class AutocompleteCallbackData(BaseModel):
+    choices: list[CommandChoice]
+
+
 class InteractionResponseBody(BaseModel):
     type: InteractionCallbackType
-    data: Optional[InteractionCallbackData] = None
+    data: Optional[InteractionCallbackData | AutocompleteCallbackData] = None
 
 
 class ApiProxyResponse(BaseModel, Generic[BodyT]):
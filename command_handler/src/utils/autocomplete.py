@@ -0,0 +1,60 @@
+from typing import Final, Iterable
+
+from typedefs.models import CommandChoice, ServerConfig
+
+# Discord shows at most 25 autocomplete choices.
+MAX_CHOICES: Final[int] = 25
+
+
+class PrefixIndex:
+    """Choices by every prefix of the terms that select them.
+
+    Each choice is reachable through one or more terms (a name and its aliases).
+    Every lower-cased prefix of every term maps to the choices it selects, in
+    insertion order and capped at limit, so a lookup is a single dict access and
+    never scans the terms. The empty prefix lists the first choices.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[tuple[CommandChoice, Iterable[str]]],
+        limit: int = MAX_CHOICES,
+    ):
+        self.limit = limit
+        self._prefixes: dict[str, list[CommandChoice]] = {"": []}
+        for choice, terms in entries:
+            for prefix in self._term_prefixes(terms):
+                matches = self._prefixes.setdefault(prefix, [])
+                if len(matches) < limit and choice not in matches:
+                    matches.append(choice)
+
+    @staticmethod
+    def _term_prefixes(terms: Iterable[str]) -> set[str]:
+        return {term.lower()[:i] for term in terms for i in range(len(term) + 1)}
+
+    def search(self, prefix: str) -> list[CommandChoice]:
+        return self._prefixes.get(prefix.strip().lower(), [])
+
+
+def choices_index(values: Iterable[str]) -> PrefixIndex:
+    """Index of plain choices, e.g. the actions of a command."""
+    return PrefixIndex((CommandChoice(name=v, value=v), [v]) for v in values)
+
+
+def servers_index(servers: dict[str, ServerConfig]) -> PrefixIndex:
+    """Index of the server names and their aliases, plus "all" for a fleet."""
+    entries = [
+        (
+            CommandChoice(
+                name=(
+                    f'{name} ({", ".join(server.aliases)})' if server.aliases else name
+                ),
+                value=name,
+            ),
+            [name, *server.aliases],
+        )
+        for name, server in servers.items()
+    ]
+    if len(servers) > 1:
+        entries.append((CommandChoice(name="all", value="all"), ["all"]))
+    return PrefixIndex(entries)
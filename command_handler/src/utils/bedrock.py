@@ -0,0 +1,180 @@
+import asyncio
+import os
+import struct
+import time
+from typing import Final, Optional, TypedDict
+from logging import getLogger
+
+from utils.cache import TtlCache
+
+DEFAULT_PORT: Final[int] = 19132
+DEFAULT_QUERY_TIMEOUT: Final[float] = 1.0
+DEFAULT_QUERY_TTL: Final[float] = 10.0
+
+# RakNet offline message magic
+RAKNET_MAGIC: Final[bytes] = bytes.fromhex("00ffff00fefefefefdfdfdfd12345678")
+UNCONNECTED_PING_ID: Final[int] = 0x01
+UNCONNECTED_PONG_ID: Final[int] = 0x1C
+
+logger = getLogger(__name__)
+
+
+class BedrockStatus(TypedDict):
+    # Whether the server answered. The other fields are None when it did not.
+    online: bool
+    motd: Optional[str]
+    level_name: Optional[str]
+    version: Optional[str]
+    protocol: Optional[int]
+    players_online: Optional[int]
+    max_players: Optional[int]
+    game_mode: Optional[str]
+    latency_ms: Optional[float]
+
+
+OFFLINE: Final[BedrockStatus] = BedrockStatus(
+    online=False,
+    motd=None,
+    level_name=None,
+    version=None,
+    protocol=None,
+    players_online=None,
+    max_players=None,
+    game_mode=None,
+    latency_ms=None,
+)
+
+
+def unconnected_ping(timestamp_ms: int, client_guid: int | None = None) -> bytes:
+    """Packet id, client time, magic and client GUID.
+
+    The GUID is random per ping unless given: one drawn at import would be
+    shared by every environment restored from the same snapshot.
+    """
+    if client_guid is None:
+        client_guid = int.from_bytes(os.urandom(8), "big")
+    return (
+        struct.pack(">BQ", UNCONNECTED_PING_ID, timestamp_ms)
+        + RAKNET_MAGIC
+        + struct.pack(">Q", client_guid)
+    )
+
+
+def parse_pong(data: bytes, timestamp_ms: int | None = None) -> BedrockStatus:
+    """Parse an unconnected pong.
+
+    Its server id string reads
+    ``MCPE;motd;protocol;version;online;max;server guid;level name;game mode;...``.
+    When timestamp_ms is given, the pong must echo it.
+    """
+    if len(data) < 35 or data[0] != UNCONNECTED_PONG_ID:
+        raise ValueError("Not an unconnected pong")
+    echoed, _server_guid = struct.unpack_from(">QQ", data, 1)
+    if data[17:33] != RAKNET_MAGIC:
+        raise ValueError("Offline message magic mismatch")
+    if timestamp_ms is not None and echoed != timestamp_ms:
+        raise ValueError("Pong does not answer this ping")
+    (length,) = struct.unpack_from(">H", data, 33)
+    raw = data[35 : 35 + length]
+    if len(raw) != length:
+        raise ValueError("Truncated server id string")
+    fields = raw.decode("utf-8", errors="replace").split(";")
+    if len(fields) < 6:
+        raise ValueError("Malformed server id string")
+    return BedrockStatus(
+        online=True,
+        motd=fields[1],
+        level_name=fields[7] if len(fields) > 7 else None,
+        version=fields[3],
+        protocol=int(fields[2]),
+        players_online=int(fields[4]),
+        max_players=int(fields[5]),
+        game_mode=fields[8] if len(fields) > 8 else None,
+        latency_ms=None,
+    )
+
+
+class _PongProtocol(asyncio.DatagramProtocol):
+    def __init__(self, timestamp_ms: int):
+        self.timestamp_ms = timestamp_ms
+        self.pong: asyncio.Future[BedrockStatus] = (
+            asyncio.get_running_loop().create_future()
+        )
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        if self.pong.done():
+            return
+        try:
+            self.pong.set_result(parse_pong(data, self.timestamp_ms))
+        except ValueError as e:
+            # A stray or malformed datagram; keep waiting for the pong.
+            logger.debug("Ignored datagram from %s: %s", addr, e)
+
+    def error_received(self, exc: Exception) -> None:
+        # e.g. ICMP port unreachable while nothing listens on the port
+        if not self.pong.done():
+            self.pong.set_exception(exc)
+
+
+async def ping(
+    host: str, port: int = DEFAULT_PORT, timeout: float = DEFAULT_QUERY_TIMEOUT
+) -> BedrockStatus:
+    """Send an unconnected ping and return the parsed pong.
+
+    The whole exchange is bounded by timeout. Raises TimeoutError when nothing
+    answers in time and OSError when the port is unreachable.
+    """
+    loop = asyncio.get_running_loop()
+    timestamp_ms = int(time.time() * 1000)
+    start = time.perf_counter()
+    async with asyncio.timeout(timeout):
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: _PongProtocol(timestamp_ms), remote_addr=(host, port)
+        )
+        try:
+            transport.sendto(unconnected_ping(timestamp_ms))
+            status = await protocol.pong
+        finally:
+            transport.close()
+    status["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return status
+
+
+class BedrockQuery:
+    """Bedrock server queries with a short-lived result cache.
+
+    Results, including unanswered queries, are reused for ttl seconds so that
+    repeated status requests do not each wait on the network.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_QUERY_TIMEOUT,
+        ttl: float = DEFAULT_QUERY_TTL,
+    ):
+        self.timeout = timeout
+        self._cache: TtlCache[tuple[str, int], BedrockStatus] = TtlCache(ttl)
+
+    async def astatus(self, host: str, port: int = DEFAULT_PORT) -> BedrockStatus:
+        cached = self._cache.get((host, port))
+        if cached is not None:
+            return cached
+        try:
+            status = await ping(host, port, self.timeout)
+        except (OSError, TimeoutError) as e:
+            logger.info("Bedrock server %s:%s did not answer: %r", host, port, e)
+            status = BedrockStatus(**OFFLINE)
+        self._cache.set((host, port), status)
+        return status
+
+    async def astatus_many(
+        self, addresses: list[tuple[str, int]]
+    ) -> list[BedrockStatus]:
+        """Query the servers concurrently."""
+        return list(await asyncio.gather(*(self.astatus(*a) for a in addresses)))
+
+    def status(self, host: str, port: int = DEFAULT_PORT) -> BedrockStatus:
+        return asyncio.run(self.astatus(host, port))
+
+    def status_many(self, addresses: list[tuple[str, int]]) -> list[BedrockStatus]:
+        return asyncio.run(self.astatus_many(addresses))
@@ -0,0 +1,49 @@
+from threading import Lock
+from time import monotonic
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TtlCache(Generic[K, V]):
+    """In-process cache whose entries expire ttl seconds after they were stored."""
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: dict[K, tuple[float, V]] = {}
+        self._lock = Lock()
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if self.clock() >= expires_at:
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (self.clock() + self.ttl, value)
+
+    def get_or_load(self, key: K, loader: Callable[[], V]) -> V:
+        """Return the cached value, calling loader at most once per TTL window."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            # Another thread may have loaded it while we were waiting.
+            value = self.get(key)
+            if value is None:
+                value = loader()
+                self.set(key, value)
+            return value
+
+    def invalidate(self, key: K | None = None) -> None:
+        """Drop one entry, or every entry when key is omitted."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Final, Optional
+
+from boto3 import client  # type: ignore
+
+from typedefs.models import ServerConfig
+
+# EC2 basic monitoring publishes CPUUtilization every 5 minutes.
+CPU_PERIOD: Final[int] = 300
+CPU_LOOKBACK: Final[timedelta] = timedelta(minutes=15)
+
+
+class CpuMetrics:
+    """Recent average CPU utilization of the servers from CloudWatch.
+
+    One GetMetricData call per region covers every server in it.
+    """
+
+    def __init__(
+        self,
+        servers: dict[str, ServerConfig],
+        now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.servers = servers
+        self.now = now
+        self._clients: dict[str, Any] = {}
+
+    def _client(self, region_name: str) -> Any:
+        if region_name not in self._clients:
+            self._clients[region_name] = client("cloudwatch", region_name=region_name)
+        return self._clients[region_name]
+
+    def utilization(self, names: list[str]) -> dict[str, Optional[float]]:
+        """Latest CPU utilization (percent) by server, None without datapoints."""
+        by_region: dict[str, list[str]] = {}
+        for name in names:
+            by_region.setdefault(self.servers[name].region_name, []).append(name)
+        end = self.now()
+        results: dict[str, Optional[float]] = {}
+        for region_name, group in by_region.items():
+            queries = [
+                {
+                    "Id": f"cpu{i}",
+                    "MetricStat": {
+                        "Metric": {
+                            "Namespace": "AWS/EC2",
+                            "MetricName": "CPUUtilization",
+                            "Dimensions": [
+                                {
+                                    "Name": "InstanceId",
+                                    "Value": self.servers[name].instance_id,
+                                }
+                            ],
+                        },
+                        "Period": CPU_PERIOD,
+                        "Stat": "Average",
+                    },
+                }
+                for i, name in enumerate(group)
+            ]
+            response = self._client(region_name).get_metric_data(
+                MetricDataQueries=queries,
+                StartTime=end - CPU_LOOKBACK,
+                EndTime=end,
+                ScanBy="TimestampDescending",
+            )
+            values = {r["Id"]: r["Values"] for r in response["MetricDataResults"]}
+            for i, name in enumerate(group):
+                latest = values.get(f"cpu{i}")
+                results[name] = round(latest[0], 1) if latest else None
+        return {name: results[name] for name in names}
@@ -0,0 +1,112 @@
+import json
+from time import monotonic, sleep
+from typing import Any, Callable, Final, Literal, TypeVar
+from logging import getLogger
+
+from utils.store import KeyValueStore
+
+# Longest a state change may hold the lease before others take over
+DEFAULT_LEASE_TTL: Final[float] = 10.0
+# How long a finished state change answers identical requests
+DEFAULT_RESULT_TTL: Final[float] = 5.0
+# The command handler has 3s (the Lambda timeout) for verify, dispatch, this
+# wait and then, without a result, its own EC2 call (a few hundred ms). Verify
+# and dispatch take tens of ms on a warm container, which leaves about 0.5s.
+DEFAULT_WAIT_TIMEOUT: Final[float] = 2.0
+DEFAULT_POLL_INTERVAL: Final[float] = 0.05
+
+Action = Literal["start", "stop"]
+OPPOSITE: Final[dict[str, Action]] = {"start": "stop", "stop": "start"}
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def lease_key(instance_id: str, action: str) -> str:
+    return f"lease#{instance_id}#{action}"
+
+
+def result_key(instance_id: str, action: str) -> str:
+    return f"result#{instance_id}#{action}"
+
+
+class StateChangeCoalescer:
+    """Single-flight start/stop of an instance across concurrent callers.
+
+    The first caller takes a short-lived lease on the instance and action in the
+    store and performs the change. Callers that arrive meanwhile wait for its
+    result, and callers that arrive shortly after reuse it, so a burst of
+    identical requests costs one EC2 call. A finished change drops the result
+    of the opposite action, which is no longer current.
+
+    If the lease holder fails, a waiter takes the lease over. If no result comes
+    within wait_timeout, the caller performs the change itself: start/stop are
+    idempotent, so coalescing only ever saves calls.
+    """
+
+    def __init__(
+        self,
+        store: KeyValueStore,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        result_ttl: float = DEFAULT_RESULT_TTL,
+        wait_timeout: float = DEFAULT_WAIT_TIMEOUT,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], None] = sleep,
+    ):
+        self.store = store
+        self.lease_ttl = lease_ttl
+        self.result_ttl = result_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+
+    def _reused(self, instance_id: str, action: Action) -> Any | None:
+        value = self.store.get(result_key(instance_id, action))
+        return None if value is None else json.loads(value)
+
+    def _perform(
+        self, instance_id: str, action: Action, change: Callable[[], T], lease: str
+    ) -> T:
+        try:
+            result = change()
+        except BaseException:
+            # Let a waiter take over.
+            self.store.delete(lease)
+            raise
+        # The result goes in before the lease goes away, so that no waiter finds
+        # neither and performs the change again.
+        self.store.put(
+            result_key(instance_id, action), json.dumps(result), ttl=self.result_ttl
+        )
+        self.store.delete(result_key(instance_id, OPPOSITE[action]))
+        self.store.delete(lease)
+        return result
+
+    def run(self, instance_id: str, action: Action, change: Callable[[], T]) -> T:
+        """Perform change once for concurrent callers and return its result.
+
+        The result must be JSON-serializable; reused results are decoded copies.
+        """
+        lease = lease_key(instance_id, action)
+        deadline = self.clock() + self.wait_timeout
+        while True:
+            reused = self._reused(instance_id, action)
+            if reused is not None:
+                logger.info("Reusing the %s of %s", action, instance_id)
+                return reused
+            if self.store.put_if_absent(lease, "1", ttl=self.lease_ttl):
+                # The previous holder may have finished since the check above.
+                reused = self._reused(instance_id, action)
+                if reused is not None:
+                    self.store.delete(lease)
+                    return reused
+                return self._perform(instance_id, action, change, lease)
+            if self.clock() >= deadline:
+                logger.warning(
+                    "No %s result for %s in time, calling EC2", action, instance_id
+                )
+                return change()
+            self.sleep(self.poll_interval)
@@ -1,22 +1,50 @@
+import json
 from functools import wraps
 from typing import Any, Callable, TypeVar, ParamSpec
 
 from typedefs.models import ApiProxyResponse
+from utils.logs import Deferred, redact_event, sampled
+from utils.metrics import invocation, stage
+from utils.responses import PreparedResponse
+from utils.serialize import dump_proxy_response
 from logging import getLogger
 
 P = ParamSpec("P")
-R = TypeVar("R", bound=ApiProxyResponse[Any])
+R = TypeVar("R", bound=ApiProxyResponse[Any] | PreparedResponse)
 
 logger = getLogger(__name__)
 
 
+def outcome(response: ApiProxyResponse[Any] | PreparedResponse) -> str:
+    """Outcome dimension of a response, e.g. "ok", "pong" or "bad_request"."""
+    if isinstance(response, PreparedResponse):
+        return response.name.lower()
+    return "ok" if response.statusCode < 400 else "error"
+
+
 def discord_command(
     func: Callable[P, R],
 ) -> Callable[P, dict[str, Any]]:
     @wraps(func)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> dict[str, Any]:
-        response = func(*args, **kwargs)
-        logger.info(f"{response=}")
-        return response.to_dict()
+        dump = sampled()
+        with invocation() as metrics:
+            if dump and args:
+                event = args[0]
+                logger.info(
+                    "event=%s",
+                    Deferred(lambda: json.dumps(redact_event(event), default=str)),
+                )
+            response = func(*args, **kwargs)
+            with stage("serialize"):
+                if isinstance(response, PreparedResponse):
+                    # Already serialized; returned as is.
+                    proxy_response = response.to_dict()
+                else:
+                    proxy_response = dump_proxy_response(response)
+            metrics.dimensions["outcome"] = outcome(response)
+            if dump:
+                logger.info("response=%s", proxy_response)
+        return proxy_response
 
     return wrapper
@@ -0,0 +1,35 @@
+import json
+from typing import Any, Literal, NotRequired, TypedDict
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+_lambda_client: Any = None
+
+
+class FollowupTask(TypedDict):
+    action: Literal["start", "stop"]
+    application_id: str
+    token: str
+    # Absent in tasks queued before multi-server support; means the default server.
+    servers: NotRequired[list[str]]
+
+
+def dispatch_followup(function_name: str, task: FollowupTask) -> None:
+    """Invoke the follow-up worker asynchronously.
+
+    The invocation is queued by Lambda (InvocationType=Event), so the caller does not
+    wait for the EC2 call to finish.
+    """
+    global _lambda_client
+    if _lambda_client is None:
+        # Imported here so that requests without a follow-up never load boto3.
+        from boto3 import client  # type: ignore
+
+        _lambda_client = client("lambda")
+    _lambda_client.invoke(
+        FunctionName=function_name,
+        InvocationType="Event",
+        Payload=json.dumps(task).encode(),
+    )
+    logger.info("Dispatched follow-up: task['action']=%r", task["action"])
@@ -1,27 +1,101 @@
-from typing import Literal, TypedDict
-from venv import logger
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Final,
+    Literal,
+    NotRequired,
+    Optional,
+    TypedDict,
+    TypeVar,
+)
 from boto3 import client  # type: ignore
 from logging import getLogger
 
+from typedefs.models import ServerConfig
+from utils.cache import TtlCache
+from utils.coalesce import StateChangeCoalescer
+
+if TYPE_CHECKING:
+    from utils.projection import StateProjection
+
+DEFAULT_STATUS_TTL: Final[float] = 30.0
+
 logger = getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class InstanceStateChange(TypedDict):
     current_state_name: str
     previous_state_name: str
 
 
+class InstanceStatus(TypedDict):
+    state_name: str
+    public_ip_address: Optional[str]
+    launch_time: Optional[str]
+    instance_type: Optional[str]
+    # Seconds from pending to running, known from the state projection
+    boot_seconds: NotRequired[float]
+
+
+def _state_change(instance: dict[str, Any]) -> InstanceStateChange:
+    return InstanceStateChange(
+        current_state_name=f'{instance.get("CurrentState", {}).get("Name")}',
+        previous_state_name=f'{instance.get("PreviousState", {}).get("Name")}',
+    )
+
+
+def _status(instance: dict[str, Any]) -> InstanceStatus:
+    launch_time = instance.get("LaunchTime")
+    return InstanceStatus(
+        state_name=f'{instance.get("State", {}).get("Name")}',
+        public_ip_address=instance.get("PublicIpAddress"),
+        launch_time=launch_time.isoformat() if launch_time else None,
+        instance_type=instance.get("InstanceType"),
+    )
+
+
 class Ec2Instance:
     """SDK Wrapper"""
 
-    def __init__(self, instance_id: str, region_name: str):
-        self.client = client("ec2", region_name=region_name)
+    def __init__(
+        self,
+        instance_id: str,
+        region_name: str,
+        status_ttl: float = DEFAULT_STATUS_TTL,
+        ec2_client: Any = None,
+        coalescer: Optional[StateChangeCoalescer] = None,
+    ):
+        self.client = ec2_client or client("ec2", region_name=region_name)
         self.instance_id = instance_id
+        self.region_name = region_name
+        self.coalescer = coalescer
+        self._status_cache: TtlCache[str, InstanceStatus] = TtlCache(status_ttl)
 
     def _change_instance_state(
         self, action: Literal["start", "stop"]
     ) -> InstanceStateChange:
-        """Change the state of the EC2 instance and return the state change information."""
+        """Change the state of the EC2 instance and return the state change information.
+
+        With a coalescer, concurrent callers share a single EC2 call and its result.
+        """
+        if self.coalescer is None:
+            return self._request_state_change(action)
+        if action not in ("start", "stop"):
+            raise ValueError("Unsupported action")
+        result = self.coalescer.run(
+            self.instance_id, action, lambda: self._request_state_change(action)
+        )
+        # The status cached by this container is stale as well.
+        self._status_cache.invalidate(self.instance_id)
+        return result
+
+    def _request_state_change(
+        self, action: Literal["start", "stop"]
+    ) -> InstanceStateChange:
         if action == "start":
             instances = self.client.start_instances(InstanceIds=[self.instance_id])[
                 "StartingInstances"
@@ -32,14 +106,12 @@ class Ec2Instance:
             ]
         else:
             raise ValueError("Unsupported action")
+        # The cached status is stale from now on.
+        self._status_cache.invalidate(self.instance_id)
         if len(instances) != 1:
             logger.error(instances)
             raise ValueError("Instance ID is not unique")
-        instance = instances[0]
-        return InstanceStateChange(
-            current_state_name=f'{instance.get("CurrentState", {}).get("Name")}',
-            previous_state_name=f'{instance.get("PreviousState", {}).get("Name")}',
-        )
+        return _state_change(instances[0])
 
     def start(self) -> InstanceStateChange:
         """Start the EC2 instance and return the state change information."""
@@ -48,3 +120,181 @@ class Ec2Instance:
     def stop(self) -> InstanceStateChange:
         """Stop the EC2 instance and return the state change information."""
         return self._change_instance_state("stop")
+
+    def _describe(self) -> InstanceStatus:
+        """Describe the EC2 instance."""
+        reservations = self.client.describe_instances(InstanceIds=[self.instance_id])[
+            "Reservations"
+        ]
+        instances = [i for r in reservations for i in r.get("Instances", [])]
+        if len(instances) != 1:
+            logger.error(instances)
+            raise ValueError("Instance ID is not unique")
+        return _status(instances[0])
+
+    def status(self) -> InstanceStatus:
+        """Return the status of the EC2 instance.
+
+        The result is cached for the status TTL, so repeated calls cost at most one
+        DescribeInstances call per TTL window. start()/stop() invalidate the cache.
+        """
+        return self._status_cache.get_or_load(self.instance_id, self._describe)
+
+    def refresh(self) -> InstanceStatus:
+        """Describe the EC2 instance now, bypassing and updating the cached status."""
+        status = self._describe()
+        self._status_cache.set(self.instance_id, status)
+        return status
+
+
+class Ec2Fleet:
+    """Named servers spread over regions.
+
+    Operations on several servers issue one EC2 call per region with all of its
+    instance ids, and the regions run in parallel. Operations on a single server
+    go through its Ec2Instance, which coalesces concurrent start/stop calls when a
+    coalescer is given. With a projection, statuses are read from it and only
+    instances it has no entry for are described.
+    """
+
+    def __init__(
+        self,
+        servers: dict[str, ServerConfig],
+        status_ttl: float = DEFAULT_STATUS_TTL,
+        coalescer: Optional[StateChangeCoalescer] = None,
+        projection: Optional["StateProjection"] = None,
+    ):
+        if not servers:
+            raise ValueError("No servers are configured")
+        clients: dict[str, Any] = {}
+        self.instances: dict[str, Ec2Instance] = {}
+        for name, server in servers.items():
+            if server.region_name not in clients:
+                clients[server.region_name] = client(
+                    "ec2", region_name=server.region_name
+                )
+            self.instances[name] = Ec2Instance(
+                instance_id=server.instance_id,
+                region_name=server.region_name,
+                status_ttl=status_ttl,
+                ec2_client=clients[server.region_name],
+                coalescer=coalescer,
+            )
+        self.projection = projection
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.instances)
+
+    def _by_region(self, names: list[str]) -> list[dict[str, Ec2Instance]]:
+        """Group the servers by region, keyed by server name."""
+        groups: dict[str, dict[str, Ec2Instance]] = {}
+        for name in names:
+            instance = self.instances[name]
+            groups.setdefault(instance.region_name, {})[name] = instance
+        return list(groups.values())
+
+    def _run_regions(
+        self,
+        groups: list[dict[str, Ec2Instance]],
+        call: Callable[[dict[str, Ec2Instance]], dict[str, T]],
+    ) -> dict[str, T]:
+        """Run call once per region, in parallel when there are several regions."""
+        if len(groups) == 1:
+            return call(groups[0])
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(thread_name_prefix="ec2-fleet")
+        results: dict[str, T] = {}
+        for result in self._executor.map(call, groups):
+            results.update(result)
+        return results
+
+    def _change_state(
+        self, names: list[str], action: Literal["start", "stop"]
+    ) -> dict[str, InstanceStateChange]:
+        if len(names) == 1:
+            return {names[0]: self.instances[names[0]]._change_instance_state(action)}
+
+        def call(group: dict[str, Ec2Instance]) -> dict[str, InstanceStateChange]:
+            ids = [i.instance_id for i in group.values()]
+            ec2 = next(iter(group.values())).client
+            if action == "start":
+                instances = ec2.start_instances(InstanceIds=ids)["StartingInstances"]
+            else:
+                instances = ec2.stop_instances(InstanceIds=ids)["StoppingInstances"]
+            for instance in group.values():
+                # The cached status is stale from now on.
+                instance._status_cache.invalidate(instance.instance_id)
+            changes = {i["InstanceId"]: _state_change(i) for i in instances}
+            return {n: changes[i.instance_id] for n, i in group.items()}
+
+        return self._run_regions(self._by_region(names), call)
+
+    def start(self, names: list[str]) -> dict[str, InstanceStateChange]:
+        """Start the servers and return the state change of each."""
+        return self._change_state(names, "start")
+
+    def stop(self, names: list[str]) -> dict[str, InstanceStateChange]:
+        """Stop the servers and return the state change of each."""
+        return self._change_state(names, "stop")
+
+    def _describe(self, names: list[str]) -> dict[str, InstanceStatus]:
+        """One DescribeInstances call per region, cached in each Ec2Instance."""
+
+        def call(group: dict[str, Ec2Instance]) -> dict[str, InstanceStatus]:
+            ids = [i.instance_id for i in group.values()]
+            ec2 = next(iter(group.values())).client
+            reservations = ec2.describe_instances(InstanceIds=ids)["Reservations"]
+            statuses = {
+                i["InstanceId"]: _status(i)
+                for r in reservations
+                for i in r.get("Instances", [])
+            }
+            for instance in group.values():
+                instance._status_cache.set(
+                    instance.instance_id, statuses[instance.instance_id]
+                )
+            return {n: statuses[i.instance_id] for n, i in group.items()}
+
+        return self._run_regions(self._by_region(names), call)
+
+    def status(self, names: list[str]) -> dict[str, InstanceStatus]:
+        """Return the status of the servers.
+
+        Projected and cached statuses are reused. The rest is fetched with one
+        DescribeInstances call per region and cached in the Ec2Instance of each
+        server.
+        """
+        if self.projection is None:
+            return self._described_status(names)
+        results: dict[str, InstanceStatus] = {}
+        for name in names:
+            projected = self.projection.status(self.instances[name].instance_id)
+            if projected is not None:
+                results[name] = projected
+        missing = [name for name in names if name not in results]
+        if missing:
+            results.update(self._described_status(missing))
+        return {name: results[name] for name in names}
+
+    def _described_status(self, names: list[str]) -> dict[str, InstanceStatus]:
+        if len(names) == 1:
+            return {names[0]: self.instances[names[0]].status()}
+        results: dict[str, InstanceStatus] = {}
+        missing: list[str] = []
+        for name in names:
+            instance = self.instances[name]
+            cached = instance._status_cache.get(instance.instance_id)
+            if cached is None:
+                missing.append(name)
+            else:
+                results[name] = cached
+        if missing:
+            results.update(self._describe(missing))
+        return {name: results[name] for name in names}
+
+    def refresh(self, names: list[str]) -> dict[str, InstanceStatus]:
+        """Describe the servers now (one call per region), bypassing the cache."""
+        results = self._describe(names)
+        return {name: results[name] for name in names}
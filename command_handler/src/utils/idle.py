@@ -0,0 +1,81 @@
+from typing import TYPE_CHECKING, Callable, Final, Optional, TypedDict
+from logging import getLogger
+
+from utils.store import KeyValueStore
+
+if TYPE_CHECKING:
+    from utils.ec2 import Ec2Fleet, InstanceStatus
+
+DEFAULT_IDLE_STOP_CHECKS: Final[int] = 3
+# Counters of servers that are no longer checked expire on their own.
+IDLE_COUNTER_TTL: Final[float] = 6 * 3600
+
+logger = getLogger(__name__)
+
+# Players online per running server, None when the server does not answer
+PlayerCounts = Callable[[dict[str, "InstanceStatus"]], dict[str, Optional[int]]]
+
+
+class IdleCheck(TypedDict):
+    state_name: str
+    players: Optional[int]
+    # Consecutive checks the server has been found empty, including this one
+    idle_checks: int
+    stopped: bool
+
+
+def idle_key(name: str) -> str:
+    return f"idle#{name}"
+
+
+class IdleStopper:
+    """Stops servers that have been empty for stop_after consecutive checks.
+
+    Each run describes every server once (one DescribeInstances call per region)
+    and asks the running ones for their player count. A running server that does
+    not answer counts as empty: nobody can be playing on it. The counters live in
+    the store as one small entry per idle server.
+    """
+
+    def __init__(
+        self,
+        fleet: "Ec2Fleet",
+        store: KeyValueStore,
+        player_counts: PlayerCounts,
+        stop_after: int = DEFAULT_IDLE_STOP_CHECKS,
+    ):
+        if stop_after < 1:
+            raise ValueError(f"stop_after must be positive: {stop_after=}")
+        self.fleet = fleet
+        self.store = store
+        self.player_counts = player_counts
+        self.stop_after = stop_after
+
+    def run(self, names: list[str]) -> dict[str, IdleCheck]:
+        statuses = self.fleet.refresh(names)
+        running = {n: s for n, s in statuses.items() if s["state_name"] == "running"}
+        players = self.player_counts(running) if running else {}
+
+        checks: dict[str, IdleCheck] = {}
+        for name, status in statuses.items():
+            key = idle_key(name)
+            previous = int(self.store.get(key) or 0)
+            idle = name in running and not players.get(name)
+            count = previous + 1 if idle else 0
+            if count and count < self.stop_after:
+                self.store.put(key, str(count), ttl=IDLE_COUNTER_TTL)
+            elif previous:
+                # Reset: players are back, the server stopped, or it is stopped now.
+                self.store.delete(key)
+            checks[name] = IdleCheck(
+                state_name=status["state_name"],
+                players=players.get(name),
+                idle_checks=count,
+                stopped=count >= self.stop_after,
+            )
+
+        to_stop = [name for name, check in checks.items() if check["stopped"]]
+        if to_stop:
+            logger.info("Stopping idle servers: %s", to_stop)
+            self.fleet.stop(to_stop)
+        return checks
@@ -0,0 +1,62 @@
+import json
+from os import getenv
+from random import random
+from typing import Any, Callable, Final
+
+# Share of invocations whose full event and response are logged (0 to 1)
+SAMPLE_RATE: Final[float] = float(getenv("LOG_SAMPLE_RATE") or 0)
+
+REDACTED: Final[str] = "[REDACTED]"
+# Compared in lower case. HTTP API v2 events already have lower-case headers.
+SENSITIVE_KEYS: Final[frozenset[str]] = frozenset(
+    {"token", "x-signature-ed25519", "authorization", "cookie", "cookies"}
+)
+
+
+class Deferred:
+    """Formats its value only when the log record is emitted.
+
+    The value is computed once even if several handlers format the record.
+    """
+
+    __slots__ = ("func", "text")
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+        self.text: str | None = None
+
+    def __str__(self) -> str:
+        if self.text is None:
+            self.text = str(self.func())
+        return self.text
+
+
+def redact(value: Any) -> Any:
+    """Copy of value with the sensitive keys of nested dicts masked."""
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if str(k).lower() in SENSITIVE_KEYS else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def redact_event(event: dict[str, Any]) -> dict[str, Any]:
+    """Copy of a proxy event with its headers and JSON body redacted."""
+    redacted = redact(event)
+    body = event.get("body")
+    if isinstance(body, str):
+        try:
+            redacted["body"] = redact(json.loads(body))
+        except ValueError:
+            # Not JSON: there is nothing structured to keep.
+            redacted["body"] = REDACTED
+    return redacted
+
+
+def sampled(rate: float | None = None) -> bool:
+    """Whether to dump the payloads of this invocation (SAMPLE_RATE by default)."""
+    rate = SAMPLE_RATE if rate is None else rate
+    return rate > 0 and random() < rate
@@ -0,0 +1,160 @@
+from typing import TYPE_CHECKING, Final
+
+from typedefs.enums import MessageFlags
+from typedefs.models import InteractionCallbackData
+
+if TYPE_CHECKING:
+    from typedefs.exceptions import InvalidOption
+    from utils.bedrock import BedrockStatus
+    from utils.ec2 import InstanceStateChange, InstanceStatus
+    from utils.readiness import Readiness
+    from utils.status import Freshness
+
+BAD_REQUEST_CONTENT: Final[str] = (
+    "Bad Request. For security reasons, the reason is not given."
+)
+TECHNICAL_ERROR_CONTENT: Final[str] = "Technical error. Please contact author."
+DUPLICATE_CONTENT: Final[str] = "This request is already being processed."
+
+# Shown for a server whose EC2 state could not be fetched
+UNKNOWN_STATUS: Final["InstanceStatus"] = {
+    "state_name": "unknown",
+    "public_ip_address": None,
+    "launch_time": None,
+    "instance_type": None,
+}
+# Status sources as named in replies
+SOURCE_LABELS: Final[dict[str, str]] = {
+    "ec2": "EC2 state",
+    "bedrock": "server query",
+    "cpu": "CPU metrics",
+}
+
+
+def state_changed(result: "InstanceStateChange") -> InteractionCallbackData:
+    """Build the reply for a start/stop state change."""
+    return InteractionCallbackData(
+        content=f'State changed: {result["previous_state_name"]} -> {result["current_state_name"]}'
+    )
+
+
+def server_status(
+    status: "InstanceStatus",
+    live: "BedrockStatus | None" = None,
+    cpu: float | None = None,
+) -> InteractionCallbackData:
+    """Build the reply for a status query."""
+    lines = [f'State: {status["state_name"]}']
+    if status["public_ip_address"]:
+        lines.append(f'IP: {status["public_ip_address"]}')
+    if status["launch_time"]:
+        lines.append(f'Launched: {status["launch_time"]}')
+    if status["instance_type"]:
+        lines.append(f'Type: {status["instance_type"]}')
+    if "boot_seconds" in status:
+        lines.append(f'Boot time: {status["boot_seconds"]:.0f}s')
+    if live is not None:
+        if live["online"]:
+            lines.append(f'Players: {live["players_online"]}/{live["max_players"]}')
+            lines.append(f'Version: {live["version"]}')
+        else:
+            lines.append("Server: not responding")
+    if cpu is not None:
+        lines.append(f"CPU: {cpu}%")
+    return InteractionCallbackData(content="\n".join(lines))
+
+
+def states_changed(
+    results: dict[str, "InstanceStateChange"],
+) -> InteractionCallbackData:
+    """Build the reply for start/stop over one or more servers."""
+    if len(results) == 1:
+        return state_changed(next(iter(results.values())))
+    return InteractionCallbackData(
+        content="\n".join(
+            f'{name}: {r["previous_state_name"]} -> {r["current_state_name"]}'
+            for name, r in results.items()
+        )
+    )
+
+
+def _degraded_lines(degraded: dict[str, "Freshness"]) -> list[str]:
+    return [
+        f"({SOURCE_LABELS.get(source, source)}: "
+        f'{"last known" if freshness == "stale" else "unavailable"})'
+        for source, freshness in degraded.items()
+    ]
+
+
+def servers_status(
+    statuses: dict[str, "InstanceStatus"],
+    live: dict[str, "BedrockStatus"] | None = None,
+    cpu: dict[str, float | None] | None = None,
+    degraded: dict[str, "Freshness"] | None = None,
+) -> InteractionCallbackData:
+    """Build the reply for a status query over one or more servers.
+
+    live holds the answers of the servers that were queried and cpu their CPU
+    utilization, by name. degraded names the sources whose values are stale or
+    unavailable.
+    """
+    live = live or {}
+    cpu = cpu or {}
+    notes = _degraded_lines(degraded or {})
+    if len(statuses) == 1:
+        name, status = next(iter(statuses.items()))
+        data = server_status(status, live.get(name), cpu.get(name))
+        lines = [data.content or ""]
+    else:
+        lines = [
+            _server_line(name, status, live.get(name), cpu.get(name))
+            for name, status in statuses.items()
+        ]
+    return InteractionCallbackData(content="\n".join(lines + notes))
+
+
+def _server_line(
+    name: str,
+    status: "InstanceStatus",
+    live: "BedrockStatus | None",
+    cpu: float | None,
+) -> str:
+    line = f'{name}: {status["state_name"]}'
+    if status["public_ip_address"]:
+        line += f' ({status["public_ip_address"]})'
+    if live is not None:
+        line += (
+            f' {live["players_online"]}/{live["max_players"]} players'
+            if live["online"]
+            else " not responding"
+        )
+    if cpu is not None:
+        line += f" cpu {cpu}%"
+    return line
+
+
+def _readiness_line(readiness: "Readiness") -> str:
+    if readiness["ready"]:
+        return f'ready at {readiness["address"]}'
+    return f'not ready after {readiness["elapsed"]:.0f}s (state: {readiness["state_name"]})'
+
+
+def servers_ready(results: dict[str, "Readiness"]) -> InteractionCallbackData:
+    """Build the follow-up sent once started servers are ready (or not)."""
+    if len(results) == 1:
+        line = _readiness_line(next(iter(results.values())))
+        return InteractionCallbackData(content=f"Server is {line}")
+    return InteractionCallbackData(
+        content="\n".join(
+            f"{name}: {_readiness_line(r)}" for name, r in results.items()
+        )
+    )
+
+
+def invalid_option(error: "InvalidOption") -> InteractionCallbackData:
+    """Build the reply, seen only by the user, to a value that matches nothing."""
+    return InteractionCallbackData(
+        content=f"Unknown {error.name}: {error.value}. "
+        f'Valid values: {", ".join(error.valid)}',
+        flags=MessageFlags.EPHEMERAL,
+    )
@@ -0,0 +1,153 @@
+import json
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import getenv
+from time import perf_counter, time
+from typing import Any, Final, Iterator, Protocol, TextIO
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+NAMESPACE: Final[str] = getenv("METRICS_NAMESPACE", "DiscordCommands")
+DIMENSIONS: Final[tuple[str, ...]] = ("command", "action", "outcome")
+
+
+class MetricSink(Protocol):
+    def emit(self, record: dict[str, Any]) -> None: ...
+
+
+class StdoutSink:
+    """Writes each record as one JSON line.
+
+    Lambda sends stdout to CloudWatch Logs, which extracts the metrics of lines in
+    the Embedded Metric Format without any PutMetricData call.
+    """
+
+    def __init__(self, stream: TextIO | None = None):
+        self.stream = stream
+
+    def emit(self, record: dict[str, Any]) -> None:
+        stream = self.stream or sys.stdout
+        stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+        stream.flush()
+
+
+class MemorySink:
+    """Keeps the records, for tests."""
+
+    def __init__(self) -> None:
+        self.records: list[dict[str, Any]] = []
+
+    def emit(self, record: dict[str, Any]) -> None:
+        self.records.append(record)
+
+
+class InvocationMetrics:
+    """Stage latencies and dimensions of one invocation."""
+
+    def __init__(self, cold_start: bool):
+        self.cold_start = cold_start
+        self.stages: dict[str, float] = {}
+        # Logged with the metrics but not aggregated, e.g. the interaction id
+        self.properties: dict[str, str | int] = {}
+        self.dimensions: dict[str, str] = {
+            "command": "none",
+            "action": "none",
+            "outcome": "error",
+        }
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def to_emf(self, namespace: str, timestamp_ms: int) -> dict[str, Any]:
+        """The record in CloudWatch Embedded Metric Format."""
+        values = {
+            f"{name.capitalize()}Latency": round(seconds * 1000, 3)
+            for name, seconds in self.stages.items()
+        }
+        metrics = [{"Name": name, "Unit": "Milliseconds"} for name in values]
+        metrics.append({"Name": "ColdStart", "Unit": "Count"})
+        return {
+            "_aws": {
+                "Timestamp": timestamp_ms,
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": namespace,
+                        "Dimensions": [list(DIMENSIONS)],
+                        "Metrics": metrics,
+                    }
+                ],
+            },
+            **self.properties,
+            **self.dimensions,
+            **values,
+            "ColdStart": int(self.cold_start),
+        }
+
+
+_sink: MetricSink = StdoutSink()
+_current: ContextVar[InvocationMetrics | None] = ContextVar("metrics", default=None)
+_cold_start = True
+
+
+def set_metric_sink(sink: MetricSink) -> MetricSink:
+    """Replace the sink and return the previous one."""
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+@contextmanager
+def invocation() -> Iterator[InvocationMetrics]:
+    """Collect the metrics of one invocation and emit them when it ends."""
+    global _cold_start
+    metrics = InvocationMetrics(cold_start=_cold_start)
+    _cold_start = False
+    token = _current.set(metrics)
+    start = perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.add_stage("total", perf_counter() - start)
+        _current.reset(token)
+        try:
+            _sink.emit(metrics.to_emf(NAMESPACE, int(time() * 1000)))
+        except Exception as e:
+            # Metrics must never fail the request.
+            logger.warning(e, exc_info=True)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage of the current invocation. Does nothing outside of one."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_stage(name, perf_counter() - start)
+
+
+def add_stage(name: str, seconds: float) -> None:
+    """Record a stage timed elsewhere, e.g. on another thread."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_stage(name, seconds)
+
+
+def set_dimensions(**dimensions: str) -> None:
+    """Set dimensions of the current invocation. Does nothing outside of one."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.dimensions.update(dimensions)
+
+
+def set_properties(**properties: str | int) -> None:
+    """Set properties of the current invocation. Does nothing outside of one."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.properties.update(properties)
@@ -0,0 +1,140 @@
+"""Warm-up of the work a cold container otherwise does on its first request.
+
+Validation and serialization run once on canned payloads, and every AWS client
+makes one call that is answered in-process: botocore loads the service model,
+resolves the endpoint and builds the signer and the response parser without
+sending anything. No connection is left open and nothing depends on the
+request, so priming during init is safe to snapshot and restore (SnapStart).
+"""
+
+import json
+from contextlib import contextmanager
+from typing import Any, Final, Generator, Iterator
+from logging import getLogger
+
+from typedefs.enums import InteractionCallbackType
+from typedefs.models import (
+    AutocompleteCallbackData,
+    CommandChoice,
+    DiscordInteractionResponse,
+    InteractionCallbackData,
+    InteractionRequestBody,
+    InteractionResponseBody,
+)
+from utils.runtime import RuntimeContext
+from utils.serialize import dump_proxy_response
+from utils.verify import deserialize
+
+# An application command as Discord sends it, trimmed to the declared fields.
+PRIME_REQUEST_BODY: Final[str] = json.dumps(
+    {
+        "id": "0",
+        "application_id": "0",
+        "channel_id": "0",
+        "guild_id": "0",
+        "token": "prime",
+        "type": 2,
+        "data": {
+            "id": "0",
+            "name": "be",
+            "type": 1,
+            "options": [{"name": "action", "type": 3, "value": "status"}],
+        },
+    }
+)
+# Answers to the priming calls, by operation.
+EMPTY_DESCRIBE_INSTANCES: Final[bytes] = (
+    b'<DescribeInstancesResponse xmlns="http://ec2.amazonaws.com/doc/2016-11-15/">'
+    b"<reservationSet/></DescribeInstancesResponse>"
+)
+EMPTY_GET_ITEM: Final[bytes] = b"{}"
+
+logger = getLogger(__name__)
+
+
+class _CannedBody:
+    """The raw response body botocore reads a canned answer from."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def stream(self, **kwargs: Any) -> Iterator[bytes]:
+        yield self.content
+
+
+@contextmanager
+def answered_locally(
+    aws_client: Any, operation_name: str, content: bytes
+) -> Generator[None, None, None]:
+    """Answer calls of the operation with content instead of sending them."""
+    from botocore.awsrequest import AWSResponse  # type: ignore
+
+    def answer(request: Any, **kwargs: Any) -> Any:
+        return AWSResponse(request.url, 200, {}, _CannedBody(content))
+
+    service = aws_client.meta.service_model.service_id.hyphenize()
+    event_name = f"before-send.{service}.{operation_name}"
+    aws_client.meta.events.register_first(event_name, answer, unique_id="prime")
+    try:
+        yield
+    finally:
+        aws_client.meta.events.unregister(event_name, unique_id="prime")
+
+
+def prime_models() -> None:
+    """Validate a request and serialize the responses once."""
+    deserialize(PRIME_REQUEST_BODY, InteractionRequestBody)
+    for data in (
+        InteractionCallbackData(content="prime"),
+        AutocompleteCallbackData(choices=[CommandChoice(name="be", value="be")]),
+    ):
+        dump_proxy_response(
+            DiscordInteractionResponse(
+                body=InteractionResponseBody(
+                    type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+                    data=data,
+                )
+            )
+        )
+
+
+def prime_clients(runtime: RuntimeContext) -> None:
+    """Build the EC2 and store clients and make one local call with each."""
+    clients: dict[int, tuple[Any, list[str]]] = {}
+    for instance in runtime.fleet.instances.values():
+        ids = clients.setdefault(id(instance.client), (instance.client, []))[1]
+        ids.append(instance.instance_id)
+    for ec2_client, instance_ids in clients.values():
+        with answered_locally(
+            ec2_client, "DescribeInstances", EMPTY_DESCRIBE_INSTANCES
+        ):
+            ec2_client.describe_instances(InstanceIds=instance_ids)
+
+    store_client = getattr(runtime.store, "client", None)
+    if store_client is not None:
+        with answered_locally(store_client, "GetItem", EMPTY_GET_ITEM):
+            runtime.store.get("prime")
+
+
+def prime_status(runtime: RuntimeContext) -> None:
+    """Load the status sources. Their threads and sockets start on first use."""
+    runtime.bedrock
+    runtime.status_aggregator
+
+
+def prime(runtime: RuntimeContext) -> None:
+    """Do the first-request work of the command handler ahead of time.
+
+    Priming only saves time; a failure is logged and left to the first request
+    to run into again.
+    """
+    for step in (
+        lambda: runtime.verify_key,
+        prime_models,
+        lambda: prime_clients(runtime),
+        lambda: prime_status(runtime),
+    ):
+        try:
+            step()
+        except Exception:
+            logger.warning("Priming failed", exc_info=True)
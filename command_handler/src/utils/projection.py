@@ -0,0 +1,143 @@
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Final, Optional, TypedDict
+from logging import getLogger
+
+from utils.messages import UNKNOWN_STATUS
+from utils.store import KeyValueStore
+
+if TYPE_CHECKING:
+    from utils.ec2 import InstanceStatus
+
+STATE_CHANGE_DETAIL_TYPE: Final[str] = "EC2 Instance State-change Notification"
+# Conditional writes of one notification before giving up (and being retried)
+MAX_APPLY_ATTEMPTS: Final[int] = 5
+
+logger = getLogger(__name__)
+
+
+class StateChange(TypedDict):
+    instance_id: str
+    state_name: str
+    # Unix time of the change, as stamped by EC2
+    changed_at: float
+
+
+class InstanceRecord(TypedDict):
+    state_name: str
+    changed_at: float
+    # The instance as last described (IP, launch time, type)
+    status: "InstanceStatus"
+    # When the instance last entered each state
+    transitions: dict[str, float]
+
+
+def state_key(instance_id: str) -> str:
+    return f"instance-state#{instance_id}"
+
+
+def parse_state_change(event: dict[str, Any]) -> StateChange:
+    """Read an EventBridge "EC2 Instance State-change Notification"."""
+    if event.get("detail-type") != STATE_CHANGE_DETAIL_TYPE:
+        raise ValueError(f'Not an EC2 state change: {event.get("detail-type")=}')
+    detail = event["detail"]
+    return StateChange(
+        instance_id=detail["instance-id"],
+        state_name=detail["state"],
+        changed_at=datetime.fromisoformat(event["time"]).timestamp(),
+    )
+
+
+def boot_seconds(record: InstanceRecord) -> Optional[float]:
+    """Seconds from pending to running of the last boot, if it completed."""
+    pending = record["transitions"].get("pending")
+    running = record["transitions"].get("running")
+    if pending is None or running is None or running < pending:
+        return None
+    return running - pending
+
+
+def merge(
+    record: Optional[InstanceRecord],
+    change: StateChange,
+    status: Optional["InstanceStatus"],
+) -> Optional[InstanceRecord]:
+    """The entry with the change applied, None if the change adds nothing."""
+    state_name, changed_at = change["state_name"], change["changed_at"]
+    transitions = dict(record["transitions"]) if record else {}
+    if transitions.get(state_name, 0.0) < changed_at:
+        transitions[state_name] = changed_at
+
+    if record is not None and record["changed_at"] > changed_at:
+        logger.info("Late state change: %s", change)
+        if record["transitions"] == transitions:
+            return None
+        return {**record, "transitions": transitions}
+    described = status or (record["status"] if record else UNKNOWN_STATUS)
+    return InstanceRecord(
+        state_name=state_name,
+        changed_at=changed_at,
+        status={
+            "state_name": state_name,
+            "public_ip_address": described["public_ip_address"],
+            "launch_time": described["launch_time"],
+            "instance_type": described["instance_type"],
+        },
+        transitions=transitions,
+    )
+
+
+class StateProjection:
+    """Latest state of each instance, one store entry per instance.
+
+    The projector applies EC2 state-change notifications as they arrive, so a
+    status lookup is a single key read instead of a DescribeInstances call.
+    Notifications are not delivered in order: one older than the stored state
+    only records its transition time. Notifications of one instance can also be
+    handled concurrently (pending and running come seconds apart), so an entry
+    is only rewritten if it still holds what was read, and re-read otherwise.
+    """
+
+    def __init__(self, store: KeyValueStore):
+        self.store = store
+
+    def get(self, instance_id: str) -> Optional[InstanceRecord]:
+        value = self.store.get(state_key(instance_id))
+        return None if value is None else json.loads(value)
+
+    def apply(
+        self, change: StateChange, status: Optional["InstanceStatus"] = None
+    ) -> InstanceRecord:
+        """Record a state change and return the resulting entry.
+
+        status is the instance as described when the change was handled. Without
+        it, the last described one is kept. Raises RuntimeError if the entry keeps
+        being changed concurrently.
+        """
+        key = state_key(change["instance_id"])
+        for _ in range(MAX_APPLY_ATTEMPTS):
+            current = self.store.get(key)
+            record = None if current is None else json.loads(current)
+            updated = merge(record, change, status)
+            if updated is None:
+                return record  # type: ignore[return-value]
+            value = json.dumps(updated, separators=(",", ":"))
+            if current is None:
+                stored = self.store.put_if_absent(key, value)
+            else:
+                stored = self.store.put_if_equal(key, value, current)
+            if stored:
+                return updated
+            logger.info("Concurrent state change, retrying: %s", change)
+        raise RuntimeError(f"State entry kept changing: {change=}")
+
+    def status(self, instance_id: str) -> Optional["InstanceStatus"]:
+        """The projected status of the instance, None if nothing was recorded."""
+        record = self.get(instance_id)
+        if record is None:
+            return None
+        status = record["status"]
+        booted = boot_seconds(record)
+        if record["state_name"] == "running" and booted is not None:
+            status["boot_seconds"] = booted
+        return status
@@ -0,0 +1,112 @@
+import socket
+import time
+from typing import TYPE_CHECKING, Callable, Final, Optional, TypedDict
+from logging import getLogger
+
+from utils.bedrock import parse_pong, unconnected_ping
+
+if TYPE_CHECKING:
+    from utils.ec2 import Ec2Instance
+
+logger = getLogger(__name__)
+
+# States from which an instance may still become running
+STARTING_STATES: Final[frozenset[str]] = frozenset({"pending", "running"})
+
+
+def udp_probe(host: str, port: int, timeout: float) -> bool:
+    """Whether the server answers an unconnected ping within timeout seconds.
+
+    Only a pong to this ping counts: other datagrams from the port are ignored.
+    """
+    deadline = time.monotonic() + timeout
+    timestamp_ms = int(time.time() * 1000)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            # Connected, so that an ICMP port unreachable fails fast.
+            sock.connect((host, port))
+            sock.send(unconnected_ping(timestamp_ms))
+            while (remaining := deadline - time.monotonic()) > 0:
+                sock.settimeout(remaining)
+                data = sock.recv(2048)
+                try:
+                    parse_pong(data, timestamp_ms)
+                    return True
+                except ValueError as e:
+                    logger.debug("Ignored datagram from %s:%s: %s", host, port, e)
+        except OSError:
+            pass
+    return False
+
+
+class Readiness(TypedDict):
+    ready: bool
+    state_name: str
+    # "ip:port" of the server once it has a public IP
+    address: Optional[str]
+    attempts: int
+    elapsed: float
+
+
+class ReadinessTracker:
+    """Polls a starting server until it is running and answers on its UDP port.
+
+    The instance state is described afresh on every attempt. Attempts are spaced by
+    an exponential backoff capped at max_delay, and polling stops at the deadline
+    or as soon as the instance leaves the pending/running states.
+    """
+
+    def __init__(
+        self,
+        instance: "Ec2Instance",
+        port: int,
+        probe: Callable[[str, int, float], bool] = udp_probe,
+        initial_delay: float = 2.0,
+        max_delay: float = 15.0,
+        multiplier: float = 2.0,
+        probe_timeout: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.instance = instance
+        self.port = port
+        self.probe = probe
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        self.sleep = sleep
+
+    def wait(self, timeout: float) -> Readiness:
+        """Poll for at most timeout seconds and return the last observation."""
+        start = self.clock()
+        deadline = start + timeout
+        delay = self.initial_delay
+        attempts = 0
+        while True:
+            attempts += 1
+            status = self.instance.refresh()
+            state_name = status["state_name"]
+            ip = status["public_ip_address"]
+            address = f"{ip}:{self.port}" if ip else None
+            ready = False
+            if state_name == "running" and ip is not None:
+                # The probe never runs past the deadline (by more than 10ms).
+                remaining = max(deadline - self.clock(), 0.01)
+                ready = self.probe(ip, self.port, min(self.probe_timeout, remaining))
+            if ready or state_name not in STARTING_STATES:
+                break
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            logger.debug("Not ready yet: %s, retrying in %.1fs", state_name, delay)
+            self.sleep(min(delay, remaining))
+            delay = min(delay * self.multiplier, self.max_delay)
+        return Readiness(
+            ready=ready,
+            state_name=state_name,
+            address=address,
+            attempts=attempts,
+            elapsed=self.clock() - start,
+        )
@@ -0,0 +1,191 @@
+from typing import Any, Callable, NamedTuple, Optional
+from logging import getLogger
+
+from typedefs.enums import CommandOptionType, InteractionCommandType
+from typedefs.exceptions import BadRequest, InvalidOption
+from typedefs.models import (
+    CommandChoice,
+    DiscordInteractionResponse,
+    InteractionCommandData,
+    InteractionRequestBody,
+)
+from utils.autocomplete import PrefixIndex, choices_index
+from utils.runtime import RuntimeContext
+
+logger = getLogger(__name__)
+
+
+class CommandContext(NamedTuple):
+    """What a command handler gets to work with."""
+
+    runtime: RuntimeContext
+    body: InteractionRequestBody
+    options: dict[str, str]
+
+
+CommandHandler = Callable[[CommandContext], DiscordInteractionResponse]
+# Choices for the partial value of the focused option
+Completer = Callable[[CommandContext, str], list[CommandChoice]]
+
+
+class OptionSpec(NamedTuple):
+    name: str
+    description: str
+    required: bool = True
+    type: CommandOptionType = CommandOptionType.STRING
+    autocomplete: bool = False
+
+    def payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "type": int(self.type),
+            "name": self.name,
+            "description": self.description,
+            "required": self.required,
+        }
+        if self.autocomplete:
+            payload["autocomplete"] = True
+        return payload
+
+
+class Command:
+    """A slash command routed on the value of one string option."""
+
+    def __init__(
+        self,
+        registry: "CommandRegistry",
+        name: str,
+        description: str,
+        route: OptionSpec,
+        options: list[OptionSpec],
+    ):
+        self.registry = registry
+        self.name = name
+        self.description = description
+        self.route = route
+        self.options = options
+        self.choices: list[str] = []
+        self.completers: dict[str, Completer] = {}
+        self._choices_index: Optional[PrefixIndex] = None
+
+    def choice(self, value: str) -> Callable[[CommandHandler], CommandHandler]:
+        """Register the handler for one choice of the route option."""
+
+        def decorator(handler: CommandHandler) -> CommandHandler:
+            self.choices.append(value)
+            self._choices_index = None
+            self.registry._add_route(self, value, handler)
+            return handler
+
+        return decorator
+
+    def completer(self, option: str) -> Callable[[Completer], Completer]:
+        """Register the autocomplete of an option other than the route option."""
+
+        def decorator(completer: Completer) -> Completer:
+            if option in self.completers:
+                raise ValueError(f"Completer is already registered: {option}")
+            self.completers[option] = completer
+            return completer
+
+        return decorator
+
+    def complete_route(self, ctx: CommandContext, value: str) -> list[CommandChoice]:
+        """Autocomplete of the route option from the registered choices."""
+        if self._choices_index is None:
+            self._choices_index = choices_index(self.choices)
+        return self._choices_index.search(value)
+
+    def payload(self) -> dict[str, Any]:
+        """Definition of the command in the ApplicationCommandPayload format."""
+        route = self.route.payload()
+        if not self.route.autocomplete:
+            # Discord does not allow choices on an autocomplete option.
+            route["choices"] = [{"name": c, "value": c} for c in self.choices]
+        return {
+            "type": int(InteractionCommandType.CHAT_INTPUT),
+            "name": self.name,
+            "description": self.description,
+            "options": [route, *(o.payload() for o in self.options)],
+        }
+
+
+class CommandRegistry:
+    """Commands declared once, shared by the handler and the registration tool.
+
+    Registering a choice also fills a lookup table keyed by (command name, route
+    option value), so dispatch is a single dict access.
+    """
+
+    def __init__(self) -> None:
+        self.commands: dict[str, Command] = {}
+        self._routes: dict[tuple[str, str], CommandHandler] = {}
+
+    def command(
+        self,
+        name: str,
+        description: str,
+        route: OptionSpec,
+        options: Optional[list[OptionSpec]] = None,
+    ) -> Command:
+        if name in self.commands:
+            raise ValueError(f"Command is already registered: {name}")
+        command = Command(self, name, description, route, options or [])
+        self.commands[name] = command
+        return command
+
+    def _add_route(self, command: Command, value: str, handler: CommandHandler):
+        key = (command.name, value)
+        if key in self._routes:
+            raise ValueError(f"Choice is already registered: {key}")
+        self._routes[key] = handler
+
+    def resolve(
+        self, data: InteractionCommandData | None
+    ) -> tuple[CommandHandler, dict[str, str]]:
+        """Return the handler and the options of the command data."""
+        command = self.commands.get(data.name) if data else None
+        if not data or not command or not data.options:
+            raise BadRequest(f"Command is invalid: {data=}")
+        options = {o.name: o.value for o in data.options}
+        if len(options) != len(data.options) or not options.keys() <= {
+            command.route.name,
+            *(o.name for o in command.options),
+        }:
+            raise BadRequest(f"Command options are invalid: {data=}")
+        value = options.get(command.route.name)
+        if value is None:
+            raise BadRequest(f"Command choice is missing: {data=}")
+        handler = self._routes.get((command.name, value))
+        if handler is None:
+            # Typed by the user: the route option autocompletes, it has no choices.
+            raise InvalidOption(command.route.name, value, command.choices)
+        return handler, options
+
+    def complete(
+        self, data: InteractionCommandData | None
+    ) -> tuple[Command, Completer, dict[str, str], str]:
+        """Find the completer of the focused option of an autocomplete interaction.
+
+        Returns the command, the completer, the options typed so far and the
+        partial value of the focused option.
+        """
+        command = self.commands.get(data.name) if data else None
+        if not data or not command or not data.options:
+            raise BadRequest(f"Autocomplete is invalid: {data=}")
+        focused = [o for o in data.options if o.focused]
+        if len(focused) != 1:
+            raise BadRequest(f"Autocomplete focus is invalid: {data=}")
+        option = focused[0]
+        completer = (
+            command.complete_route
+            if option.name == command.route.name
+            else command.completers.get(option.name)
+        )
+        if completer is None:
+            raise BadRequest(f"Option has no autocomplete: {data=}")
+        options = {o.name: o.value for o in data.options}
+        return command, completer, options, option.value
+
+    def payloads(self) -> list[dict[str, Any]]:
+        """Definitions of every registered command."""
+        return [command.payload() for command in self.commands.values()]
@@ -0,0 +1,51 @@
+from time import time
+from typing import Final
+from logging import getLogger
+
+from typedefs.exceptions import BadRequest
+from utils.store import KeyValueStore, MemoryStore
+
+DEFAULT_DEDUP_TTL: Final[float] = 900.0
+DEFAULT_DEDUP_MAX_ENTRIES: Final[int] = 1024
+
+logger = getLogger(__name__)
+
+
+def check_timestamp(timestamp: str, max_age: float, now: float | None = None) -> None:
+    """Reject signature timestamps (unix seconds) outside the allowed window."""
+    now = time() if now is None else now
+    try:
+        age = now - int(timestamp)
+    except ValueError:
+        raise BadRequest(f"Invalid signature timestamp: {timestamp=}")
+    if abs(age) > max_age:
+        raise BadRequest(f"Signature timestamp is out of window: {age=}")
+
+
+class InteractionDeduplicator:
+    """Remembers recently seen interaction ids.
+
+    A bounded in-process LRU answers retries that reach the same container. The
+    optional shared store catches retries delivered to another container.
+    """
+
+    def __init__(
+        self,
+        shared: KeyValueStore | None = None,
+        ttl: float = DEFAULT_DEDUP_TTL,
+        max_entries: int = DEFAULT_DEDUP_MAX_ENTRIES,
+    ):
+        self.local = MemoryStore(max_entries)
+        self.shared = shared
+        self.ttl = ttl
+
+    def first_delivery(self, interaction_id: str) -> bool:
+        """Record the interaction id. Return False if it was already seen."""
+        key = f"interaction#{interaction_id}"
+        if not self.local.put_if_absent(key, "1", self.ttl):
+            return False
+        if self.shared is not None and not self.shared.put_if_absent(
+            key, "1", self.ttl
+        ):
+            return False
+        return True
@@ -0,0 +1,76 @@
+from typing import Any
+
+from typedefs.enums import InteractionCallbackType, MessageFlags
+from typedefs.models import (
+    DiscordInteractionResponse,
+    InteractionCallbackData,
+    InteractionResponseBody,
+)
+from utils.messages import (
+    BAD_REQUEST_CONTENT,
+    DUPLICATE_CONTENT,
+    TECHNICAL_ERROR_CONTENT,
+)
+
+
+class PreparedResponse:
+    """A constant proxy response serialized once.
+
+    The body string is encoded when the module is imported, so returning it costs
+    a dict copy instead of building and dumping the pydantic models again.
+    """
+
+    __slots__ = ("name", "_proxy_response")
+
+    def __init__(self, name: str, response: DiscordInteractionResponse):
+        self.name = name
+        self._proxy_response = response.to_dict()
+
+    def to_dict(self) -> dict[str, Any]:
+        # Shallow copies: the runtime may add to the dict it is given.
+        proxy_response = dict(self._proxy_response)
+        proxy_response["headers"] = dict(proxy_response["headers"])
+        return proxy_response
+
+    def __repr__(self) -> str:
+        return f"PreparedResponse({self.name})"
+
+
+PONG_RESPONSE = PreparedResponse(
+    "PONG",
+    DiscordInteractionResponse(
+        body=InteractionResponseBody(type=InteractionCallbackType.PONG)
+    ),
+)
+BAD_REQUEST_RESPONSE = PreparedResponse(
+    "BAD_REQUEST",
+    DiscordInteractionResponse(
+        statusCode=401,
+        body=InteractionResponseBody(
+            type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+            data=InteractionCallbackData(content=BAD_REQUEST_CONTENT),
+        ),
+    ),
+)
+TECHNICAL_ERROR_RESPONSE = PreparedResponse(
+    "TECHNICAL_ERROR",
+    DiscordInteractionResponse(
+        statusCode=200,
+        body=InteractionResponseBody(
+            type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+            data=InteractionCallbackData(content=TECHNICAL_ERROR_CONTENT),
+        ),
+    ),
+)
+DUPLICATE_RESPONSE = PreparedResponse(
+    "DUPLICATE",
+    DiscordInteractionResponse(
+        body=InteractionResponseBody(
+            type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+            data=InteractionCallbackData(
+                content=DUPLICATE_CONTENT,
+                flags=MessageFlags.EPHEMERAL,
+            ),
+        )
+    ),
+)
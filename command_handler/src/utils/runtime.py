@@ -0,0 +1,239 @@
+from functools import cached_property
+from os import environ
+from typing import TYPE_CHECKING, Final, Mapping
+from nacl.signing import VerifyKey
+from pydantic import TypeAdapter
+from logging import getLogger
+
+from typedefs.exceptions import InvalidOption
+from typedefs.models import ServerConfig
+from utils.replay import DEFAULT_DEDUP_TTL, InteractionDeduplicator
+from utils.store import DEFAULT_STORE_URL, KeyValueStore, open_store
+
+if TYPE_CHECKING:
+    from utils.autocomplete import PrefixIndex
+    from utils.bedrock import BedrockQuery, BedrockStatus
+    from utils.cloudwatch import CpuMetrics
+    from utils.ec2 import Ec2Fleet, Ec2Instance, InstanceStatus
+    from utils.projection import StateProjection
+    from utils.status import SourceResult, StatusAggregator
+
+# Name of the server configured by SERVER_INSTANCE_ID/SERVER_REGION_NAME
+DEFAULT_SERVER_NAME: Final[str] = "be"
+
+logger = getLogger(__name__)
+
+_servers_adapter = TypeAdapter(dict[str, ServerConfig])
+
+
+def load_servers(env: Mapping[str, str]) -> dict[str, ServerConfig]:
+    """Read the server fleet from SERVERS (JSON object of name to config).
+
+    Without SERVERS, the single server of SERVER_INSTANCE_ID/SERVER_REGION_NAME
+    is used.
+    """
+    if env.get("SERVERS"):
+        return _servers_adapter.validate_json(env["SERVERS"])
+    return {
+        DEFAULT_SERVER_NAME: ServerConfig(
+            instance_id=env["SERVER_INSTANCE_ID"],
+            region_name=env["SERVER_REGION_NAME"],
+        )
+    }
+
+
+class RuntimeContext:
+    """Process-level objects reused across warm invocations.
+
+    Environment variables are read once when the context is built. The verify key,
+    the server config and the EC2 wrappers (and their boto3 clients) are created on
+    first use, so entry points that do not need them never pay for them.
+    """
+
+    def __init__(self, env: Mapping[str, str]):
+        self.env = env
+        self.deferred_worker_function = env.get("DEFERRED_WORKER_FUNCTION") or None
+        self.discord_api_base_url = env.get("DISCORD_API_BASE_URL") or None
+        self.status_cache_ttl = (
+            float(env["STATUS_CACHE_TTL"]) if env.get("STATUS_CACHE_TTL") else None
+        )
+        self.signature_max_age = (
+            float(env["SIGNATURE_MAX_AGE"]) if env.get("SIGNATURE_MAX_AGE") else None
+        )
+        self.dedup_ttl = float(env.get("DEDUP_TTL") or DEFAULT_DEDUP_TTL)
+        self.bedrock_query_timeout = (
+            float(env["BEDROCK_QUERY_TIMEOUT"])
+            if env.get("BEDROCK_QUERY_TIMEOUT")
+            else None
+        )
+        self.bedrock_query_ttl = (
+            float(env["BEDROCK_QUERY_TTL"]) if env.get("BEDROCK_QUERY_TTL") else None
+        )
+        # Consecutive empty checks after which the scheduler stops a server
+        self.idle_stop_checks = (
+            int(env["IDLE_STOP_CHECKS"]) if env.get("IDLE_STOP_CHECKS") else None
+        )
+        # Seconds the worker waits for started servers to become joinable
+        self.ready_timeout = (
+            float(env["READY_TIMEOUT"]) if env.get("READY_TIMEOUT") else None
+        )
+        # Whether status replies include the CPU utilization from CloudWatch
+        self.status_cpu_metrics = env.get("STATUS_CPU_METRICS") == "true"
+        self.store_url = env.get("STORE_URL") or DEFAULT_STORE_URL
+        # Whether statuses are read from the state projection kept by the projector
+        self.projected_status = env.get("PROJECTED_STATUS") == "true"
+
+    @cached_property
+    def verify_key(self) -> VerifyKey:
+        return VerifyKey(bytes.fromhex(self.env["APP_PUBLIC_KEY"]))
+
+    @cached_property
+    def servers(self) -> dict[str, ServerConfig]:
+        return load_servers(self.env)
+
+    @cached_property
+    def server_aliases(self) -> dict[str, str]:
+        """Server name by alias."""
+        return {
+            alias: name
+            for name, server in self.servers.items()
+            for alias in server.aliases
+        }
+
+    @cached_property
+    def server_index(self) -> "PrefixIndex":
+        """Autocomplete of the server option, built from the config on first use.
+
+        The config is read once per runtime context, so the index is current for
+        as long as the context is.
+        """
+        from utils.autocomplete import servers_index
+
+        return servers_index(self.servers)
+
+    @property
+    def default_server(self) -> str:
+        """The server that start/stop act on when no server is given."""
+        return next(iter(self.servers))
+
+    @cached_property
+    def store(self) -> KeyValueStore:
+        return open_store(self.store_url)
+
+    @cached_property
+    def deduplicator(self) -> InteractionDeduplicator:
+        # The local LRU already covers the in-memory store.
+        shared = None if self.store_url == DEFAULT_STORE_URL else self.store
+        return InteractionDeduplicator(shared=shared, ttl=self.dedup_ttl)
+
+    @cached_property
+    def fleet(self) -> "Ec2Fleet":
+        # Imported here so that PING requests never load boto3.
+        from utils.coalesce import StateChangeCoalescer
+        from utils.ec2 import DEFAULT_STATUS_TTL, Ec2Fleet
+
+        return Ec2Fleet(
+            self.servers,
+            status_ttl=self.status_cache_ttl or DEFAULT_STATUS_TTL,
+            # Concurrent start/stop of a server share one EC2 call.
+            coalescer=StateChangeCoalescer(self.store),
+            projection=self.state_projection if self.projected_status else None,
+        )
+
+    @cached_property
+    def state_projection(self) -> "StateProjection":
+        from utils.projection import StateProjection
+
+        return StateProjection(self.store)
+
+    @cached_property
+    def bedrock(self) -> "BedrockQuery":
+        # Imported here so that PING requests never load asyncio.
+        from utils.bedrock import DEFAULT_QUERY_TIMEOUT, DEFAULT_QUERY_TTL, BedrockQuery
+
+        return BedrockQuery(
+            timeout=self.bedrock_query_timeout or DEFAULT_QUERY_TIMEOUT,
+            # 0 disables the cache.
+            ttl=(
+                DEFAULT_QUERY_TTL
+                if self.bedrock_query_ttl is None
+                else self.bedrock_query_ttl
+            ),
+        )
+
+    @cached_property
+    def cpu_metrics(self) -> "CpuMetrics":
+        from utils.cloudwatch import CpuMetrics
+
+        return CpuMetrics(self.servers)
+
+    @cached_property
+    def status_aggregator(self) -> "StatusAggregator":
+        from utils.status import StatusAggregator
+
+        return StatusAggregator()
+
+    def live_status(
+        self, statuses: dict[str, "InstanceStatus"]
+    ) -> dict[str, "BedrockStatus"]:
+        """Ask the running servers themselves for their version and players."""
+        addresses = {
+            name: (ip, self.servers[name].port)
+            for name, status in statuses.items()
+            if status["state_name"] == "running" and (ip := status["public_ip_address"])
+        }
+        if not addresses:
+            return {}
+        results = self.bedrock.status_many(list(addresses.values()))
+        return dict(zip(addresses, results))
+
+    def gather_status(self, names: list[str]) -> dict[str, "SourceResult"]:
+        """EC2 state, live query and CPU of the servers, gathered concurrently.
+
+        The live query waits on the EC2 describe for the addresses, while the CPU
+        metrics (when enabled) run alongside both.
+        """
+        gathering = self.status_aggregator.gather()
+        gathering.submit("ec2", lambda: self.fleet.status(names))
+        gathering.submit("bedrock", lambda: self.live_status(gathering.wait("ec2")))
+        if self.status_cpu_metrics:
+            gathering.submit("cpu", lambda: self.cpu_metrics.utilization(names))
+        return gathering.results(names)
+
+    @property
+    def server_instance(self) -> "Ec2Instance":
+        return self.fleet.instances[self.default_server]
+
+    def resolve_servers(self, server: str | None, default_all: bool) -> list[str]:
+        """Names of the servers a command targets.
+
+        "all" targets every server, and aliases target the server they name.
+        Without a server, either every server or the default server is targeted.
+        """
+        if server == "all" or (server is None and default_all):
+            return list(self.servers)
+        if server is None:
+            return [self.default_server]
+        if server in self.servers:
+            return [server]
+        if server in self.server_aliases:
+            return [self.server_aliases[server]]
+        raise InvalidOption("server", server, [*self.servers, "all"])
+
+
+_runtime: RuntimeContext | None = None
+
+
+def get_runtime() -> RuntimeContext:
+    """Return the runtime context, building it on the first call."""
+    global _runtime
+    if _runtime is None:
+        _runtime = RuntimeContext(dict(environ))
+        logger.debug("Runtime context initialized")
+    return _runtime
+
+
+def reset_runtime() -> None:
+    """Drop the cached runtime context. Intended for tests."""
+    global _runtime
+    _runtime = None
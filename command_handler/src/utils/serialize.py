@@ -0,0 +1,23 @@
+from typing import Any
+
+from typedefs.models import ApiProxyResponse
+
+
+def dump_proxy_response(response: ApiProxyResponse[Any]) -> dict[str, Any]:
+    """Serialize a proxy response, producing the same output as ``to_dict``.
+
+    ``to_dict`` dumps the envelope with ``model_dump`` and the body with
+    ``model_dump_json``. The envelope fields are plain values, so they are copied
+    directly and only the body goes through its pydantic-core serializer.
+    """
+    body = response.body
+    return {
+        "statusCode": response.statusCode,
+        "headers": dict(response.headers),
+        "body": (
+            None
+            if body is None
+            else body.__pydantic_serializer__.to_json(body, exclude_none=True).decode()
+        ),
+        "isBase64Encoded": False,
+    }
@@ -0,0 +1,136 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Final, Literal, Mapping, Optional, TypedDict
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+# Seconds from the start of a reply by which each source must have answered.
+# Together they stay well within the 3 second function timeout. The Bedrock
+# deadline includes the EC2 describe the query waits on for the addresses.
+DEFAULT_SOURCE_TIMEOUTS: Final[Mapping[str, float]] = {
+    "ec2": 1.5,
+    "bedrock": 2.2,
+    "cpu": 1.5,
+}
+DEFAULT_MAX_WORKERS: Final[int] = 8
+
+Freshness = Literal["fresh", "stale", "unavailable"]
+
+
+class SourceResult(TypedDict):
+    # Values by server name. Servers without any value are missing.
+    values: dict[str, Any]
+    freshness: Freshness
+    # Seconds from the start of the reply until the source answered or failed
+    elapsed: float
+
+
+class SourceUnavailable(Exception):
+    """A source this one waits on failed or missed its deadline."""
+
+
+class Gathering:
+    """The sources of one reply, started as they are submitted."""
+
+    def __init__(
+        self,
+        aggregator: "StatusAggregator",
+        timeouts: Mapping[str, float],
+    ):
+        self.aggregator = aggregator
+        self.timeouts = timeouts
+        self.start = aggregator.clock()
+        self.futures: dict[str, Future[dict[str, Any]]] = {}
+
+    def _remaining(self, name: str) -> float:
+        deadline = self.start + self.timeouts[name]
+        return max(deadline - self.aggregator.clock(), 0.0)
+
+    def submit(self, name: str, source: Callable[[], dict[str, Any]]) -> None:
+        """Start a source. It returns its values by server name."""
+        self.futures[name] = self.aggregator._submit(name, source)
+
+    def wait(self, name: str) -> dict[str, Any]:
+        """Values of another source, for a source that depends on them.
+
+        Raises SourceUnavailable when that source fails or misses its deadline.
+        """
+        try:
+            return self.futures[name].result(self._remaining(name))
+        except Exception as e:
+            raise SourceUnavailable(name) from e
+
+    def result(self, name: str, names: list[str]) -> SourceResult:
+        """Values of a source for the given servers, within its deadline.
+
+        On failure or timeout, the last values the source returned for these
+        servers are used instead, marked stale.
+        """
+        try:
+            values = self.futures[name].result(self._remaining(name))
+            freshness: Freshness = "fresh"
+        except Exception as e:
+            logger.warning("Status source %s is unavailable: %r", name, e)
+            values = self.aggregator.last_values(name, names)
+            freshness = "stale" if values else "unavailable"
+        return SourceResult(
+            values=values,
+            freshness=freshness,
+            elapsed=self.aggregator.clock() - self.start,
+        )
+
+    def results(self, names: list[str]) -> dict[str, SourceResult]:
+        """Results of every submitted source, in submission order."""
+        return {name: self.result(name, names) for name in self.futures}
+
+
+class StatusAggregator:
+    """Runs the sources of a status reply concurrently, each within its own deadline.
+
+    A reply is bounded by its slowest deadline instead of the sum of its sources.
+    A source that fails or is late does not fail the reply: it gets the values
+    the source last returned, marked stale, or none, marked unavailable. A late
+    source keeps running in the background and its values are kept for the next
+    reply.
+    """
+
+    def __init__(
+        self,
+        timeouts: Mapping[str, float] = DEFAULT_SOURCE_TIMEOUTS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.timeouts = timeouts
+        self.max_workers = max_workers
+        self.clock = clock
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._last: dict[str, dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def gather(self) -> Gathering:
+        """Start gathering the sources of one reply."""
+        return Gathering(self, self.timeouts)
+
+    def last_values(self, name: str, names: list[str]) -> dict[str, Any]:
+        last = self._last.get(name, {})
+        return {n: last[n] for n in names if n in last}
+
+    def _keep(self, name: str, future: "Future[dict[str, Any]]") -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            self._last.setdefault(name, {}).update(future.result())
+
+    def _submit(
+        self, name: str, source: Callable[[], dict[str, Any]]
+    ) -> "Future[dict[str, Any]]":
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="status"
+                )
+        future = self._executor.submit(source)
+        future.add_done_callback(lambda f: self._keep(name, f))
+        return future
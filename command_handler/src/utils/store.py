@@ -0,0 +1,244 @@
+import math
+import sqlite3
+from collections import OrderedDict
+from threading import Lock
+from time import time
+from typing import Any, Callable, Final, Protocol
+from logging import getLogger
+
+DEFAULT_STORE_URL: Final[str] = "memory://"
+DEFAULT_MAX_ENTRIES: Final[int] = 4096
+
+logger = getLogger(__name__)
+
+
+class KeyValueStore(Protocol):
+    """String key-value store with optional per-entry TTL (seconds).
+
+    Backends shared between Lambda containers (DynamoDB) and local stand-ins
+    (memory, SQLite) implement the same interface.
+    """
+
+    def get(self, key: str) -> str | None: ...
+
+    def put(self, key: str, value: str, ttl: float | None = None) -> None: ...
+
+    def put_if_absent(self, key: str, value: str, ttl: float | None = None) -> bool:
+        """Store the value unless a live entry exists. Return True if stored."""
+        ...
+
+    def put_if_equal(
+        self, key: str, value: str, expected: str, ttl: float | None = None
+    ) -> bool:
+        """Store the value if the live entry holds expected. Return True if stored."""
+        ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class MemoryStore:
+    """In-process store: a bounded LRU with TTL eviction."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time,
+    ):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float | None, str]] = OrderedDict()
+        self._lock = Lock()
+
+    def _live(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and self.clock() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: str, ttl: float | None) -> None:
+        expires_at = None if ttl is None else self.clock() + ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            return self._live(key)
+
+    def put(self, key: str, value: str, ttl: float | None = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def put_if_absent(self, key: str, value: str, ttl: float | None = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def put_if_equal(
+        self, key: str, value: str, expected: str, ttl: float | None = None
+    ) -> bool:
+        with self._lock:
+            if self._live(key) != expected:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteStore:
+    """SQLite-backed store. Local stand-in for a table shared between processes."""
+
+    def __init__(self, path: str, clock: Callable[[], float] = time):
+        self.clock = clock
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv"
+                " (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _expiry(self, ttl: float | None) -> float | None:
+        return None if ttl is None else self.clock() + ttl
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE key = ?"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (key, self.clock()),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, key: str, value: str, ttl: float | None = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, self._expiry(ttl)),
+            )
+
+    def put_if_absent(self, key: str, value: str, ttl: float | None = None) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE"
+                " SET value = excluded.value, expires_at = excluded.expires_at"
+                " WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?",
+                (key, value, self._expiry(ttl), self.clock()),
+            )
+            return cursor.rowcount == 1
+
+    def put_if_equal(
+        self, key: str, value: str, expected: str, ttl: float | None = None
+    ) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE kv SET value = ?, expires_at = ? WHERE key = ? AND value = ?"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (value, self._expiry(ttl), key, expected, self.clock()),
+            )
+            return cursor.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+
+class DynamoDbStore:
+    """DynamoDB-backed store shared between Lambda containers.
+
+    The table needs a string partition key ``pk``. Enable DynamoDB TTL on
+    ``expires_at`` to have expired entries removed; reads ignore them anyway.
+    """
+
+    def __init__(self, table_name: str, clock: Callable[[], float] = time):
+        # Imported here so that only deployments using DynamoDB load boto3.
+        from boto3 import client  # type: ignore
+
+        self.client: Any = client("dynamodb")
+        self.table_name = table_name
+        self.clock = clock
+
+    def _item(self, key: str, value: str, ttl: float | None) -> dict[str, Any]:
+        item: dict[str, Any] = {"pk": {"S": key}, "value": {"S": value}}
+        if ttl is not None:
+            # Whole seconds, rounded up so that no entry expires early.
+            item["expires_at"] = {"N": str(math.ceil(self.clock() + ttl))}
+        return item
+
+    def get(self, key: str) -> str | None:
+        item = self.client.get_item(
+            TableName=self.table_name, Key={"pk": {"S": key}}, ConsistentRead=True
+        ).get("Item")
+        if item is None:
+            return None
+        if "expires_at" in item and float(item["expires_at"]["N"]) <= self.clock():
+            return None
+        return item["value"]["S"]
+
+    def put(self, key: str, value: str, ttl: float | None = None) -> None:
+        self.client.put_item(
+            TableName=self.table_name, Item=self._item(key, value, ttl)
+        )
+
+    def put_if_absent(self, key: str, value: str, ttl: float | None = None) -> bool:
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item=self._item(key, value, ttl),
+                ConditionExpression="attribute_not_exists(pk) OR expires_at <= :now",
+                ExpressionAttributeValues={":now": {"N": str(int(self.clock()))}},
+            )
+            return True
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+    def put_if_equal(
+        self, key: str, value: str, expected: str, ttl: float | None = None
+    ) -> bool:
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item=self._item(key, value, ttl),
+                # "value" is a reserved word in expressions.
+                ConditionExpression="#value = :expected"
+                " AND (attribute_not_exists(expires_at) OR expires_at > :now)",
+                ExpressionAttributeNames={"#value": "value"},
+                ExpressionAttributeValues={
+                    ":expected": {"S": expected},
+                    ":now": {"N": str(int(self.clock()))},
+                },
+            )
+            return True
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+    def delete(self, key: str) -> None:
+        self.client.delete_item(TableName=self.table_name, Key={"pk": {"S": key}})
+
+
+def open_store(url: str = DEFAULT_STORE_URL) -> KeyValueStore:
+    """Open a store from a URL.
+
+    ``memory://``, ``sqlite:///path/to/file.db`` (or ``sqlite://:memory:``) and
+    ``dynamodb://table-name`` are supported.
+    """
+    scheme, _, location = url.partition("://")
+    if scheme == "memory":
+        return MemoryStore()
+    elif scheme == "sqlite":
+        return SqliteStore(location or ":memory:")
+    elif scheme == "dynamodb":
+        return DynamoDbStore(location)
+    raise ValueError(f"Unsupported store URL: {url}")
@@ -5,18 +5,33 @@ from pydantic import BaseModel, ValidationError
 from logging import getLogger
 
 from typedefs.exceptions import BadRequest
+from utils.replay import check_timestamp
 
 ModelT = TypeVar("ModelT", bound=BaseModel)
 logger = getLogger(__name__)
 
 
 def deserialize(json_text: str, Model: type[ModelT]) -> ModelT:
+    """Validate the JSON text in a single pass.
+
+    Keys that Model does not declare (``extra: ignore``) are skipped by the JSON
+    parser without being turned into Python objects, so the bulky parts of an
+    interaction payload cost little beyond scanning. See benchmark/bench_parse.py.
+    """
     return Model.model_validate_json(json_text)
 
 
 def get_verified(
-    event: dict[str, Any], verify_key: VerifyKey, Model: type[ModelT]
+    event: dict[str, Any],
+    verify_key: VerifyKey,
+    Model: type[ModelT],
+    max_age: float | None = None,
 ) -> ModelT:
+    """Verify the signature of the event and deserialize its body.
+
+    When max_age is given, signatures older (or newer) than max_age seconds are
+    rejected to prevent replays.
+    """
     try:
 
         # proxy_event = APIGatewayProxyEventV2(event)
@@ -32,6 +47,8 @@ def get_verified(
         timestamp = headers["x-signature-timestamp"]
         # Verify the signature here.
         verify_key.verify(f"{timestamp}{body}".encode(), bytes.fromhex(signature))
+        if max_age is not None:
+            check_timestamp(timestamp, max_age)
         return deserialize(body, Model)
 
     except (KeyError, ValueError, TypeError, BadSignatureError, ValidationError) as e:
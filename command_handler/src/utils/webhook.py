@@ -0,0 +1,68 @@
+from typing import Final
+from logging import getLogger
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+from typedefs.models import InteractionCallbackData
+
+DISCORD_API_BASE_URL: Final[str] = "https://discord.com/api/v10"
+REQUEST_TIMEOUT: Final[float] = 5.0
+
+logger = getLogger(__name__)
+
+_session: Session | None = None
+
+
+def get_session() -> Session:
+    """Return the process-wide HTTP session.
+
+    The session keeps connections to the Discord API alive across warm invocations.
+    """
+    global _session
+    if _session is None:
+        _session = Session()
+        _session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        _session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        _session.headers.update({"Content-Type": "application/json"})
+    return _session
+
+
+class InteractionWebhook:
+    """Client for the interaction webhook of a single interaction token."""
+
+    def __init__(
+        self,
+        application_id: str,
+        token: str,
+        base_url: str | None = None,
+        session: Session | None = None,
+    ):
+        base_url = base_url or DISCORD_API_BASE_URL
+        self.url = f"{base_url.rstrip('/')}/webhooks/{application_id}/{token}"
+        self.session = session or get_session()
+
+    def edit_original(self, data: InteractionCallbackData) -> None:
+        """Replace the deferred ("thinking...") response with the given message."""
+        res = self.session.patch(
+            f"{self.url}/messages/@original",
+            data=data.model_dump_json(exclude_none=True),
+            timeout=REQUEST_TIMEOUT,
+        )
+        if not res.ok:
+            logger.error(
+                "Failed to edit original response: res.status_code=%r", res.status_code
+            )
+        res.raise_for_status()
+
+    def send_followup(self, data: InteractionCallbackData) -> None:
+        """Post a new message in reply to the interaction."""
+        res = self.session.post(
+            self.url,
+            data=data.model_dump_json(exclude_none=True),
+            timeout=REQUEST_TIMEOUT,
+        )
+        if not res.ok:
+            logger.error(
+                "Failed to send followup message: res.status_code=%r", res.status_code
+            )
+        res.raise_for_status()
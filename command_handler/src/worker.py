@@ -0,0 +1,107 @@
+from os import getenv
+from time import monotonic
+from typing import Any, Callable
+from logging import getLogger, INFO
+
+from requests import RequestException
+
+from utils.deferred import FollowupTask
+from utils.messages import TECHNICAL_ERROR_CONTENT, servers_ready, states_changed
+from utils.readiness import STARTING_STATES, Readiness, ReadinessTracker
+from utils.runtime import RuntimeContext, get_runtime
+from utils.webhook import InteractionWebhook
+from typedefs.models import InteractionCallbackData
+
+getLogger().setLevel(getenv("LOG_LEVEL", INFO))
+logger = getLogger(__name__)
+
+
+def lambda_handler(event: FollowupTask, context: Any) -> None:
+    """Follow-up worker for deferred interactions
+
+    Performs the EC2 call and replaces the deferred response through the interaction
+    webhook.
+
+    Parameters
+    ----------
+    event: FollowupTask dispatched by the command handler
+    context: Lambda Context runtime methods and attributes
+
+    """
+
+    runtime = get_runtime()
+    webhook = InteractionWebhook(
+        application_id=event["application_id"],
+        token=event["token"],
+        base_url=runtime.discord_api_base_url,
+    )
+
+    started: list[str] = []
+    try:
+        servers = event.get("servers") or [runtime.default_server]
+        if event["action"] == "start":
+            logger.info("(BE) Starting server instances: %s", servers)
+            results = runtime.fleet.start(servers)
+            data = states_changed(results)
+            started = [
+                name
+                for name, result in results.items()
+                if result["current_state_name"] in STARTING_STATES
+            ]
+        elif event["action"] == "stop":
+            logger.info("(BE) Stopping server instances: %s", servers)
+            data = states_changed(runtime.fleet.stop(servers))
+        else:
+            raise ValueError(f"Unsupported action: {event['action']}")
+
+    except Exception as e:
+        # Log as error. Do not give reason to the client.
+        logger.error(e, exc_info=True)
+        data = InteractionCallbackData(content=TECHNICAL_ERROR_CONTENT)
+
+    deliver(webhook.edit_original, data)
+
+    if started and runtime.ready_timeout:
+        notify_ready(runtime, webhook, started)
+
+
+def notify_ready(
+    runtime: RuntimeContext, webhook: InteractionWebhook, servers: list[str]
+) -> None:
+    """Wait until the started servers are joinable and send a single follow-up.
+
+    The servers share one deadline of READY_TIMEOUT seconds.
+    """
+    deadline = monotonic() + (runtime.ready_timeout or 0)
+    try:
+        results: dict[str, Readiness] = {}
+        for name in servers:
+            tracker = ReadinessTracker(
+                runtime.fleet.instances[name], port=runtime.servers[name].port
+            )
+            results[name] = tracker.wait(max(deadline - monotonic(), 0))
+            logger.info("(BE) Readiness of %s: %s", name, results[name])
+        data = servers_ready(results)
+
+    except Exception as e:
+        # Log as error. Do not give reason to the client.
+        logger.error(e, exc_info=True)
+        data = InteractionCallbackData(content=TECHNICAL_ERROR_CONTENT)
+
+    deliver(webhook.send_followup, data)
+
+
+def deliver(
+    send: Callable[[InteractionCallbackData], None], data: InteractionCallbackData
+) -> None:
+    """Send a message through the webhook, logging instead of raising on failure.
+
+    The EC2 call is already done: failing the invocation would only get it
+    retried, repeating the start/stop (e.g. stopping a server started since).
+    """
+    try:
+        send(data)
+    except RequestException as e:
+        # Not the exception text: its URL holds the interaction token.
+        status = e.response.status_code if e.response is not None else None
+        logger.error("Could not deliver the message: %s %s", type(e).__name__, status)
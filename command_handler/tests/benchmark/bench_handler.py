@@ -0,0 +1,273 @@
+"""Per-stage latency of ``lambda_handler`` against a stubbed EC2 backend.
+
+Drives the handler with pre-signed PING, start, stop, autocomplete and invalid
+(bad signature) events. Every command event carries its own interaction id so that none of them
+is short-circuited as a duplicate. EC2 is a real boto3 client with its calls
+answered by a botocore Stubber.
+
+The stages are timed by wrapping the functions the handler calls:
+
+- verify: ``VerifyKey.verify`` (Ed25519)
+- parse: ``utils.verify.deserialize`` (JSON validation)
+- dispatch: ``registry.resolve``/``registry.complete`` and the command handler
+  or completer, minus the EC2 call
+- ec2: the botocore API call, including the stubbed response
+- serialize: ``dump_proxy_response`` or ``PreparedResponse.to_dict``
+
+The results are written as JSON so that runs can be compared across commits.
+
+    PYTHONPATH=./command_handler/src:./command_handler/tests \\
+        python -m benchmark.bench_handler -n 500 -o bench_handler.json
+
+Pass ``--baseline`` with an earlier report to print the p50 change per stage.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from functools import wraps
+from os import devnull, environ
+from time import perf_counter, time
+from typing import Any, Callable, Final, TypedDict
+
+import boto3  # type: ignore
+from botocore.stub import Stubber  # type: ignore
+from nacl.signing import VerifyKey
+
+from benchmark.common import (
+    ENVIRON,
+    REGION_NAME,
+    Stats,
+    autocomplete_events,
+    format_stats,
+    command_events,
+    signed_event,
+    summarize,
+)
+from integration.resources.ec2 import START_INSTANCES_RESPONSE, STOP_INSTANCES_RESPONSE
+from integration.resources.ping import PING_BODY
+
+STAGES: Final[tuple[str, ...]] = ("verify", "parse", "dispatch", "ec2", "serialize")
+
+
+class EventResult(TypedDict):
+    end_to_end: Stats
+    stages: dict[str, Stats]
+
+
+class Report(TypedDict):
+    commit: str | None
+    python: str
+    created_at: float
+    n: int
+    events: dict[str, EventResult]
+
+
+class StageTimer:
+    """Accumulates the time spent in wrapped functions during one invocation."""
+
+    def __init__(self) -> None:
+        self.current: dict[str, float] = {}
+
+    def wrap(self, stage: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(func)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self.current[stage] = self.current.get(stage, 0.0) + elapsed
+
+        return timed
+
+    def take(self) -> dict[str, float]:
+        stages, self.current = self.current, {}
+        # The EC2 call runs inside the command handler.
+        if "dispatch" in stages:
+            stages["dispatch"] -= stages.get("ec2", 0.0)
+        return stages
+
+
+def invalid_events(n: int) -> list[dict[str, Any]]:
+    event = signed_event(PING_BODY)
+    # Flip the first byte of the signature.
+    signature = event["headers"]["x-signature-ed25519"]
+    flipped = f"{int(signature[:2], 16) ^ 0xFF:02x}{signature[2:]}"
+    event["headers"] = {**event["headers"], "x-signature-ed25519": flipped}
+    return [event] * (n + 1)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def install_timers(timer: StageTimer, n: int) -> None:
+    """Wrap the stage functions and stub the EC2 client."""
+    import app
+    import utils.decorator
+    import utils.ec2
+    import utils.verify
+    from utils.responses import PreparedResponse
+
+    VerifyKey.verify = timer.wrap("verify", VerifyKey.verify)  # type: ignore
+    utils.verify.deserialize = timer.wrap("parse", utils.verify.deserialize)
+    utils.decorator.dump_proxy_response = timer.wrap(
+        "serialize", utils.decorator.dump_proxy_response
+    )
+    PreparedResponse.to_dict = timer.wrap(  # type: ignore
+        "serialize", PreparedResponse.to_dict
+    )
+
+    resolve = app.registry.resolve
+
+    def timed_resolve(data: Any) -> Any:
+        handler, options = timer.wrap("dispatch", resolve)(data)
+        return timer.wrap("dispatch", handler), options
+
+    app.registry.resolve = timed_resolve  # type: ignore
+
+    complete = app.registry.complete
+
+    def timed_complete(data: Any) -> Any:
+        command, completer, options, value = timer.wrap("dispatch", complete)(data)
+        return command, timer.wrap("dispatch", completer), options, value
+
+    app.registry.complete = timed_complete  # type: ignore
+
+    create_client = utils.ec2.client
+
+    def stubbed_client(*args: Any, **kwargs: Any) -> Any:
+        ec2 = create_client(*args, **kwargs)
+        stubber = Stubber(ec2)
+        for _ in range(n + 1):
+            stubber.add_response("start_instances", START_INSTANCES_RESPONSE)
+        for _ in range(n + 1):
+            stubber.add_response("stop_instances", STOP_INSTANCES_RESPONSE)
+        stubber.activate()
+        ec2._make_api_call = timer.wrap("ec2", ec2._make_api_call)
+        return ec2
+
+    utils.ec2.client = stubbed_client
+
+
+def run(n: int) -> Report:
+    # Rejected signatures are logged as warnings; keep them out of the output.
+    environ.update({**ENVIRON, "LOG_LEVEL": "ERROR"})
+    environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    environ.setdefault("AWS_DEFAULT_REGION", REGION_NAME)
+    boto3.setup_default_session()
+
+    from app import lambda_handler
+    from utils.metrics import StdoutSink, set_metric_sink
+    from utils.runtime import get_runtime, reset_runtime
+
+    # Metric records are still encoded, but not printed.
+    set_metric_sink(StdoutSink(open(devnull, "w")))
+    timer = StageTimer()
+    install_timers(timer, n)
+    reset_runtime()
+    # Every start/stop must reach EC2 instead of reusing the previous result.
+    for instance in get_runtime().fleet.instances.values():
+        assert instance.coalescer is not None
+        instance.coalescer.result_ttl = 0
+
+    # Signed up front so that signing is not measured. The stubbed responses are
+    # queued start first, so the start events must run before the stop events.
+    workloads = {
+        "ping": [signed_event(PING_BODY)] * (n + 1),
+        "start": command_events("start", n, first_id=1),
+        "stop": command_events("stop", n, first_id=n + 2),
+        "autocomplete": autocomplete_events("b", n),
+        "invalid": invalid_events(n),
+    }
+    events: dict[str, EventResult] = {}
+    for label, workload in workloads.items():
+        # The first event warms up the path and is not recorded.
+        response = lambda_handler(workload[0], None)
+        assert label == "invalid" or response["statusCode"] == 200, response
+        warmup = timer.take()
+        # Guards against events that never reach the command handler.
+        assert label not in ("start", "stop") or "ec2" in warmup, response
+        totals: list[float] = []
+        stages: dict[str, list[float]] = {stage: [] for stage in STAGES}
+        for event in workload[1:]:
+            start = perf_counter()
+            lambda_handler(event, None)
+            totals.append(perf_counter() - start)
+            for stage, elapsed in timer.take().items():
+                stages[stage].append(elapsed)
+        events[label] = EventResult(
+            end_to_end=summarize(totals),
+            stages={
+                stage: summarize(samples)
+                for stage, samples in stages.items()
+                if samples
+            },
+        )
+
+    return Report(
+        commit=git_commit(),
+        python=platform.python_version(),
+        created_at=time(),
+        n=n,
+        events=events,
+    )
+
+
+def compare(report: Report, baseline: Report) -> list[str]:
+    """p50 changes from a baseline report, one line per event and stage."""
+    lines = [f"Compared with {baseline['commit'] or 'baseline'}:"]
+    for label, result in report["events"].items():
+        before = baseline["events"].get(label)
+        if before is None:
+            continue
+        rows = [("end-to-end", result["end_to_end"], before["end_to_end"])]
+        rows += [
+            (stage, stats, before["stages"][stage])
+            for stage, stats in result["stages"].items()
+            if stage in before["stages"]
+        ]
+        for name, after_stats, before_stats in rows:
+            old, new = before_stats["p50_ms"], after_stats["p50_ms"]
+            lines.append(
+                f"{label + ' ' + name:<32} p50 {old:9.4f}ms -> {new:9.4f}ms "
+                f"({(new - old) / old * 100:+.1f}%)"
+            )
+    return lines
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=500, help="invocations per event")
+    parser.add_argument("-o", "--output", help="write the report as JSON here")
+    parser.add_argument("-b", "--baseline", help="report to compare the p50s with")
+    args = parser.parse_args(argv)
+
+    report = run(args.n)
+    for label, result in report["events"].items():
+        print(format_stats(f"{label} end-to-end", result["end_to_end"]))
+        for stage, stats in result["stages"].items():
+            print(format_stats(f"  {stage}", stats))
+    if args.baseline:
+        with open(args.baseline) as f:
+            print("\n".join(compare(report, json.load(f))))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Import-time report for the handler module (``python -X importtime`` style).
+
+Runs a fresh interpreter that imports ``app`` and answers one PING, then prints
+the slowest imports by cumulative time and any heavy module that got loaded.
+
+    PYTHONPATH=./command_handler/src:./command_handler/tests \\
+        python -m benchmark.bench_import
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Final, TypedDict
+
+from benchmark.common import ENVIRON
+
+SRC_DIR: Final[Path] = Path(__file__).resolve().parents[2] / "src"
+TESTS_DIR: Final[Path] = Path(__file__).resolve().parents[1]
+
+# Modules that a PING must not load.
+HEAVY_MODULES: Final[tuple[str, ...]] = ("boto3", "botocore", "requests", "utils.ec2")
+
+PING_SCRIPT: Final[str] = """
+import json, sys
+from app import lambda_handler
+from benchmark.common import signed_event
+from integration.resources.ping import PING_BODY
+
+response = lambda_handler(signed_event(PING_BODY), None)
+assert response["statusCode"] == 200, response
+print(json.dumps([m for m in sys.argv[1:] if m in sys.modules]))
+"""
+
+
+class ImportTime(TypedDict):
+    name: str
+    self_us: int
+    cumulative_us: int
+
+
+class ImportReport(TypedDict):
+    imports: list[ImportTime]
+    loaded_heavy_modules: list[str]
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """Parse the lines written by ``-X importtime``."""
+    imports: list[ImportTime] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        imports.append(
+            ImportTime(
+                name=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return imports
+
+
+def run_ping_import() -> ImportReport:
+    """Import the handler in a fresh interpreter and answer one PING."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PING_SCRIPT, *HEAVY_MODULES],
+        env={**ENVIRON, "PYTHONPATH": f"{SRC_DIR}:{TESTS_DIR}"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return ImportReport(
+        imports=parse_importtime(proc.stderr),
+        loaded_heavy_modules=json.loads(proc.stdout.splitlines()[-1]),
+    )
+
+
+def cumulative_us(report: ImportReport, name: str) -> int:
+    return next(i["cumulative_us"] for i in report["imports"] if i["name"] == name)
+
+
+def main(top: int = 15) -> None:
+    report = run_ping_import()
+    print(f"app: {cumulative_us(report, 'app') / 1000:.1f}ms cumulative")
+    print(f"heavy modules loaded by PING: {report['loaded_heavy_modules']}")
+    for i in sorted(report["imports"], key=lambda i: -i["cumulative_us"])[:top]:
+        print(
+            f"{i['cumulative_us'] / 1000:8.1f}ms {i['self_us'] / 1000:8.1f}ms  {i['name']}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 15)
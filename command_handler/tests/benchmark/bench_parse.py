@@ -0,0 +1,99 @@
+"""Interaction parsing: full model validation vs selective two-phase parsing.
+
+"full" is what the handler does: one ``model_validate_json`` pass over the
+whole body. Because the request model ignores extra keys, pydantic-core skips
+the ``member``/``guild``/``channel`` blobs while scanning and never turns them
+into Python objects.
+
+"selective" triages on ``type`` with a slim envelope model first, returns
+early for PING and otherwise extracts only ``id``/``application_id``/
+``guild_id``/``data``/``token`` from a generic parse before validating them.
+
+    PYTHONPATH=./command_handler/src:./command_handler/tests \\
+        python -m benchmark.bench_parse
+"""
+
+import json
+import sys
+from typing import Any, Final, Optional
+
+from pydantic import BaseModel
+from pydantic_core import from_json
+
+from benchmark.common import format_stats, measure
+from integration.resources.be_start import BE_START_BODY
+from integration.resources.ping import PING_BODY
+from typedefs.enums import InteractionType
+from typedefs.models import InteractionRequestBody
+
+SELECTED_FIELDS: Final[tuple[str, ...]] = (
+    "id",
+    "application_id",
+    "guild_id",
+    "data",
+    "token",
+    "type",
+)
+
+
+class InteractionEnvelope(BaseModel):
+    id: str
+    application_id: str
+    guild_id: Optional[str] = None
+    type: InteractionType
+
+    model_config = {"extra": "ignore"}
+
+
+def parse_full(json_text: str) -> InteractionRequestBody:
+    return InteractionRequestBody.model_validate_json(json_text)
+
+
+def parse_selective(json_text: str) -> InteractionRequestBody:
+    envelope = InteractionEnvelope.model_validate_json(json_text)
+    if envelope.type == InteractionType.PING:
+        return InteractionRequestBody.model_construct(**dict(envelope))
+    raw: dict[str, Any] = from_json(json_text)
+    return InteractionRequestBody.model_validate(
+        {k: raw[k] for k in SELECTED_FIELDS if k in raw}
+    )
+
+
+def large_guild_body() -> dict[str, Any]:
+    """/be start from a member of a large guild with many roles."""
+    body = {**BE_START_BODY, "type": 2}
+    body["member"] = {
+        **body["member"],
+        "roles": [str(1200000000000000000 + i) for i in range(250)],
+    }
+    body["guild"] = {
+        **body["guild"],
+        "features": [f"FEATURE_{i}" for i in range(60)],
+    }
+    body["resolved"] = {
+        "users": {str(i): body["member"]["user"] for i in range(25)},
+    }
+    return body
+
+
+PAYLOADS: Final[dict[str, dict[str, Any]]] = {
+    "ping": PING_BODY,
+    "command": {**BE_START_BODY, "type": 2},
+    "command (large guild)": large_guild_body(),
+}
+
+
+def main(n: int = 20000) -> None:
+    for label, body in PAYLOADS.items():
+        text = json.dumps(body)
+        compared = {"id", "application_id", "guild_id", "data", "type"}
+        assert parse_full(text).model_dump(include=compared) == (
+            parse_selective(text).model_dump(include=compared)
+        )
+        print(f"{label}: {len(text)} bytes")
+        for name, parse in (("full", parse_full), ("selective", parse_selective)):
+            print(format_stats(f"  {name}", measure(lambda: parse(text), n)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
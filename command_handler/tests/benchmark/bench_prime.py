@@ -0,0 +1,165 @@
+"""First-request latency of a cold handler, with and without priming.
+
+Each sample is a fresh interpreter that imports ``app`` (the Lambda init phase),
+then answers a first and a second request of one kind. With ``PRIME_ON_INIT``
+the init phase primes the runtime (see ``utils.priming``) and the first request
+should cost about as much as the second one.
+
+EC2 is a local HTTP endpoint (``AWS_ENDPOINT_URL_EC2``) with canned responses,
+so the handler's boto3 clients load, resolve, sign and parse as they would
+against AWS, and nothing is patched in the measured interpreter.
+
+    PYTHONPATH=./command_handler/src:./command_handler/tests \\
+        python -m benchmark.bench_prime -n 10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from statistics import median
+from threading import Thread
+from typing import Any, Final, TypedDict
+from urllib.parse import parse_qs
+
+from benchmark.bench_import import SRC_DIR, TESTS_DIR
+from benchmark.common import ENVIRON, INSTANCE_ID, REGION_NAME
+
+KINDS: Final[tuple[str, ...]] = ("ping", "status", "start")
+
+FIRST_REQUEST_SCRIPT: Final[str] = """
+import json, sys
+from time import perf_counter
+
+start = perf_counter()
+import app
+init = perf_counter() - start
+
+from benchmark.common import command_body, signed_event
+from integration.resources.ping import PING_BODY
+
+kind = sys.argv[1]
+events = [
+    signed_event(PING_BODY if kind == "ping" else command_body(kind, i + 1))
+    for i in range(2)
+]
+latencies = []
+for event in events:
+    start = perf_counter()
+    response = app.lambda_handler(event, None)
+    latencies.append(perf_counter() - start)
+    assert response["statusCode"] == 200, response
+print(json.dumps({"init": init, "first": latencies[0], "second": latencies[1]}))
+"""
+
+EC2_NAMESPACE: Final[str] = "http://ec2.amazonaws.com/doc/2016-11-15/"
+# Canned EC2 answers by action. The instance is stopped, so that status does not
+# query the Bedrock server.
+EC2_RESPONSES: Final[dict[str, str]] = {
+    "DescribeInstances": f"""<DescribeInstancesResponse xmlns="{EC2_NAMESPACE}">
+<reservationSet><item><instancesSet><item>
+<instanceId>{INSTANCE_ID}</instanceId><instanceType>t3.medium</instanceType>
+<instanceState><code>80</code><name>stopped</name></instanceState>
+</item></instancesSet></item></reservationSet></DescribeInstancesResponse>""",
+    "StartInstances": f"""<StartInstancesResponse xmlns="{EC2_NAMESPACE}">
+<instancesSet><item><instanceId>{INSTANCE_ID}</instanceId>
+<currentState><code>0</code><name>pending</name></currentState>
+<previousState><code>80</code><name>stopped</name></previousState>
+</item></instancesSet></StartInstancesResponse>""",
+}
+
+
+class Sample(TypedDict):
+    init: float
+    first: float
+    second: float
+
+
+class Result(TypedDict):
+    n: int
+    init_ms: float
+    first_ms: float
+    second_ms: float
+
+
+class FakeEc2Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        body = EC2_RESPONSES[form["Action"][0]].encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def run_cold(kind: str, primed: bool, endpoint: str) -> Sample:
+    """Init a fresh interpreter and answer two requests of the kind."""
+    proc = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST_SCRIPT, kind],
+        env={
+            **ENVIRON,
+            "PYTHONPATH": f"{SRC_DIR}:{TESTS_DIR}",
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "AWS_DEFAULT_REGION": REGION_NAME,
+            "AWS_ENDPOINT_URL_EC2": endpoint,
+            "PRIME_ON_INIT": "true" if primed else "false",
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Metric records are printed before the result.
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def run(n: int) -> dict[str, dict[str, Result]]:
+    """Median init and first/second request latency by kind and priming."""
+    with ThreadingHTTPServer(("127.0.0.1", 0), FakeEc2Handler) as ec2:
+        Thread(target=ec2.serve_forever, args=(0.05,), daemon=True).start()
+        host, port = ec2.server_address[:2]
+        endpoint = f"http://{host}:{port}"
+        results: dict[str, dict[str, Result]] = {}
+        for kind in KINDS:
+            for label, primed in (("unprimed", False), ("primed", True)):
+                samples = [run_cold(kind, primed, endpoint) for _ in range(n)]
+                results.setdefault(kind, {})[label] = Result(
+                    n=n,
+                    init_ms=median(s["init"] for s in samples) * 1000,
+                    first_ms=median(s["first"] for s in samples) * 1000,
+                    second_ms=median(s["second"] for s in samples) * 1000,
+                )
+        ec2.shutdown()
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=10, help="cold starts per case")
+    parser.add_argument("-o", "--output", help="write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    results = run(args.n)
+    for kind, by_label in results.items():
+        for label, result in by_label.items():
+            print(
+                f"{kind + ' ' + label:<18} n={result['n']:<4} "
+                f"init={result['init_ms']:9.2f}ms "
+                f"first={result['first_ms']:9.2f}ms "
+                f"second={result['second_ms']:9.2f}ms"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Warm-path latency with and without the cached runtime context.
+
+"before" drops the runtime context ahead of every invocation, which reproduces
+the previous behaviour of re-reading the environment, rebuilding the verify key
+and creating a new boto3 EC2 client per request.
+
+    PYTHONPATH=./command_handler/src:./command_handler/tests \\
+        python -m benchmark.bench_runtime
+"""
+
+import sys
+from os import devnull, environ
+from typing import Any, Callable
+
+import boto3  # type: ignore
+from botocore.stub import Stubber  # type: ignore
+
+from benchmark.common import (
+    ENVIRON,
+    REGION_NAME,
+    command_events,
+    format_stats,
+    measure,
+    signed_event,
+)
+from integration.resources.ec2 import STOP_INSTANCES_RESPONSE
+from integration.resources.ping import PING_BODY
+
+
+def main(n: int = 500) -> None:
+    environ.update(ENVIRON)
+
+    import utils.ec2
+    from app import lambda_handler
+    from utils.metrics import StdoutSink, set_metric_sink
+    from utils.runtime import get_runtime, reset_runtime
+
+    # Metric records are still encoded, but not printed.
+    set_metric_sink(StdoutSink(open(devnull, "w")))
+    # Each command event has its own interaction id, so none is a duplicate.
+    workloads: dict[str, Callable[[], list[dict[str, Any]]]] = {
+        "ping": lambda: [signed_event(PING_BODY)] * (n + 1),
+        "stop": lambda: command_events("stop", n, first_id=1),
+    }
+
+    # Real client construction (credential/endpoint resolution), stubbed calls.
+    create_client = utils.ec2.client
+
+    ec2_calls = 0
+
+    def count_call(params: Any, **kwargs: Any) -> None:
+        nonlocal ec2_calls
+        ec2_calls += 1
+
+    def stubbed_client(*args: Any, **kwargs: Any) -> Any:
+        ec2 = create_client(*args, **kwargs)
+        stubber = Stubber(ec2)
+        for _ in range(n + 1):
+            stubber.add_response("stop_instances", STOP_INSTANCES_RESPONSE)
+        stubber.activate()
+        ec2.meta.events.register("provide-client-params.ec2.StopInstances", count_call)
+        return ec2
+
+    utils.ec2.client = stubbed_client
+    environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    environ.setdefault("AWS_DEFAULT_REGION", REGION_NAME)
+    boto3.setup_default_session()
+
+    for label, workload in workloads.items():
+        reset_runtime()
+        ec2_calls = 0
+        events = iter(workload())
+        before = measure(
+            lambda: lambda_handler(next(events), None), n, setup=reset_runtime
+        )
+        reset_runtime()
+        if label == "stop":
+            # Every stop must reach EC2 instead of reusing the previous result.
+            for instance in get_runtime().fleet.instances.values():
+                assert instance.coalescer is not None
+                instance.coalescer.result_ttl = 0
+        events = iter(workload())
+        after = measure(lambda: lambda_handler(next(events), None), n)
+        # Guards against runs that do not measure the EC2 path.
+        assert label != "stop" or ec2_calls == 2 * (n + 1), ec2_calls
+        print(format_stats(f"{label} (per-request init)", before))
+        print(format_stats(f"{label} (cached runtime)", after))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,119 @@
+import json
+from statistics import quantiles
+from time import perf_counter
+from typing import Any, Callable, Final, TypedDict
+
+from nacl.signing import SigningKey
+
+from integration.resources.be_start import BE_START_BODY
+
+# Key pair for benchmarking
+SIGNING_KEY: Final[SigningKey] = SigningKey(b"0123456789abcdef0123456789abcdef")
+APP_PUBLIC_KEY: Final[str] = SIGNING_KEY.verify_key.encode().hex()
+INSTANCE_ID: Final[str] = "i-0123456789abcdef0"
+REGION_NAME: Final[str] = "us-east-1"
+
+ENVIRON: Final[dict[str, str]] = {
+    "APP_PUBLIC_KEY": APP_PUBLIC_KEY,
+    "SERVER_INSTANCE_ID": INSTANCE_ID,
+    "SERVER_REGION_NAME": REGION_NAME,
+    # Keep the handler's own logging out of the measurements.
+    "LOG_LEVEL": "WARNING",
+}
+
+
+class Stats(TypedDict):
+    n: int
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+
+
+def signed_event(
+    body: dict[str, Any], timestamp: str = "1748698092919", signing_key=SIGNING_KEY
+) -> dict[str, Any]:
+    """Build an HTTP API proxy event signed like Discord does."""
+    text = json.dumps(body)
+    signature = signing_key.sign(f"{timestamp}{text}".encode()).signature.hex()
+    return {
+        "body": text,
+        "headers": {
+            "content-type": "application/json",
+            "x-signature-ed25519": signature,
+            "x-signature-timestamp": timestamp,
+        },
+        "route_key": "POST /commands",
+        "version": "2.0",
+    }
+
+
+def command_body(action: str, interaction_id: int) -> dict[str, Any]:
+    """Body of a /be <action> interaction."""
+    return {
+        **BE_START_BODY,
+        "id": f"{interaction_id:019d}",
+        "type": 2,
+        "data": {
+            **BE_START_BODY["data"],
+            "options": [{"name": "action", "type": 3, "value": action}],
+        },
+    }
+
+
+def command_events(action: str, n: int, first_id: int) -> list[dict[str, Any]]:
+    """n + 1 signed /be events, each with a distinct interaction id."""
+    return [signed_event(command_body(action, first_id + i)) for i in range(n + 1)]
+
+
+def autocomplete_body(value: str, interaction_id: int) -> dict[str, Any]:
+    """Body of an autocomplete interaction for the server option of /be status."""
+    return {
+        **BE_START_BODY,
+        "id": f"{interaction_id:019d}",
+        "type": 4,
+        "data": {
+            **BE_START_BODY["data"],
+            "options": [
+                {"name": "action", "type": 3, "value": "status"},
+                {"name": "server", "type": 3, "value": value, "focused": True},
+            ],
+        },
+    }
+
+
+def autocomplete_events(value: str, n: int) -> list[dict[str, Any]]:
+    """n + 1 signed autocomplete events for the server option of /be status."""
+    return [signed_event(autocomplete_body(value, i + 1)) for i in range(n + 1)]
+
+
+def summarize(samples: list[float]) -> Stats:
+    """Summarize samples given in seconds."""
+    cuts = quantiles(samples, n=100, method="inclusive")
+    return Stats(
+        n=len(samples),
+        mean_ms=sum(samples) / len(samples) * 1000,
+        p50_ms=cuts[49] * 1000,
+        p99_ms=cuts[98] * 1000,
+    )
+
+
+def measure(
+    func: Callable[[], Any], n: int, setup: Callable[[], Any] | None = None
+) -> Stats:
+    """Call func n times (after one warm-up call) and summarize its latency."""
+    func()
+    samples: list[float] = []
+    for _ in range(n):
+        if setup:
+            setup()
+        start = perf_counter()
+        func()
+        samples.append(perf_counter() - start)
+    return summarize(samples)
+
+
+def format_stats(label: str, stats: Stats) -> str:
+    return (
+        f"{label:<32} n={stats['n']:<6} mean={stats['mean_ms']:9.4f}ms "
+        f"p50={stats['p50_ms']:9.4f}ms p99={stats['p99_ms']:9.4f}ms"
+    )
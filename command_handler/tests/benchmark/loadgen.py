@@ -0,0 +1,475 @@
+"""Load generator for signed interactions.
+
+Signs a synthetic mix of PING, /be status|start|stop, autocomplete, bad
+signature and duplicate interactions with the benchmark key, then replays them
+at a target rate:
+
+- inprocess: calls ``lambda_handler`` directly from the worker threads
+- http: POSTs to a ``server`` endpoint over kept-alive connections. Without
+  ``--url`` a local ``PooledHTTPServer`` is started on a free port.
+
+EC2 is stubbed with canned responses (optionally delayed by ``--ec2-latency-ms``)
+and the Bedrock status queries go to a TEST-NET address with a short timeout.
+The load is open-loop: each request has a scheduled send time, and its latency
+is measured from that time, so a backlog shows up as latency instead of a lower
+request rate. Several ``--rate`` values sweep the load to find where throughput
+stops following the offered rate.
+
+    PYTHONPATH=./command_handler/src:./command_handler/tests \\
+        python -m benchmark.loadgen --target http --rate 200 --rate 400 -d 10
+
+A local server shares the interpreter with the generator, so its numbers are
+pessimistic; run ``python -m server`` in another process and pass ``--url`` for
+a cleaner measurement.
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from http.client import HTTPConnection, HTTPException
+from os import devnull, environ
+from random import Random
+from threading import Lock, Thread
+from time import perf_counter, sleep, time
+from typing import Any, Callable, Final, NamedTuple, TypedDict
+from urllib.parse import urlsplit
+
+from benchmark.common import (
+    ENVIRON,
+    REGION_NAME,
+    Stats,
+    autocomplete_body,
+    command_body,
+    format_stats,
+    signed_event,
+    summarize,
+)
+from integration.resources.ec2 import (
+    DESCRIBE_INSTANCES_RESPONSE,
+    START_INSTANCES_RESPONSE,
+    STOP_INSTANCES_RESPONSE,
+)
+from integration.resources.ping import PING_BODY
+
+KINDS: Final[tuple[str, ...]] = (
+    "ping",
+    "status",
+    "start",
+    "stop",
+    "autocomplete",
+    "bad_signature",
+    "duplicate",
+)
+DEFAULT_MIX: Final[str] = (
+    "ping=4,status=3,start=1,stop=1,autocomplete=3,bad_signature=1,duplicate=1"
+)
+# The outcome each kind of interaction should get.
+EXPECTED: Final[dict[str, str]] = {
+    "ping": "pong",
+    "status": "ok",
+    "start": "ok",
+    "stop": "ok",
+    "autocomplete": "ok",
+    "bad_signature": "bad_request",
+    "duplicate": "duplicate",
+}
+COMMANDS: Final[tuple[str, ...]] = ("status", "start", "stop")
+# Canned EC2 responses by botocore operation name.
+EC2_RESPONSES: Final[dict[str, dict[str, Any]]] = {
+    "DescribeInstances": DESCRIBE_INSTANCES_RESPONSE,
+    "StartInstances": START_INSTANCES_RESPONSE,
+    "StopInstances": STOP_INSTANCES_RESPONSE,
+}
+
+
+class Request(NamedTuple):
+    kind: str
+    event: dict[str, Any]
+
+
+class LoadResult(TypedDict):
+    target: str
+    rate: float | None
+    concurrency: int
+    requests: int
+    duration_s: float
+    throughput_rps: float
+    latency: Stats
+    max_ms: float
+    outcomes: dict[str, dict[str, int]]
+    errors: int
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Weights by kind from "kind=weight,..."."""
+    mix: dict[str, float] = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise ValueError(f"Unknown interaction kind: {kind!r}")
+        mix[kind] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one positive weight")
+    return mix
+
+
+def bad_signature(event: dict[str, Any]) -> dict[str, Any]:
+    """A copy of the event with the first byte of its signature flipped."""
+    signature = event["headers"]["x-signature-ed25519"]
+    flipped = f"{int(signature[:2], 16) ^ 0xFF:02x}{signature[2:]}"
+    return {**event, "headers": {**event["headers"], "x-signature-ed25519": flipped}}
+
+
+def generate(
+    n: int, mix: dict[str, float], first_id: int = 1, gap: int = 64, seed: int = 0
+) -> list[Request]:
+    """n signed requests drawn from the mix.
+
+    Every command and autocomplete interaction gets its own id. A duplicate
+    resends a command sent between gap and 4 * gap requests earlier: late
+    enough for the original to have been answered, early enough for it to be
+    remembered like a retry would be. Until there is one it is a status.
+    """
+    rng = Random(seed)
+    # Signed now so that SIGNATURE_MAX_AGE accepts them for the whole run.
+    timestamp = str(int(time()))
+    requests: list[Request] = []
+    sent: list[tuple[int, dict[str, Any]]] = []
+    for i, kind in enumerate(rng.choices(list(mix), list(mix.values()), k=n)):
+        interaction_id = first_id + i
+        if kind == "duplicate":
+            earlier = [event for j, event in sent if i - 4 * gap <= j <= i - gap]
+            if earlier:
+                requests.append(Request(kind, rng.choice(earlier)))
+                continue
+            kind = "status"
+        if kind == "ping":
+            event = signed_event(PING_BODY, timestamp)
+        elif kind == "autocomplete":
+            prefix = rng.choice(("", "b", "be", "a"))
+            event = signed_event(autocomplete_body(prefix, interaction_id), timestamp)
+        elif kind == "bad_signature":
+            action = rng.choice(COMMANDS)
+            body = command_body(action, interaction_id)
+            event = bad_signature(signed_event(body, timestamp))
+        else:
+            event = signed_event(command_body(kind, interaction_id), timestamp)
+            sent.append((i, event))
+        requests.append(Request(kind, event))
+    return requests
+
+
+def classify(status: int, body: str) -> str:
+    """The outcome of a handler response."""
+    from utils.messages import DUPLICATE_CONTENT, TECHNICAL_ERROR_CONTENT
+
+    if status == 401:
+        return "bad_request"
+    if status != 200:
+        return f"http_{status}"
+    try:
+        response = json.loads(body)
+    except ValueError:
+        return "invalid_body"
+    if response.get("type") == 1:
+        return "pong"
+    content = (response.get("data") or {}).get("content")
+    if content == DUPLICATE_CONTENT:
+        return "duplicate"
+    if content == TECHNICAL_ERROR_CONTENT:
+        return "technical_error"
+    return "ok"
+
+
+class InProcessTarget:
+    name = "inprocess"
+
+    def __init__(self) -> None:
+        from app import lambda_handler
+
+        self.handler = lambda_handler
+
+    def __call__(self, event: dict[str, Any]) -> tuple[int, str]:
+        response = self.handler(event, None)
+        return response["statusCode"], response.get("body") or ""
+
+    def close(self) -> None:
+        pass
+
+
+class HttpTarget:
+    """POSTs events to an interaction endpoint over kept-alive connections.
+
+    Idle connections are reused by the next request from any thread, so the
+    server sees at most one connection per concurrent request, across runs.
+    """
+
+    name = "http"
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.path = parts.path or "/commands"
+        self.timeout = timeout
+        self.idle: list[HTTPConnection] = []
+        self.lock = Lock()
+
+    def __call__(self, event: dict[str, Any]) -> tuple[int, str]:
+        with self.lock:
+            connection = self.idle.pop() if self.idle else None
+        if connection is None:
+            connection = HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request("POST", self.path, event["body"], event["headers"])
+            response = connection.getresponse()
+            result = response.status, response.read().decode()
+        except (OSError, HTTPException):
+            connection.close()
+            raise
+        with self.lock:
+            self.idle.append(connection)
+        return result
+
+    def close(self) -> None:
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+def stub_ec2(latency: float = 0.0) -> None:
+    """Answer every EC2 call with a canned response after latency seconds."""
+    import utils.ec2
+
+    create_client = utils.ec2.client
+
+    def stubbed_client(*args: Any, **kwargs: Any) -> Any:
+        ec2 = create_client(*args, **kwargs)
+
+        def make_api_call(operation_name: str, api_params: Any) -> dict[str, Any]:
+            if latency:
+                sleep(latency)
+            return EC2_RESPONSES[operation_name]
+
+        ec2._make_api_call = make_api_call
+        return ec2
+
+    utils.ec2.client = stubbed_client
+
+
+def configure(ec2_latency: float) -> None:
+    """Environment, metric sink and EC2 stub shared by both targets."""
+    environ.update(
+        {
+            **ENVIRON,
+            # Rejected signatures are logged as warnings.
+            "LOG_LEVEL": "ERROR",
+            # Nothing answers at the TEST-NET address of the stubbed instance.
+            "BEDROCK_QUERY_TIMEOUT": "0.05",
+        }
+    )
+    environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    environ.setdefault("AWS_DEFAULT_REGION", REGION_NAME)
+
+    from utils.metrics import StdoutSink, set_metric_sink
+    from utils.runtime import reset_runtime
+
+    set_metric_sink(StdoutSink(open(devnull, "w")))
+    stub_ec2(ec2_latency)
+    reset_runtime()
+
+
+def start_server(workers: int) -> tuple[str, Callable[[], None]]:
+    """Serve the handler locally. Return its URL and a function to stop it."""
+    from server import PooledHTTPServer, prime
+
+    prime()
+    httpd = PooledHTTPServer(("127.0.0.1", 0), workers)
+    thread = Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    host, port = httpd.server_address[:2]
+
+    def stop() -> None:
+        httpd.shutdown()
+        httpd.server_close()
+
+    return f"http://{host}:{port}/commands", stop
+
+
+def run(
+    target: Callable[[dict[str, Any]], tuple[int, str]],
+    requests: list[Request],
+    rate: float | None,
+    concurrency: int,
+) -> tuple[list[tuple[str, str, float]], float]:
+    """Send the requests from concurrency threads at rate requests per second.
+
+    Without a rate every thread sends as fast as it is answered. Return the
+    (kind, outcome, latency) of every request and the wall time of the run.
+    """
+    samples: list[tuple[str, str, float]] = []
+    lock = Lock()
+    cursor = iter(range(len(requests)))
+    # Leave the threads time to start before the first send.
+    start = perf_counter() + 0.05
+    finished = [start]
+
+    def worker() -> None:
+        while True:
+            with lock:
+                i = next(cursor, None)
+            if i is None:
+                return
+            kind, event = requests[i]
+            scheduled = start + i / rate if rate else max(start, perf_counter())
+            delay = scheduled - perf_counter()
+            if delay > 0:
+                sleep(delay)
+            try:
+                outcome = classify(*target(event))
+            except Exception as e:
+                outcome = f"transport_{type(e).__name__}"
+            end = perf_counter()
+            with lock:
+                samples.append((kind, outcome, end - scheduled))
+                finished[0] = max(finished[0], end)
+
+    threads = [Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, finished[0] - start
+
+
+def report(
+    target: str,
+    rate: float | None,
+    concurrency: int,
+    samples: list[tuple[str, str, float]],
+    duration: float,
+) -> LoadResult:
+    outcomes: dict[str, Counter[str]] = {}
+    for kind, outcome, _ in samples:
+        outcomes.setdefault(kind, Counter())[outcome] += 1
+    latencies = [latency for _, _, latency in samples]
+    return LoadResult(
+        target=target,
+        rate=rate,
+        concurrency=concurrency,
+        requests=len(samples),
+        duration_s=duration,
+        throughput_rps=len(samples) / duration,
+        latency=summarize(latencies),
+        max_ms=max(latencies) * 1000,
+        outcomes={kind: dict(counts) for kind, counts in outcomes.items()},
+        errors=sum(
+            count
+            for kind, counts in outcomes.items()
+            for outcome, count in counts.items()
+            if outcome != EXPECTED[kind]
+        ),
+    )
+
+
+def format_result(result: LoadResult) -> list[str]:
+    rate = f"{result['rate']:g}/s" if result["rate"] else "unpaced"
+    lines = [
+        f"{result['target']} rate={rate} concurrency={result['concurrency']}: "
+        f"{result['requests']} requests in {result['duration_s']:.2f}s, "
+        f"{result['throughput_rps']:.1f}/s, {result['errors']} errors",
+        format_stats("  latency", result["latency"])
+        + f" max={result['max_ms']:9.4f}ms",
+    ]
+    for kind, counts in sorted(result["outcomes"].items()):
+        breakdown = ", ".join(f"{o}={c}" for o, c in sorted(counts.items()))
+        lines.append(f"  {kind:<14} {breakdown}")
+    return lines
+
+
+def saturation(results: list[LoadResult], tolerance: float = 0.95) -> float | None:
+    """The first offered rate that throughput or errors stopped keeping up with."""
+    for result in results:
+        rate = result["rate"]
+        if rate and (result["throughput_rps"] < rate * tolerance or result["errors"]):
+            return rate
+    return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=("inprocess", "http"), default="inprocess")
+    parser.add_argument("--url", help="endpoint to load instead of a local server")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        action="append",
+        help="requests per second; repeat to sweep (default: unpaced)",
+    )
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="seconds")
+    parser.add_argument(
+        "-n", type=int, help="requests per run (default: rate * duration, or 2000)"
+    )
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="kind=weight,...")
+    parser.add_argument("--workers", type=int, default=16, help="local server pool")
+    parser.add_argument("--ec2-latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    configure(args.ec2_latency_ms / 1000)
+    stop_server = None
+    target: InProcessTarget | HttpTarget
+    if args.target == "inprocess":
+        target = InProcessTarget()
+    else:
+        url = args.url
+        if url is None:
+            url, stop_server = start_server(args.workers)
+        target = HttpTarget(url)
+
+    results: list[LoadResult] = []
+    first_id = 1
+    try:
+        # Warm up the connections, the runtime context and the caches.
+        warmup = generate(args.concurrency * 4, {"ping": 1, "status": 1}, first_id)
+        run(target, warmup, None, args.concurrency)
+        first_id += len(warmup)
+        for rate in args.rate or [None]:
+            n = args.n or (int(rate * args.duration) if rate else 2000)
+            # Interaction ids never repeat across runs, except for duplicates.
+            requests = generate(
+                n, mix, first_id, gap=args.concurrency * 4, seed=args.seed
+            )
+            first_id += n
+            samples, duration = run(target, requests, rate, args.concurrency)
+            results.append(
+                report(target.name, rate, args.concurrency, samples, duration)
+            )
+            print("\n".join(format_result(results[-1])))
+    finally:
+        target.close()
+        if stop_server:
+            stop_server()
+
+    if len(results) > 1:
+        saturated = saturation(results)
+        print(
+            f"Saturated at {saturated:g}/s"
+            if saturated
+            else "Kept up with every offered rate"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import socket
+import struct
+from socketserver import BaseRequestHandler, ThreadingUDPServer
+from threading import Lock, Thread
+from typing import Any, Final
+
+RAKNET_MAGIC: Final[bytes] = bytes.fromhex("00ffff00fefefefefdfdfdfd12345678")
+SERVER_GUID: Final[int] = 0x0123456789ABCDEF
+SERVER_ID_STRING: Final[str] = (
+    f"MCPE;Dedicated Server;712;1.21.2;3;10;{SERVER_GUID};"
+    "Bedrock level;Survival;1;19132;19133;"
+)
+
+
+class FakeBedrockServer:
+    """Local stand-in for a Bedrock server's RakNet offline messages.
+
+    Answers every unconnected ping (0x01) with an unconnected pong (0x1c) carrying
+    server_id_string, and records the datagrams it receives. When silent, it
+    records without answering. When reply is set, it answers every datagram
+    with reply instead, like an unrelated service on the port.
+    """
+
+    def __init__(
+        self,
+        server_id_string: str = SERVER_ID_STRING,
+        silent: bool = False,
+        reply: bytes | None = None,
+    ):
+        self.server_id_string = server_id_string
+        self.silent = silent
+        self.reply = reply
+        self.datagrams: list[bytes] = []
+        self.lock = Lock()
+        stub = self
+
+        class Handler(BaseRequestHandler):
+            def handle(self) -> None:
+                data, sock = self.request
+                with stub.lock:
+                    stub.datagrams.append(data)
+                if stub.silent:
+                    return
+                if stub.reply is not None:
+                    sock.sendto(stub.reply, self.client_address)
+                    return
+                if not data or data[0] != 0x01 or len(data) < 9:
+                    return
+                motd = stub.server_id_string.encode()
+                pong = (
+                    b"\x1c"
+                    + data[1:9]
+                    + struct.pack(">Q", SERVER_GUID)
+                    + RAKNET_MAGIC
+                    + struct.pack(">H", len(motd))
+                    + motd
+                )
+                sock.sendto(pong, self.client_address)
+
+        self.server = ThreadingUDPServer(("127.0.0.1", 0), Handler)
+        self.host, self.port = self.server.server_address[:2]
+        self.thread = Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    def __enter__(self) -> "FakeBedrockServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def closed_udp_port() -> int:
+    """A local UDP port with nothing listening on it."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,80 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, TypedDict
+
+
+class RecordedRequest(TypedDict):
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: Any
+    client_port: int
+
+
+class DiscordApiStub:
+    """Local stand-in for the Discord HTTP API.
+
+    Records every request and answers with the response registered for its
+    method and path (200 with an empty JSON object by default). A response is
+    (status, payload) or (status, payload, headers); a list of responses is
+    served in order, repeating the last one.
+    """
+
+    def __init__(self) -> None:
+        self.requests: list[RecordedRequest] = []
+        self.responses: dict[tuple[str, str], Any] = {}
+        self.lock = Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                with stub.lock:
+                    response = stub.next_response(self.command, self.path)
+                    stub.requests.append(
+                        {
+                            "method": self.command,
+                            "path": self.path,
+                            "headers": dict(self.headers),
+                            "body": json.loads(raw) if raw else None,
+                            "client_port": self.client_address[1],
+                        }
+                    )
+                status, payload, *extra = response
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (extra[0] if extra else {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    def next_response(self, method: str, path: str) -> tuple[Any, ...]:
+        response = self.responses.get((method, path), (200, {}))
+        if isinstance(response, list):
+            return response.pop(0) if len(response) > 1 else response[0]
+        return response
+
+    def __enter__(self) -> "DiscordApiStub":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+from typing import Any, Final
+
+INSTANCE_ID: Final[str] = "i-0123456789abcdef0"
+REGION_NAME: Final[str] = "us-east-1"
+
+START_INSTANCES_RESPONSE: Final[dict[str, Any]] = {
+    "StartingInstances": [
+        {
+            "InstanceId": INSTANCE_ID,
+            "CurrentState": {"Code": 0, "Name": "pending"},
+            "PreviousState": {"Code": 80, "Name": "stopped"},
+        }
+    ]
+}
+STOP_INSTANCES_RESPONSE: Final[dict[str, Any]] = {
+    "StoppingInstances": [
+        {
+            "InstanceId": INSTANCE_ID,
+            "CurrentState": {"Code": 64, "Name": "stopping"},
+            "PreviousState": {"Code": 16, "Name": "running"},
+        }
+    ]
+}
+DESCRIBE_INSTANCES_RESPONSE: Final[dict[str, Any]] = {
+    "Reservations": [
+        {
+            "Instances": [
+                {
+                    "InstanceId": INSTANCE_ID,
+                    "InstanceType": "t3.medium",
+                    "LaunchTime": datetime(
+                        2025, 5, 31, 13, 28, 12, tzinfo=timezone.utc
+                    ),
+                    "PublicIpAddress": "203.0.113.10",
+                    "State": {"Code": 16, "Name": "running"},
+                }
+            ]
+        }
+    ]
+}
+
+
+def state_change_event(
+    state: str, time: str, instance_id: str = INSTANCE_ID
+) -> dict[str, Any]:
+    """An EventBridge "EC2 Instance State-change Notification" event."""
+    return {
+        "version": "0",
+        "id": "7bf73129-1428-4cd3-a780-95db273d1602",
+        "detail-type": "EC2 Instance State-change Notification",
+        "source": "aws.ec2",
+        "account": "123456789012",
+        "time": time,
+        "region": REGION_NAME,
+        "resources": [f"arn:aws:ec2:{REGION_NAME}:123456789012:instance/{instance_id}"],
+        "detail": {"instance-id": instance_id, "state": state},
+    }
@@ -2,11 +2,24 @@ import json
 from typing import Any, Generator
 
 from unittest.mock import patch
+import boto3  # type: ignore
 import pytest
+from botocore.stub import Stubber  # type: ignore
 
 from nacl.signing import SigningKey, VerifyKey
 from command_handler.tests.integration.resources.context import CONTEXT
+from integration.resources.be_start import BE_START_BODY
+from integration.resources.bedrock import FakeBedrockServer
+from integration.resources.ec2 import (
+    DESCRIBE_INSTANCES_RESPONSE,
+    INSTANCE_ID,
+    REGION_NAME,
+    START_INSTANCES_RESPONSE,
+)
 from integration.resources.ping import PING_BODY
+from typedefs.enums import InteractionCallbackType
+from utils.metrics import MemorySink, set_metric_sink
+from utils.runtime import reset_runtime
 
 
 @pytest.fixture(scope="function")
@@ -16,7 +29,9 @@ def mocked_signing_key() -> Generator[SigningKey, None, None]:
     verify_key: VerifyKey = signing_key.verify_key
     # getting env APP_PUBLIC_KEY returns mocked value.
     with patch.dict("os.environ", {"APP_PUBLIC_KEY": verify_key.encode().hex()}):
+        reset_runtime()
         yield signing_key
+    reset_runtime()
     # patch.dict("os.environ", {"APP_PUBLIC_KEY": verify_key.encode().hex()})
     # # from app import lambda_handler
 
@@ -60,6 +75,7 @@ def test_lambda_handler_ping_positive(mocked_signing_key: SigningKey):
 
     response: dict[str, Any] = lambda_handler(event, CONTEXT)
     assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"type": InteractionCallbackType.PONG}
 
 
 def test_lambda_handler_ping_no_signature(mocked_signing_key: SigningKey):
@@ -136,3 +152,335 @@ def test_lambda_handler_be_start_positive(mocked_signing_key: SigningKey):
 
     response: dict[str, Any] = lambda_handler(event, CONTEXT)
     assert response["statusCode"] == 200
+
+
+def signed_command_event(
+    signing_key: SigningKey,
+    action: str,
+    timestamp: str = "1748698092919",
+    interaction_id: str = BE_START_BODY["id"],
+    options: list[dict[str, Any]] | None = None,
+    interaction_type: int = 2,
+) -> dict[str, Any]:
+    """Signed /be <action> event based on BE_START_BODY.
+
+    options replaces the action option, e.g. for an autocomplete interaction.
+    """
+    body: str = json.dumps(
+        {
+            **BE_START_BODY,
+            "id": interaction_id,
+            "data": {
+                **BE_START_BODY["data"],
+                "options": options or [{"name": "action", "type": 3, "value": action}],
+            },
+            "type": interaction_type,
+        }
+    )
+    message = f"{timestamp}{body}".encode()
+    signature = signing_key.sign(message).signature.hex()
+    return {
+        "body": body,
+        "headers": {
+            "content-type": "application/json",
+            "x-signature-ed25519": signature,
+            "x-signature-timestamp": timestamp,
+        },
+        "request_context": CONTEXT,
+        "route_key": "POST /commands",
+        "version": "2.0",
+    }
+
+
+def test_lambda_handler_be_start_deferred(mocked_signing_key: SigningKey):
+    """Command /be start answers with a deferred response in deferred mode."""
+    from app import lambda_handler
+
+    event = signed_command_event(mocked_signing_key, "start")
+    with patch.dict(
+        "os.environ",
+        {
+            "SERVER_INSTANCE_ID": INSTANCE_ID,
+            "SERVER_REGION_NAME": REGION_NAME,
+            "DEFERRED_WORKER_FUNCTION": "FollowupWorkerFunction",
+        },
+    ), patch("commands.dispatch_followup") as dispatch_followup:
+        response: dict[str, Any] = lambda_handler(event, CONTEXT)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {
+        "type": InteractionCallbackType.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE
+    }
+    dispatch_followup.assert_called_once_with(
+        "FollowupWorkerFunction",
+        {
+            "action": "start",
+            "application_id": BE_START_BODY["application_id"],
+            "token": BE_START_BODY["token"],
+            "servers": ["be"],
+        },
+    )
+
+
+def test_lambda_handler_be_status(mocked_signing_key: SigningKey):
+    """Command /be status is answered from a cached DescribeInstances call."""
+    from app import lambda_handler
+
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    with patch.dict(
+        "os.environ",
+        {
+            "SERVER_INSTANCE_ID": INSTANCE_ID,
+            "SERVER_REGION_NAME": REGION_NAME,
+            # Nothing answers on the documentation IP of the instance.
+            "BEDROCK_QUERY_TIMEOUT": "0.05",
+        },
+    ), patch("utils.ec2.client", return_value=ec2), Stubber(ec2) as stubber:
+        stubber.add_response("describe_instances", DESCRIBE_INSTANCES_RESPONSE)
+        sink = MemorySink()
+        previous_sink = set_metric_sink(sink)
+        responses = [
+            lambda_handler(
+                signed_command_event(
+                    mocked_signing_key, "status", interaction_id=f"{i}" * 19
+                ),
+                CONTEXT,
+            )
+            for i in range(3)
+        ]
+        set_metric_sink(previous_sink)
+        stubber.assert_no_pending_responses()
+
+    for response in responses:
+        assert response["statusCode"] == 200
+        content = json.loads(response["body"])["data"]["content"]
+        assert content.startswith("State: running\nIP: 203.0.113.10")
+        assert content.endswith("Server: not responding")
+    # One metric record per invocation, with the stages of the handler.
+    assert len(sink.records) == 3
+    for record in sink.records:
+        assert (record["command"], record["action"], record["outcome"]) == (
+            "be",
+            "status",
+            "ok",
+        )
+        assert {"VerifyLatency", "DispatchLatency", "Ec2Latency"} <= record.keys()
+
+
+def test_lambda_handler_be_status_players(mocked_signing_key: SigningKey):
+    """Command /be status reports the players of a running Bedrock server."""
+    from app import lambda_handler
+
+    instance = {
+        **DESCRIBE_INSTANCES_RESPONSE["Reservations"][0]["Instances"][0],
+        "PublicIpAddress": "127.0.0.1",
+    }
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    with FakeBedrockServer() as server, patch.dict(
+        "os.environ",
+        {
+            "SERVERS": json.dumps(
+                {
+                    "be": {
+                        "instance_id": INSTANCE_ID,
+                        "region_name": REGION_NAME,
+                        "port": server.port,
+                    }
+                }
+            )
+        },
+    ), patch("utils.ec2.client", return_value=ec2), Stubber(ec2) as stubber:
+        stubber.add_response(
+            "describe_instances", {"Reservations": [{"Instances": [instance]}]}
+        )
+        response = lambda_handler(
+            signed_command_event(mocked_signing_key, "status"), CONTEXT
+        )
+
+    content = json.loads(response["body"])["data"]["content"]
+    assert content.endswith("Players: 3/10\nVersion: 1.21.2")
+
+
+def test_lambda_handler_be_status_ec2_unavailable(mocked_signing_key: SigningKey):
+    """A failing status source degrades the reply instead of failing it."""
+    from app import lambda_handler
+
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    with patch.dict(
+        "os.environ",
+        {"SERVER_INSTANCE_ID": INSTANCE_ID, "SERVER_REGION_NAME": REGION_NAME},
+    ), patch("utils.ec2.client", return_value=ec2), Stubber(ec2) as stubber:
+        stubber.add_client_error("describe_instances", "RequestLimitExceeded")
+        response = lambda_handler(
+            signed_command_event(mocked_signing_key, "status"), CONTEXT
+        )
+
+    assert response["statusCode"] == 200
+    content = json.loads(response["body"])["data"]["content"]
+    assert (
+        content
+        == "State: unknown\n(EC2 state: unavailable)\n(server query: unavailable)"
+    )
+
+
+def test_lambda_handler_autocomplete(mocked_signing_key: SigningKey):
+    """Autocomplete answers from the server config without any AWS call."""
+    from app import lambda_handler
+
+    servers = {
+        "creative": {
+            "instance_id": INSTANCE_ID,
+            "region_name": REGION_NAME,
+            "aliases": ["build"],
+        },
+        "survival": {"instance_id": INSTANCE_ID, "region_name": REGION_NAME},
+    }
+
+    def autocomplete(server: str) -> dict[str, Any]:
+        # Every keystroke is a new interaction, but repeats must answer as well.
+        response = lambda_handler(
+            signed_command_event(
+                mocked_signing_key,
+                "status",
+                options=[
+                    {"name": "action", "type": 3, "value": "status"},
+                    {"name": "server", "type": 3, "value": server, "focused": True},
+                ],
+                interaction_type=4,
+            ),
+            CONTEXT,
+        )
+        assert response["statusCode"] == 200
+        return json.loads(response["body"])
+
+    with patch.dict("os.environ", {"SERVERS": json.dumps(servers)}), patch(
+        "utils.ec2.client", side_effect=AssertionError("EC2 must not be called")
+    ):
+        assert autocomplete("B") == {
+            "type": 8,
+            "data": {"choices": [{"name": "creative (build)", "value": "creative"}]},
+        }
+        assert autocomplete("B") == autocomplete("b")
+        assert [c["value"] for c in autocomplete("")["data"]["choices"]] == [
+            "creative",
+            "survival",
+            "all",
+        ]
+        assert autocomplete("x")["data"]["choices"] == []
+
+
+def test_lambda_handler_autocomplete_action(mocked_signing_key: SigningKey):
+    from app import lambda_handler
+
+    response = lambda_handler(
+        signed_command_event(
+            mocked_signing_key,
+            "st",
+            options=[{"name": "action", "type": 3, "value": "st", "focused": True}],
+            interaction_type=4,
+        ),
+        CONTEXT,
+    )
+    choices = json.loads(response["body"])["data"]["choices"]
+    assert [c["value"] for c in choices] == ["start", "stop", "status"]
+
+
+def test_lambda_handler_unknown_action(mocked_signing_key: SigningKey):
+    """A typed action that matches nothing is answered to the user only."""
+    from app import lambda_handler
+
+    with patch.dict(
+        "os.environ",
+        {"SERVER_INSTANCE_ID": INSTANCE_ID, "SERVER_REGION_NAME": REGION_NAME},
+    ), patch("utils.ec2.client") as client:
+        response: dict[str, Any] = lambda_handler(
+            signed_command_event(mocked_signing_key, "sta"), CONTEXT
+        )
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {
+        "type": 4,
+        "data": {
+            "tts": False,
+            "content": "Unknown action: sta. Valid values: start, stop, status",
+            "flags": 64,
+        },
+    }
+    client.assert_not_called()
+
+
+def test_lambda_handler_unknown_server(mocked_signing_key: SigningKey):
+    """An unknown server is answered with the configured ones."""
+    from app import lambda_handler
+
+    servers = {
+        "creative": {"instance_id": INSTANCE_ID, "region_name": REGION_NAME},
+        "survival": {"instance_id": INSTANCE_ID, "region_name": REGION_NAME},
+    }
+    with patch.dict("os.environ", {"SERVERS": json.dumps(servers)}), patch(
+        "utils.ec2.client"
+    ) as client:
+        response: dict[str, Any] = lambda_handler(
+            signed_command_event(
+                mocked_signing_key,
+                "start",
+                options=[
+                    {"name": "action", "type": 3, "value": "start"},
+                    {"name": "server", "type": 3, "value": "hardcore"},
+                ],
+            ),
+            CONTEXT,
+        )
+
+    assert response["statusCode"] == 200
+    data = json.loads(response["body"])["data"]
+    assert data["content"] == (
+        "Unknown server: hardcore. Valid values: creative, survival, all"
+    )
+    assert data["flags"] == 64
+    client.assert_not_called()
+
+
+def test_lambda_handler_duplicate_delivery(mocked_signing_key: SigningKey):
+    """A retried delivery of the same interaction never reaches EC2 twice."""
+    from app import lambda_handler
+
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    event = signed_command_event(mocked_signing_key, "start")
+    with patch.dict(
+        "os.environ",
+        {"SERVER_INSTANCE_ID": INSTANCE_ID, "SERVER_REGION_NAME": REGION_NAME},
+    ), patch("utils.ec2.client", return_value=ec2), Stubber(ec2) as stubber:
+        stubber.add_response("start_instances", START_INSTANCES_RESPONSE)
+        first: dict[str, Any] = lambda_handler(event, CONTEXT)
+        second: dict[str, Any] = lambda_handler(event, CONTEXT)
+        stubber.assert_no_pending_responses()
+
+    assert json.loads(first["body"])["data"]["content"] == (
+        "State changed: stopped -> pending"
+    )
+    assert second["statusCode"] == 200
+    assert json.loads(second["body"])["data"] == {
+        "tts": False,
+        "content": "This request is already being processed.",
+        "flags": 64,
+    }
+
+
+def test_lambda_handler_stale_timestamp(mocked_signing_key: SigningKey):
+    """Signatures outside SIGNATURE_MAX_AGE are rejected."""
+    from app import lambda_handler
+
+    event = signed_command_event(mocked_signing_key, "start", timestamp="1748698092")
+    with patch.dict(
+        "os.environ",
+        {
+            "SERVER_INSTANCE_ID": INSTANCE_ID,
+            "SERVER_REGION_NAME": REGION_NAME,
+            "SIGNATURE_MAX_AGE": "300",
+        },
+    ), patch("utils.ec2.client") as client:
+        response: dict[str, Any] = lambda_handler(event, CONTEXT)
+
+    assert response["statusCode"] == 401
+    client.assert_not_called()
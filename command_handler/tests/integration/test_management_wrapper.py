@@ -0,0 +1,195 @@
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Final, Generator
+from unittest.mock import patch
+
+import pytest
+
+from integration.resources.discord_api import DiscordApiStub
+
+WRAPPER_PATH: Final[Path] = (
+    Path(__file__).resolve().parents[3] / "management-wrapper.py"
+)
+APPLICATION_ID: Final[str] = "1111111111111111111"
+GUILD_ID: Final[str] = "3333333333333333333"
+COMMANDS_PATH: Final[str] = f"/applications/{APPLICATION_ID}/guilds/{GUILD_ID}/commands"
+
+
+def commands_path(guild_id: str) -> str:
+    return f"/applications/{APPLICATION_ID}/guilds/{guild_id}/commands"
+
+
+def load_wrapper(base_url: str, guild_id: str = GUILD_ID) -> ModuleType:
+    with patch.dict(
+        "os.environ",
+        {
+            "DISCORD_BOT_TOKEN": "bot-token",
+            "GUILD_ID": guild_id,
+            "APPLICATION_ID": APPLICATION_ID,
+            "DISCORD_API_BASE_URL": base_url,
+        },
+    ):
+        spec = importlib.util.spec_from_file_location(
+            "management_wrapper", WRAPPER_PATH
+        )
+        assert spec and spec.loader
+        module = importlib.util.module_from_spec(spec)
+        # typeguard looks the module up while decorating its functions.
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        return module
+
+
+def as_remote(command: dict[str, Any]) -> dict[str, Any]:
+    """The command as Discord returns it: extra keys, "required" omitted if false."""
+    options = [
+        {k: v for k, v in o.items() if not (k == "required" and v is False)}
+        for o in command["options"]
+    ]
+    return {
+        **command,
+        "id": "4444444444444444444",
+        "application_id": APPLICATION_ID,
+        "guild_id": GUILD_ID,
+        "version": "5555555555555555555",
+        "default_member_permissions": None,
+        "nsfw": False,
+        "options": options,
+    }
+
+
+@pytest.fixture(scope="function")
+def discord_api() -> Generator[DiscordApiStub, None, None]:
+    with DiscordApiStub() as stub:
+        yield stub
+
+
+def test_sync_up_to_date(discord_api: DiscordApiStub):
+    wrapper = load_wrapper(discord_api.base_url)
+    discord_api.responses[("GET", COMMANDS_PATH)] = (
+        200,
+        [as_remote(c) for c in wrapper.commands],
+    )
+
+    assert wrapper.sync_commands() is None
+    assert [(r["method"], r["path"]) for r in discord_api.requests] == [
+        ("GET", COMMANDS_PATH)
+    ]
+
+
+def test_sync_pushes_changes_in_bulk(discord_api: DiscordApiStub):
+    wrapper = load_wrapper(discord_api.base_url)
+    outdated = as_remote(wrapper.commands[0])
+    # The action used to be a static choice instead of an autocomplete.
+    del outdated["options"][0]["autocomplete"]
+    outdated["options"][0]["choices"] = [
+        {"name": "start", "value": "start"},
+        {"name": "stop", "value": "stop"},
+    ]
+    removed = {**as_remote(wrapper.commands[0]), "name": "old"}
+    discord_api.responses[("GET", COMMANDS_PATH)] = (200, [outdated, removed])
+
+    assert wrapper.diff_commands(wrapper.commands, [outdated, removed]) == {
+        "added": [],
+        "changed": ["be"],
+        "removed": ["old"],
+    }
+    res = wrapper.sync_commands()
+
+    assert res is not None and res.status_code == 200
+    assert [(r["method"], r["path"]) for r in discord_api.requests] == [
+        ("GET", COMMANDS_PATH),
+        ("PUT", COMMANDS_PATH),
+    ]
+    put = discord_api.requests[1]
+    assert put["body"] == wrapper.commands
+    assert put["headers"]["Authorization"] == "Bot bot-token"
+
+
+def test_session_keeps_connection_alive(discord_api: DiscordApiStub):
+    wrapper = load_wrapper(discord_api.base_url)
+    discord_api.responses[("GET", COMMANDS_PATH)] = (200, [])
+
+    wrapper.list_commands()
+    wrapper.list_commands()
+
+    connections = {r["client_port"] for r in discord_api.requests}
+    assert len(connections) == 1
+
+
+def test_retry_after_429(discord_api: DiscordApiStub):
+    wrapper = load_wrapper(discord_api.base_url)
+    sleeps: list[float] = []
+    wrapper.limiter.sleep = sleeps.append
+    discord_api.responses[("GET", COMMANDS_PATH)] = [
+        (429, {"message": "You are being rate limited.", "retry_after": 0.25}),
+        (429, {"message": "You are being rate limited.", "retry_after": 0.25}),
+        (200, []),
+    ]
+
+    res = wrapper.list_commands()
+
+    assert res.status_code == 200
+    assert len(discord_api.requests) == 3
+    # retry_after with exponential backoff
+    assert sleeps == [0.25, 0.5]
+
+
+def test_waits_for_exhausted_bucket(discord_api: DiscordApiStub):
+    wrapper = load_wrapper(discord_api.base_url)
+    sleeps: list[float] = []
+    wrapper.limiter.sleep = sleeps.append
+    discord_api.responses[("GET", COMMANDS_PATH)] = (
+        200,
+        [],
+        {
+            "X-RateLimit-Bucket": "abcd1234",
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset-After": "30",
+        },
+    )
+
+    wrapper.list_commands()
+    assert sleeps == []
+    wrapper.list_commands()
+    assert len(sleeps) == 1 and 29 < sleeps[0] <= 30
+
+
+def test_sync_all_guilds(discord_api: DiscordApiStub):
+    wrapper = load_wrapper(discord_api.base_url)
+    wrapper.limiter.sleep = lambda _: None
+    guild_ids = [f"{i}" * 19 for i in range(1, 7)]
+    up_to_date, outdated, failing, limited = guild_ids[:4]
+    remote = [as_remote(c) for c in wrapper.commands]
+    for guild_id in guild_ids:
+        discord_api.responses[("GET", commands_path(guild_id))] = (200, [])
+    discord_api.responses[("GET", commands_path(up_to_date))] = (200, remote)
+    discord_api.responses[("GET", commands_path(failing))] = (500, {})
+    discord_api.responses[("PUT", commands_path(limited))] = [
+        (429, {"retry_after": 0.01}),
+        (200, wrapper.commands),
+    ]
+
+    results = wrapper.sync_all_guilds(guild_ids, max_workers=3)
+
+    assert list(results) == guild_ids
+    assert results[up_to_date] == "up to date"
+    assert results[outdated].startswith("updated")
+    assert results[failing].startswith("failed")
+    assert results[limited].startswith("updated")
+    puts = [r["path"] for r in discord_api.requests if r["method"] == "PUT"]
+    # One PUT per outdated guild, plus the retry after 429
+    expected = [g for g in guild_ids if g not in (up_to_date, failing)] + [limited]
+    assert sorted(puts) == sorted(commands_path(g) for g in expected)
+
+
+@pytest.mark.parametrize("command", ["list", "register", "sync", "delete", "sync-all"])
+def test_guild_is_required(discord_api: DiscordApiStub, command: str):
+    wrapper = load_wrapper(discord_api.base_url, guild_id="")
+    with patch.object(sys, "argv", ["management-wrapper.py", command]), patch.dict(
+        "os.environ", {"GUILD_IDS": ""}
+    ), pytest.raises(SystemExit, match="required"):
+        wrapper.main()
+    assert discord_api.requests == []
@@ -0,0 +1,70 @@
+from typing import Generator
+from unittest.mock import patch
+
+import boto3  # type: ignore
+import pytest
+from botocore.stub import Stubber  # type: ignore
+
+from integration.resources.ec2 import (
+    DESCRIBE_INSTANCES_RESPONSE,
+    INSTANCE_ID,
+    REGION_NAME,
+    state_change_event,
+)
+from utils.runtime import get_runtime, reset_runtime
+
+INSTANCE = DESCRIBE_INSTANCES_RESPONSE["Reservations"][0]["Instances"][0]
+
+
+@pytest.fixture(scope="function")
+def ec2_stubber() -> Generator[Stubber, None, None]:
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    with patch.dict(
+        "os.environ",
+        {
+            "SERVER_INSTANCE_ID": INSTANCE_ID,
+            "SERVER_REGION_NAME": REGION_NAME,
+            "PROJECTED_STATUS": "true",
+        },
+    ), patch("utils.ec2.client", return_value=ec2), Stubber(ec2) as stubber:
+        reset_runtime()
+        yield stubber
+        stubber.assert_no_pending_responses()
+    reset_runtime()
+
+
+def test_projector_records_boot(ec2_stubber: Stubber):
+    from projector import lambda_handler
+
+    ec2_stubber.add_response(
+        "describe_instances",
+        {"Reservations": [{"Instances": [{**INSTANCE, "State": {"Name": "pending"}}]}]},
+    )
+    ec2_stubber.add_response("describe_instances", DESCRIBE_INSTANCES_RESPONSE)
+    lambda_handler(state_change_event("pending", "2025-05-31T13:28:12Z"), None)
+    record = lambda_handler(state_change_event("running", "2025-05-31T13:28:47Z"), None)
+    assert record is not None
+    assert record["state_name"] == "running"
+
+    # Read back without calling DescribeInstances.
+    status = get_runtime().fleet.status(["be"])["be"]
+    assert status["state_name"] == "running"
+    assert status["public_ip_address"] == "203.0.113.10"
+    assert status["boot_seconds"] == 35.0
+
+
+def test_projector_ignores_other_instances(ec2_stubber: Stubber):
+    from projector import lambda_handler
+
+    event = state_change_event("running", "2025-05-31T13:28:47Z", "i-0000000000000000f")
+    assert lambda_handler(event, None) is None
+
+
+def test_projector_without_describe(ec2_stubber: Stubber):
+    from projector import lambda_handler
+
+    ec2_stubber.add_client_error("describe_instances", "RequestLimitExceeded")
+    record = lambda_handler(state_change_event("stopped", "2025-05-31T13:28:47Z"), None)
+    assert record is not None
+    assert record["state_name"] == "stopped"
+    assert record["status"]["public_ip_address"] is None
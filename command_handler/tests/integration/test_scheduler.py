@@ -0,0 +1,74 @@
+import json
+from typing import Generator
+from unittest.mock import patch
+
+import boto3  # type: ignore
+import pytest
+from botocore.stub import Stubber  # type: ignore
+
+from integration.resources.bedrock import SERVER_ID_STRING, FakeBedrockServer
+from integration.resources.ec2 import (
+    DESCRIBE_INSTANCES_RESPONSE,
+    INSTANCE_ID,
+    REGION_NAME,
+    STOP_INSTANCES_RESPONSE,
+)
+from utils.runtime import reset_runtime
+
+INSTANCE = {
+    **DESCRIBE_INSTANCES_RESPONSE["Reservations"][0]["Instances"][0],
+    "PublicIpAddress": "127.0.0.1",
+}
+EMPTY_SERVER_ID_STRING = SERVER_ID_STRING.replace(";3;10;", ";0;10;")
+
+
+@pytest.fixture(scope="function")
+def empty_server() -> Generator[FakeBedrockServer, None, None]:
+    with FakeBedrockServer(EMPTY_SERVER_ID_STRING) as server, patch.dict(
+        "os.environ",
+        {
+            "SERVERS": json.dumps(
+                {
+                    "be": {
+                        "instance_id": INSTANCE_ID,
+                        "region_name": REGION_NAME,
+                        "port": server.port,
+                    }
+                }
+            ),
+            "IDLE_STOP_CHECKS": "2",
+            # Each run must query the server again.
+            "BEDROCK_QUERY_TTL": "0",
+        },
+    ):
+        reset_runtime()
+        yield server
+    reset_runtime()
+
+
+def test_scheduler_stops_empty_server(empty_server: FakeBedrockServer):
+    from scheduler import lambda_handler
+
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    with patch("utils.ec2.client", return_value=ec2), Stubber(ec2) as stubber:
+        stubber.add_response(
+            "describe_instances", {"Reservations": [{"Instances": [INSTANCE]}]}
+        )
+        first = lambda_handler({}, None)
+        stubber.add_response(
+            "describe_instances", {"Reservations": [{"Instances": [INSTANCE]}]}
+        )
+        stubber.add_response(
+            "stop_instances", STOP_INSTANCES_RESPONSE, {"InstanceIds": [INSTANCE_ID]}
+        )
+        second = lambda_handler({}, None)
+        stubber.assert_no_pending_responses()
+
+    assert first["be"] == {
+        "state_name": "running",
+        "players": 0,
+        "idle_checks": 1,
+        "stopped": False,
+    }
+    assert second["be"]["stopped"]
+    assert len(empty_server.datagrams) == 2
@@ -0,0 +1,109 @@
+import json
+from http.client import HTTPConnection
+from socket import create_connection
+from threading import Thread
+from typing import Generator
+from unittest.mock import patch
+
+import pytest
+from nacl.signing import SigningKey
+
+from integration.resources.ec2 import INSTANCE_ID, REGION_NAME
+from integration.resources.ping import PING_BODY
+from utils.runtime import reset_runtime
+
+SIGNING_KEY = SigningKey(b"0123456789abcdef0123456789abcdef")
+TIMESTAMP = "1748698092919"
+
+
+def signed(body: str) -> dict[str, str]:
+    signature = SIGNING_KEY.sign(f"{TIMESTAMP}{body}".encode()).signature.hex()
+    return {
+        "Content-Type": "application/json",
+        "X-Signature-Ed25519": signature,
+        "X-Signature-Timestamp": TIMESTAMP,
+    }
+
+
+@pytest.fixture(scope="function")
+def server() -> Generator[tuple[str, int], None, None]:
+    from server import PooledHTTPServer, prime
+
+    with patch.dict(
+        "os.environ",
+        {
+            "APP_PUBLIC_KEY": SIGNING_KEY.verify_key.encode().hex(),
+            "SERVER_INSTANCE_ID": INSTANCE_ID,
+            "SERVER_REGION_NAME": REGION_NAME,
+        },
+    ):
+        reset_runtime()
+        prime()
+        with PooledHTTPServer(("127.0.0.1", 0), workers=2) as httpd:
+            thread = Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+            thread.start()
+            yield httpd.server_address[:2]
+            httpd.shutdown()
+    reset_runtime()
+
+
+def test_ping_over_kept_alive_connection(server: tuple[str, int]):
+    body = json.dumps(PING_BODY)
+    connection = HTTPConnection(*server, timeout=5)
+    ports = set()
+    for _ in range(3):
+        connection.request("POST", "/commands", body, signed(body))
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.getheader("Content-Type") == "application/json"
+        assert json.loads(response.read()) == {"type": 1}
+        ports.add(connection.sock.getsockname()[1])
+    connection.close()
+    # All three requests went over one connection.
+    assert len(ports) == 1
+
+
+def test_bad_signature(server: tuple[str, int]):
+    body = json.dumps(PING_BODY)
+    headers = signed(body)
+    headers["X-Signature-Timestamp"] = "1748698092920"
+    connection = HTTPConnection(*server, timeout=5)
+    connection.request("POST", "/commands", body, headers)
+    assert connection.getresponse().status == 401
+    connection.close()
+
+
+def test_unknown_path(server: tuple[str, int]):
+    connection = HTTPConnection(*server, timeout=5)
+    connection.request("POST", "/other", "{}")
+    assert connection.getresponse().status == 404
+    connection.close()
+
+
+@pytest.mark.parametrize("content_length", ["-1", "abc", "1_0", "+2"])
+def test_invalid_content_length(server: tuple[str, int], content_length: str):
+    with create_connection(server, timeout=5) as sock:
+        request = f"POST /commands HTTP/1.1\r\nContent-Length: {content_length}\r\n"
+        sock.sendall(f"{request}\r\n{{}}".encode())
+        assert sock.recv(1024).startswith(b"HTTP/1.1 400 ")
+
+
+def test_prime_builds_shared_state(server: tuple[str, int]):
+    from utils.runtime import get_runtime
+
+    runtime = get_runtime()
+    for name in ("deduplicator", "server_aliases", "server_index", "fleet"):
+        assert name in runtime.__dict__
+
+
+def test_proxy_event_shape():
+    from server import proxy_event
+
+    event = proxy_event(
+        "POST", "/commands?x=1", {"X-Signature-Ed25519": "ab"}, "{}", "127.0.0.1"
+    )
+    assert event["headers"] == {"x-signature-ed25519": "ab"}
+    assert event["rawPath"] == "/commands"
+    assert event["rawQueryString"] == "x=1"
+    assert event["routeKey"] == "POST /commands"
+    assert event["body"] == "{}"
@@ -0,0 +1,158 @@
+import json
+from typing import Any, Generator
+from unittest.mock import patch
+
+import boto3  # type: ignore
+import pytest
+from botocore.stub import Stubber  # type: ignore
+
+from integration.resources.bedrock import FakeBedrockServer
+from integration.resources.discord_api import DiscordApiStub
+from integration.resources.ec2 import (
+    DESCRIBE_INSTANCES_RESPONSE,
+    INSTANCE_ID,
+    REGION_NAME,
+    START_INSTANCES_RESPONSE,
+    STOP_INSTANCES_RESPONSE,
+)
+from utils.runtime import reset_runtime
+
+APPLICATION_ID = "1111111111111111111"
+TOKEN = "interaction-token"
+ORIGINAL_PATH = f"/webhooks/{APPLICATION_ID}/{TOKEN}/messages/@original"
+
+
+@pytest.fixture(scope="function")
+def discord_api() -> Generator[DiscordApiStub, None, None]:
+    with DiscordApiStub() as stub:
+        with patch.dict(
+            "os.environ",
+            {
+                "DISCORD_API_BASE_URL": stub.base_url,
+                "SERVER_INSTANCE_ID": INSTANCE_ID,
+                "SERVER_REGION_NAME": REGION_NAME,
+            },
+        ):
+            reset_runtime()
+            yield stub
+    reset_runtime()
+
+
+@pytest.fixture(scope="function")
+def ec2_stubber() -> Generator[Stubber, None, None]:
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    with Stubber(ec2) as stubber, patch("utils.ec2.client", return_value=ec2):
+        yield stubber
+
+
+def test_worker_start_edits_original(discord_api: DiscordApiStub, ec2_stubber: Stubber):
+    from worker import lambda_handler
+
+    ec2_stubber.add_response(
+        "start_instances", START_INSTANCES_RESPONSE, {"InstanceIds": [INSTANCE_ID]}
+    )
+    lambda_handler(
+        {"action": "start", "application_id": APPLICATION_ID, "token": TOKEN}, None
+    )
+
+    ec2_stubber.assert_no_pending_responses()
+    assert len(discord_api.requests) == 1
+    request: dict[str, Any] = dict(discord_api.requests[0])
+    assert request["method"] == "PATCH"
+    assert request["path"] == ORIGINAL_PATH
+    assert request["body"]["content"] == "State changed: stopped -> pending"
+
+
+def test_worker_stop_edits_original(discord_api: DiscordApiStub, ec2_stubber: Stubber):
+    from worker import lambda_handler
+
+    ec2_stubber.add_response(
+        "stop_instances", STOP_INSTANCES_RESPONSE, {"InstanceIds": [INSTANCE_ID]}
+    )
+    lambda_handler(
+        {"action": "stop", "application_id": APPLICATION_ID, "token": TOKEN}, None
+    )
+
+    assert discord_api.requests[0]["body"]["content"] == (
+        "State changed: running -> stopping"
+    )
+
+
+def test_worker_ec2_error_reports_technical_error(
+    discord_api: DiscordApiStub, ec2_stubber: Stubber
+):
+    from worker import lambda_handler
+
+    ec2_stubber.add_client_error("start_instances", "UnauthorizedOperation")
+    lambda_handler(
+        {"action": "start", "application_id": APPLICATION_ID, "token": TOKEN}, None
+    )
+
+    assert discord_api.requests[0]["path"] == ORIGINAL_PATH
+    assert discord_api.requests[0]["body"]["content"] == (
+        "Technical error. Please contact author."
+    )
+
+
+def test_worker_start_notifies_ready(discord_api: DiscordApiStub, ec2_stubber: Stubber):
+    from worker import lambda_handler
+
+    instance = {
+        **DESCRIBE_INSTANCES_RESPONSE["Reservations"][0]["Instances"][0],
+        "PublicIpAddress": "127.0.0.1",
+    }
+    ec2_stubber.add_response(
+        "start_instances", START_INSTANCES_RESPONSE, {"InstanceIds": [INSTANCE_ID]}
+    )
+    ec2_stubber.add_response(
+        "describe_instances", {"Reservations": [{"Instances": [instance]}]}
+    )
+    with FakeBedrockServer() as server, patch.dict(
+        "os.environ",
+        {
+            "READY_TIMEOUT": "5",
+            "SERVERS": json.dumps(
+                {
+                    "be": {
+                        "instance_id": INSTANCE_ID,
+                        "region_name": REGION_NAME,
+                        "port": server.port,
+                    }
+                }
+            ),
+        },
+    ):
+        reset_runtime()
+        lambda_handler(
+            {"action": "start", "application_id": APPLICATION_ID, "token": TOKEN},
+            None,
+        )
+
+    ec2_stubber.assert_no_pending_responses()
+    assert [(r["method"], r["path"]) for r in discord_api.requests] == [
+        ("PATCH", ORIGINAL_PATH),
+        ("POST", f"/webhooks/{APPLICATION_ID}/{TOKEN}"),
+    ]
+    assert discord_api.requests[1]["body"]["content"] == (
+        f"Server is ready at 127.0.0.1:{server.port}"
+    )
+
+
+def test_worker_webhook_error_does_not_fail(
+    discord_api: DiscordApiStub, ec2_stubber: Stubber, caplog: pytest.LogCaptureFixture
+):
+    from worker import lambda_handler
+
+    # The interaction token expired: Discord answers 404.
+    discord_api.responses[("PATCH", ORIGINAL_PATH)] = (404, {"message": "Unknown"})
+    ec2_stubber.add_response(
+        "stop_instances", STOP_INSTANCES_RESPONSE, {"InstanceIds": [INSTANCE_ID]}
+    )
+    lambda_handler(
+        {"action": "stop", "application_id": APPLICATION_ID, "token": TOKEN}, None
+    )
+
+    ec2_stubber.assert_no_pending_responses()
+    assert len(discord_api.requests) == 1
+    assert "Could not deliver the message: HTTPError 404" in caplog.text
+    assert TOKEN not in caplog.text
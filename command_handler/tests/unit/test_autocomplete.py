@@ -0,0 +1,45 @@
+from typedefs.models import CommandChoice, ServerConfig
+from utils.autocomplete import PrefixIndex, choices_index, servers_index
+
+
+def values(choices: list[CommandChoice]) -> list[str]:
+    return [c.value for c in choices]
+
+
+def test_prefix_lookup():
+    index = choices_index(["start", "stop", "status"])
+    assert values(index.search("")) == ["start", "stop", "status"]
+    assert values(index.search("st")) == ["start", "stop", "status"]
+    assert values(index.search("sta")) == ["start", "status"]
+    assert values(index.search(" STO")) == ["stop"]
+    assert values(index.search("stopped")) == []
+
+
+def test_limit():
+    index = PrefixIndex(
+        ((CommandChoice(name=f"s{i}", value=f"s{i}"), [f"s{i}"]) for i in range(30)),
+        limit=25,
+    )
+    assert len(index.search("")) == 25
+    assert len(index.search("s")) == 25
+    assert values(index.search("s29")) == ["s29"]
+
+
+def test_servers_with_aliases():
+    servers = {
+        "creative": ServerConfig(
+            instance_id="i-1", region_name="us-east-1", aliases=["build", "cr"]
+        ),
+        "survival": ServerConfig(instance_id="i-2", region_name="us-east-1"),
+    }
+    index = servers_index(servers)
+    # A choice matched by its name and an alias is listed once.
+    assert values(index.search("c")) == ["creative"]
+    assert index.search("bu")[0].name == "creative (build, cr)"
+    assert values(index.search("")) == ["creative", "survival", "all"]
+    assert values(index.search("a")) == ["all"]
+
+
+def test_single_server_has_no_all():
+    servers = {"be": ServerConfig(instance_id="i-1", region_name="us-east-1")}
+    assert values(servers_index(servers).search("")) == ["be"]
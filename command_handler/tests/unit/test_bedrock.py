@@ -0,0 +1,104 @@
+import asyncio
+import struct
+
+import pytest
+
+from integration.resources.bedrock import (
+    RAKNET_MAGIC,
+    SERVER_ID_STRING,
+    FakeBedrockServer,
+    closed_udp_port,
+)
+from utils.bedrock import BedrockQuery, parse_pong, ping, unconnected_ping
+
+
+def pong(timestamp_ms: int, server_id_string: str) -> bytes:
+    text = server_id_string.encode()
+    return (
+        b"\x1c"
+        + struct.pack(">QQ", timestamp_ms, 1)
+        + RAKNET_MAGIC
+        + struct.pack(">H", len(text))
+        + text
+    )
+
+
+def test_unconnected_ping():
+    packet = unconnected_ping(1234)
+    assert len(packet) == 33
+    assert packet[0] == 0x01
+    assert struct.unpack(">Q", packet[1:9]) == (1234,)
+    assert packet[9:25] == RAKNET_MAGIC
+    # A fresh GUID per ping, unless one is given
+    assert unconnected_ping(1234)[25:] != packet[25:]
+    assert unconnected_ping(1234, client_guid=7)[25:] == struct.pack(">Q", 7)
+
+
+def test_parse_pong():
+    status = parse_pong(pong(42, SERVER_ID_STRING), timestamp_ms=42)
+    assert status == {
+        "online": True,
+        "motd": "Dedicated Server",
+        "level_name": "Bedrock level",
+        "version": "1.21.2",
+        "protocol": 712,
+        "players_online": 3,
+        "max_players": 10,
+        "game_mode": "Survival",
+        "latency_ms": None,
+    }
+
+
+VALID_PONG = pong(42, SERVER_ID_STRING)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        # Not a pong
+        b"\x1d" + VALID_PONG[1:],
+        # Answers another ping
+        pong(43, SERVER_ID_STRING),
+        # Wrong magic
+        VALID_PONG[:17] + bytes(16) + VALID_PONG[33:],
+        # Too few fields
+        pong(42, "MCPE;motd;712"),
+        # Truncated
+        VALID_PONG[:-5],
+    ],
+)
+def test_parse_pong_rejects(data: bytes):
+    with pytest.raises(ValueError):
+        parse_pong(data, timestamp_ms=42)
+
+
+def test_ping():
+    with FakeBedrockServer() as server:
+        status = asyncio.run(ping(server.host, server.port, timeout=1.0))
+    assert status["online"]
+    assert status["players_online"] == 3
+    assert status["latency_ms"] is not None
+
+
+def test_ping_timeout():
+    with FakeBedrockServer(silent=True) as server:
+        with pytest.raises(TimeoutError):
+            asyncio.run(ping(server.host, server.port, timeout=0.05))
+
+
+def test_query_is_cached():
+    query = BedrockQuery(timeout=1.0, ttl=60)
+    with FakeBedrockServer() as server:
+        first = query.status(server.host, server.port)
+        assert query.status(server.host, server.port) is first
+        assert len(server.datagrams) == 1
+
+
+def test_query_unreachable_is_offline_and_cached():
+    query = BedrockQuery(timeout=0.05, ttl=60)
+    port = closed_udp_port()
+    assert not query.status("127.0.0.1", port)["online"]
+    with FakeBedrockServer(silent=True) as silent:
+        statuses = query.status_many([("127.0.0.1", port), (silent.host, silent.port)])
+    assert [s["online"] for s in statuses] == [False, False]
@@ -0,0 +1,45 @@
+from utils.cache import TtlCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires():
+    clock = FakeClock()
+    cache: TtlCache[str, int] = TtlCache(ttl=10, clock=clock)
+    cache.set("key", 1)
+    clock.now = 9.9
+    assert cache.get("key") == 1
+    clock.now = 10
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_get_or_load_once_per_window():
+    clock = FakeClock()
+    cache: TtlCache[str, int] = TtlCache(ttl=10, clock=clock)
+    calls: list[float] = []
+
+    def loader() -> int:
+        calls.append(clock.now)
+        return len(calls)
+
+    assert [cache.get_or_load("key", loader) for _ in range(5)] == [1] * 5
+    clock.now = 10
+    assert cache.get_or_load("key", loader) == 2
+    assert calls == [0, 10]
+
+
+def test_ttl_cache_invalidate():
+    cache: TtlCache[str, int] = TtlCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    cache.invalidate()
+    assert cache.get("b") is None
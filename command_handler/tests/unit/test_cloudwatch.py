@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import boto3  # type: ignore
+from botocore.stub import ANY, Stubber  # type: ignore
+
+from integration.resources.ec2 import REGION_NAME
+from typedefs.models import ServerConfig
+from utils.cloudwatch import CpuMetrics
+
+NOW = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+SERVERS = {
+    "a": ServerConfig(instance_id="i-000000000000000a1", region_name=REGION_NAME),
+    "b": ServerConfig(instance_id="i-000000000000000b1", region_name=REGION_NAME),
+}
+
+
+def test_utilization_one_call_per_region():
+    cloudwatch = boto3.client("cloudwatch", region_name=REGION_NAME)
+    with Stubber(cloudwatch) as stubber, patch(
+        "utils.cloudwatch.client", return_value=cloudwatch
+    ):
+        stubber.add_response(
+            "get_metric_data",
+            {
+                "MetricDataResults": [
+                    {"Id": "cpu0", "Values": [12.345, 40.0]},
+                    {"Id": "cpu1", "Values": []},
+                ]
+            },
+            {
+                "MetricDataQueries": ANY,
+                "StartTime": datetime(2025, 6, 1, 11, 45, tzinfo=timezone.utc),
+                "EndTime": NOW,
+                "ScanBy": "TimestampDescending",
+            },
+        )
+        cpu = CpuMetrics(SERVERS, now=lambda: NOW).utilization(["a", "b"])
+        stubber.assert_no_pending_responses()
+
+    # The latest datapoint comes first; b has no datapoints while stopped.
+    assert cpu == {"a": 12.3, "b": None}
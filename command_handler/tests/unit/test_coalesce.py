@@ -0,0 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Barrier, Lock
+from time import sleep
+from typing import Any, Callable
+
+import boto3  # type: ignore
+import pytest
+from botocore.stub import Stubber  # type: ignore
+
+from integration.resources.ec2 import (
+    INSTANCE_ID,
+    REGION_NAME,
+    START_INSTANCES_RESPONSE,
+)
+from utils.coalesce import StateChangeCoalescer, lease_key, result_key
+from utils.ec2 import Ec2Instance
+from utils.store import KeyValueStore, MemoryStore, SqliteStore
+
+CHANGE = {"previous_state_name": "stopped", "current_state_name": "pending"}
+
+
+class CountingChange:
+    """A state change that takes a while and counts its calls."""
+
+    def __init__(self, seconds: float = 0.1, fail: int = 0):
+        self.seconds = seconds
+        self.fail = fail
+        self.calls = 0
+        self.lock = Lock()
+
+    def __call__(self) -> dict[str, str]:
+        with self.lock:
+            self.calls += 1
+            failing = self.calls <= self.fail
+        sleep(self.seconds)
+        if failing:
+            raise RuntimeError("throttled")
+        return CHANGE
+
+
+def run_concurrently(
+    coalescers: list[StateChangeCoalescer], change: Callable[[], Any], n: int = 8
+) -> list[Any]:
+    barrier = Barrier(n)
+
+    def call(i: int) -> Any:
+        barrier.wait()
+        try:
+            return coalescers[i % len(coalescers)].run(INSTANCE_ID, "start", change)
+        except RuntimeError as e:
+            return e
+
+    with ThreadPoolExecutor(n) as executor:
+        return list(executor.map(call, range(n)))
+
+
+def test_concurrent_callers_share_one_call():
+    change = CountingChange()
+    results = run_concurrently([StateChangeCoalescer(MemoryStore())], change)
+    assert change.calls == 1
+    assert results == [CHANGE] * 8
+
+
+def test_concurrent_callers_share_one_call_across_stores(tmp_path: Path):
+    # Two connections to one database stand in for two Lambda containers.
+    path = str(tmp_path / "state.db")
+    stores: list[KeyValueStore] = [SqliteStore(path), SqliteStore(path)]
+    change = CountingChange()
+    results = run_concurrently([StateChangeCoalescer(s) for s in stores], change)
+    assert change.calls == 1
+    assert results == [CHANGE] * 8
+
+
+def test_failed_holder_lets_a_waiter_take_over():
+    change = CountingChange(fail=1)
+    results = run_concurrently([StateChangeCoalescer(MemoryStore())], change)
+    # The holder fails; one waiter performs the change for the others.
+    assert change.calls == 2
+    assert sum(isinstance(r, RuntimeError) for r in results) == 1
+    assert results.count(CHANGE) == 7
+
+
+def test_recent_result_is_reused_until_the_opposite_action():
+    store = MemoryStore()
+    coalescer = StateChangeCoalescer(store)
+    change = CountingChange(seconds=0)
+    coalescer.run(INSTANCE_ID, "start", change)
+    assert coalescer.run(INSTANCE_ID, "start", change) == CHANGE
+    assert change.calls == 1
+    assert store.get(lease_key(INSTANCE_ID, "start")) is None
+
+    coalescer.run(INSTANCE_ID, "stop", lambda: {"stopped": True})
+    assert store.get(result_key(INSTANCE_ID, "start")) is None
+    coalescer.run(INSTANCE_ID, "start", change)
+    assert change.calls == 2
+
+
+def test_stuck_holder_is_not_waited_on_forever():
+    store = MemoryStore()
+    store.put(lease_key(INSTANCE_ID, "start"), "1", ttl=60)
+    coalescer = StateChangeCoalescer(store, wait_timeout=0.05, poll_interval=0.01)
+    change = CountingChange(seconds=0)
+    assert coalescer.run(INSTANCE_ID, "start", change) == CHANGE
+    assert change.calls == 1
+
+
+def test_instance_start_coalesced():
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    coalescer = StateChangeCoalescer(MemoryStore())
+    # Only one response is queued: a second StartInstances call would fail.
+    with Stubber(ec2) as stubber:
+        stubber.add_response(
+            "start_instances", START_INSTANCES_RESPONSE, {"InstanceIds": [INSTANCE_ID]}
+        )
+        instances = [
+            Ec2Instance(INSTANCE_ID, REGION_NAME, ec2_client=ec2, coalescer=coalescer)
+            for _ in range(2)
+        ]
+        assert instances[0].start() == instances[1].start() == CHANGE
+        stubber.assert_no_pending_responses()
+
+
+def test_instance_unsupported_action():
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    instance = Ec2Instance(
+        INSTANCE_ID,
+        REGION_NAME,
+        ec2_client=ec2,
+        coalescer=StateChangeCoalescer(MemoryStore()),
+    )
+    with pytest.raises(ValueError):
+        instance._change_instance_state("reboot")  # type: ignore[arg-type]
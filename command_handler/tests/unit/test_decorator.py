@@ -7,6 +7,7 @@ from typedefs.models import (
     InteractionResponseBody,
 )
 from utils.decorator import discord_command
+from utils.responses import PONG_RESPONSE, PreparedResponse
 
 
 def test_discord_command():
@@ -24,3 +25,20 @@ def test_discord_command():
 
     res = handler({"key": "value"}, None)
     assert isinstance(res, dict)
+
+
+def test_discord_command_prepared_response():
+    pong = DiscordInteractionResponse(
+        body=InteractionResponseBody(type=InteractionCallbackType.PONG)
+    )
+
+    @discord_command
+    def handler(event: dict[str, Any], _: Any) -> PreparedResponse:
+        return PONG_RESPONSE
+
+    res = handler({"key": "value"}, None)
+    assert res == pong.to_dict()
+    assert res["body"] == '{"type":1}'
+    # Each call gets its own dict.
+    res["headers"]["X-Mutated"] = "1"
+    assert handler({"key": "value"}, None) == pong.to_dict()
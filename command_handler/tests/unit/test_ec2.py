@@ -0,0 +1,195 @@
+from typing import Any, Generator
+
+import boto3  # type: ignore
+import pytest
+from botocore.stub import Stubber  # type: ignore
+from unittest.mock import patch
+
+from integration.resources.ec2 import (
+    DESCRIBE_INSTANCES_RESPONSE,
+    INSTANCE_ID,
+    REGION_NAME,
+    START_INSTANCES_RESPONSE,
+)
+from typedefs.models import ServerConfig
+from utils.ec2 import Ec2Fleet, Ec2Instance
+
+DESCRIBE_PARAMS = {"InstanceIds": [INSTANCE_ID]}
+
+
+@pytest.fixture(scope="function")
+def ec2_stubber() -> Generator[Stubber, None, None]:
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    with Stubber(ec2) as stubber, patch("utils.ec2.client", return_value=ec2):
+        yield stubber
+    stubber.assert_no_pending_responses()
+
+
+def test_status(ec2_stubber: Stubber):
+    ec2_stubber.add_response(
+        "describe_instances", DESCRIBE_INSTANCES_RESPONSE, DESCRIBE_PARAMS
+    )
+    status = Ec2Instance(INSTANCE_ID, REGION_NAME).status()
+    assert status == {
+        "state_name": "running",
+        "public_ip_address": "203.0.113.10",
+        "launch_time": "2025-05-31T13:28:12+00:00",
+        "instance_type": "t3.medium",
+    }
+
+
+def test_status_is_cached(ec2_stubber: Stubber):
+    # Only one response is queued: a second DescribeInstances call would fail.
+    ec2_stubber.add_response(
+        "describe_instances", DESCRIBE_INSTANCES_RESPONSE, DESCRIBE_PARAMS
+    )
+    instance = Ec2Instance(INSTANCE_ID, REGION_NAME)
+    assert all(instance.status() == instance.status() for _ in range(10))
+
+
+def test_status_cache_invalidated_by_start(ec2_stubber: Stubber):
+    ec2_stubber.add_response(
+        "describe_instances", DESCRIBE_INSTANCES_RESPONSE, DESCRIBE_PARAMS
+    )
+    ec2_stubber.add_response(
+        "start_instances", START_INSTANCES_RESPONSE, DESCRIBE_PARAMS
+    )
+    ec2_stubber.add_response(
+        "describe_instances", DESCRIBE_INSTANCES_RESPONSE, DESCRIBE_PARAMS
+    )
+    instance = Ec2Instance(INSTANCE_ID, REGION_NAME)
+    instance.status()
+    instance.start()
+    instance.status()
+
+
+def test_status_not_unique(ec2_stubber: Stubber):
+    ec2_stubber.add_response("describe_instances", {"Reservations": []})
+    with pytest.raises(ValueError):
+        Ec2Instance(INSTANCE_ID, REGION_NAME).status()
+
+
+OTHER_REGION_NAME = "ap-northeast-1"
+FLEET_IDS = {
+    "a": "i-000000000000000a1",
+    "b": "i-000000000000000b1",
+    "c": "i-000000000000000c1",
+}
+FLEET_SERVERS = {
+    "a": ServerConfig(instance_id=FLEET_IDS["a"], region_name=REGION_NAME),
+    "b": ServerConfig(instance_id=FLEET_IDS["b"], region_name=REGION_NAME),
+    "c": ServerConfig(instance_id=FLEET_IDS["c"], region_name=OTHER_REGION_NAME),
+}
+
+
+def describe_response(*instance_ids: str) -> dict[str, Any]:
+    template = DESCRIBE_INSTANCES_RESPONSE["Reservations"][0]["Instances"][0]
+    instances = [{**template, "InstanceId": i} for i in instance_ids]
+    return {"Reservations": [{"Instances": instances}]}
+
+
+def start_response(*instance_ids: str) -> dict[str, Any]:
+    template = START_INSTANCES_RESPONSE["StartingInstances"][0]
+    return {"StartingInstances": [{**template, "InstanceId": i} for i in instance_ids]}
+
+
+@pytest.fixture(scope="function")
+def fleet_stubbers() -> Generator[dict[str, Stubber], None, None]:
+    clients = {
+        region: boto3.client("ec2", region_name=region)
+        for region in (REGION_NAME, OTHER_REGION_NAME)
+    }
+    stubbers = {region: Stubber(ec2) for region, ec2 in clients.items()}
+    for stubber in stubbers.values():
+        stubber.activate()
+    with patch(
+        "utils.ec2.client", side_effect=lambda _, region_name: clients[region_name]
+    ):
+        yield stubbers
+    for stubber in stubbers.values():
+        stubber.assert_no_pending_responses()
+        stubber.deactivate()
+
+
+def test_fleet_status_one_call_per_region(fleet_stubbers: dict[str, Stubber]):
+    # One response per region: a call per server would fail.
+    fleet_stubbers[REGION_NAME].add_response(
+        "describe_instances",
+        describe_response(FLEET_IDS["a"], FLEET_IDS["b"]),
+        {"InstanceIds": [FLEET_IDS["a"], FLEET_IDS["b"]]},
+    )
+    fleet_stubbers[OTHER_REGION_NAME].add_response(
+        "describe_instances",
+        describe_response(FLEET_IDS["c"]),
+        {"InstanceIds": [FLEET_IDS["c"]]},
+    )
+    fleet = Ec2Fleet(FLEET_SERVERS)
+    statuses = fleet.status(["a", "b", "c"])
+    assert list(statuses) == ["a", "b", "c"]
+    assert all(s["state_name"] == "running" for s in statuses.values())
+    # Cached in the instances: no further calls.
+    assert fleet.status(["a", "b", "c"]) == statuses
+    assert fleet.status(["c"]) == {"c": statuses["c"]}
+
+
+def test_fleet_status_fetches_only_missing(fleet_stubbers: dict[str, Stubber]):
+    fleet_stubbers[REGION_NAME].add_response(
+        "describe_instances",
+        describe_response(FLEET_IDS["a"]),
+        {"InstanceIds": [FLEET_IDS["a"]]},
+    )
+    fleet_stubbers[REGION_NAME].add_response(
+        "describe_instances",
+        describe_response(FLEET_IDS["b"]),
+        {"InstanceIds": [FLEET_IDS["b"]]},
+    )
+    fleet = Ec2Fleet(FLEET_SERVERS)
+    fleet.status(["a"])
+    assert list(fleet.status(["a", "b"])) == ["a", "b"]
+
+
+def test_fleet_start_one_call_per_region(fleet_stubbers: dict[str, Stubber]):
+    fleet_stubbers[REGION_NAME].add_response(
+        "describe_instances",
+        describe_response(FLEET_IDS["a"], FLEET_IDS["b"]),
+        {"InstanceIds": [FLEET_IDS["a"], FLEET_IDS["b"]]},
+    )
+    fleet_stubbers[REGION_NAME].add_response(
+        "start_instances",
+        start_response(FLEET_IDS["a"], FLEET_IDS["b"]),
+        {"InstanceIds": [FLEET_IDS["a"], FLEET_IDS["b"]]},
+    )
+    fleet_stubbers[REGION_NAME].add_response(
+        "describe_instances",
+        describe_response(FLEET_IDS["a"], FLEET_IDS["b"]),
+        {"InstanceIds": [FLEET_IDS["a"], FLEET_IDS["b"]]},
+    )
+    fleet = Ec2Fleet({k: v for k, v in FLEET_SERVERS.items() if k != "c"})
+    fleet.status(["a", "b"])
+    assert fleet.start(["a", "b"]) == {
+        "a": {"previous_state_name": "stopped", "current_state_name": "pending"},
+        "b": {"previous_state_name": "stopped", "current_state_name": "pending"},
+    }
+    # The start invalidated the cached statuses.
+    fleet.status(["a", "b"])
+
+
+def test_fleet_status_reads_projection(fleet_stubbers: dict[str, Stubber]):
+    from utils.projection import StateProjection
+    from utils.store import MemoryStore
+
+    projection = StateProjection(MemoryStore())
+    projection.apply(
+        {"instance_id": FLEET_IDS["a"], "state_name": "stopped", "changed_at": 1.0}
+    )
+    # Only the server without an entry is described.
+    fleet_stubbers[REGION_NAME].add_response(
+        "describe_instances",
+        describe_response(FLEET_IDS["b"]),
+        {"InstanceIds": [FLEET_IDS["b"]]},
+    )
+    fleet = Ec2Fleet(FLEET_SERVERS, projection=projection)
+    statuses = fleet.status(["a", "b"])
+    assert list(statuses) == ["a", "b"]
+    assert statuses["a"]["state_name"] == "stopped"
+    assert statuses["b"]["state_name"] == "running"
@@ -0,0 +1,146 @@
+from typing import Any, Generator, Optional
+
+import boto3  # type: ignore
+import pytest
+from botocore.stub import Stubber  # type: ignore
+from unittest.mock import patch
+
+from integration.resources.ec2 import (
+    DESCRIBE_INSTANCES_RESPONSE,
+    REGION_NAME,
+    STOP_INSTANCES_RESPONSE,
+)
+from typedefs.models import ServerConfig
+from utils.ec2 import Ec2Fleet, InstanceStatus
+from utils.idle import IdleStopper, idle_key
+from utils.store import MemoryStore
+
+IDS = {"a": "i-000000000000000a1", "b": "i-000000000000000b1"}
+SERVERS = {
+    name: ServerConfig(instance_id=instance_id, region_name=REGION_NAME)
+    for name, instance_id in IDS.items()
+}
+NAMES = list(SERVERS)
+
+
+def describe_response(**states: str) -> dict[str, Any]:
+    template = DESCRIBE_INSTANCES_RESPONSE["Reservations"][0]["Instances"][0]
+    instances = [
+        {**template, "InstanceId": IDS[name], "State": {"Code": 0, "Name": state}}
+        for name, state in states.items()
+    ]
+    return {"Reservations": [{"Instances": instances}]}
+
+
+def stop_response(*names: str) -> dict[str, Any]:
+    template = STOP_INSTANCES_RESPONSE["StoppingInstances"][0]
+    return {"StoppingInstances": [{**template, "InstanceId": IDS[n]} for n in names]}
+
+
+class Players:
+    """Player counts to report, recording the servers it was asked about."""
+
+    def __init__(self, **counts: Optional[int]):
+        self.counts = counts
+        self.calls: list[list[str]] = []
+
+    def __call__(self, running: dict[str, InstanceStatus]) -> dict[str, Optional[int]]:
+        self.calls.append(list(running))
+        return {name: self.counts.get(name) for name in running}
+
+
+@pytest.fixture(scope="function")
+def ec2_stubber() -> Generator[Stubber, None, None]:
+    ec2 = boto3.client("ec2", region_name=REGION_NAME)
+    with Stubber(ec2) as stubber, patch("utils.ec2.client", return_value=ec2):
+        yield stubber
+    stubber.assert_no_pending_responses()
+
+
+def expect_describe(stubber: Stubber, **states: str) -> None:
+    stubber.add_response(
+        "describe_instances",
+        describe_response(**states),
+        {"InstanceIds": [IDS[n] for n in states]},
+    )
+
+
+def test_idle_counts_and_stops(ec2_stubber: Stubber):
+    store = MemoryStore()
+    players = Players(a=0, b=2)
+    stopper = IdleStopper(Ec2Fleet(SERVERS), store, players, stop_after=2)
+
+    # One DescribeInstances call per run: the stubber fails on any other call.
+    expect_describe(ec2_stubber, a="running", b="running")
+    checks = stopper.run(NAMES)
+    assert checks["a"] == {
+        "state_name": "running",
+        "players": 0,
+        "idle_checks": 1,
+        "stopped": False,
+    }
+    assert checks["b"]["idle_checks"] == 0
+    assert store.get(idle_key("a")) == "1"
+    assert store.get(idle_key("b")) is None
+
+    expect_describe(ec2_stubber, a="running", b="running")
+    ec2_stubber.add_response(
+        "stop_instances", stop_response("a"), {"InstanceIds": [IDS["a"]]}
+    )
+    checks = stopper.run(NAMES)
+    assert checks["a"]["idle_checks"] == 2
+    assert checks["a"]["stopped"]
+    assert not checks["b"]["stopped"]
+    # The counter starts over once the server has been stopped.
+    assert store.get(idle_key("a")) is None
+    assert players.calls == [NAMES, NAMES]
+
+
+def test_idle_counter_resets_when_players_join(ec2_stubber: Stubber):
+    store = MemoryStore()
+    players = Players(a=0)
+    stopper = IdleStopper(Ec2Fleet(SERVERS), store, players, stop_after=3)
+
+    expect_describe(ec2_stubber, a="running", b="stopped")
+    stopper.run(NAMES)
+    assert store.get(idle_key("a")) == "1"
+
+    players.counts["a"] = 1
+    expect_describe(ec2_stubber, a="running", b="stopped")
+    checks = stopper.run(NAMES)
+    assert checks["a"]["idle_checks"] == 0
+    assert store.get(idle_key("a")) is None
+
+
+def test_idle_unanswered_server_counts_as_empty(ec2_stubber: Stubber):
+    store = MemoryStore()
+    store.put(idle_key("a"), "2")
+    # None: the server did not answer the query.
+    stopper = IdleStopper(Ec2Fleet(SERVERS), store, Players(a=None), stop_after=3)
+
+    expect_describe(ec2_stubber, a="running", b="stopped")
+    ec2_stubber.add_response(
+        "stop_instances", stop_response("a"), {"InstanceIds": [IDS["a"]]}
+    )
+    checks = stopper.run(NAMES)
+    assert checks["a"]["players"] is None
+    assert checks["a"]["stopped"]
+
+
+def test_idle_ignores_servers_not_running(ec2_stubber: Stubber):
+    store = MemoryStore()
+    store.put(idle_key("b"), "1")
+    players = Players()
+    stopper = IdleStopper(Ec2Fleet(SERVERS), store, players, stop_after=1)
+
+    expect_describe(ec2_stubber, a="stopped", b="pending")
+    checks = stopper.run(NAMES)
+    assert not any(c["stopped"] for c in checks.values())
+    assert store.get(idle_key("b")) is None
+    # Nothing is running: there is nobody to ask.
+    assert players.calls == []
+
+
+def test_idle_stop_after_must_be_positive():
+    with pytest.raises(ValueError):
+        IdleStopper(Ec2Fleet(SERVERS), MemoryStore(), Players(), stop_after=0)
@@ -0,0 +1,19 @@
+from os import getenv
+from typing import Final
+
+from benchmark.bench_import import cumulative_us, run_ping_import
+
+# Regression threshold for the cumulative import time of the handler module.
+IMPORT_TIME_THRESHOLD_MS: Final[float] = float(
+    getenv("IMPORT_TIME_THRESHOLD_MS", "400")
+)
+
+
+def test_ping_does_not_load_boto3():
+    report = run_ping_import()
+    assert report["loaded_heavy_modules"] == []
+
+
+def test_app_import_time_within_threshold():
+    report = run_ping_import()
+    assert cumulative_us(report, "app") / 1000 < IMPORT_TIME_THRESHOLD_MS
@@ -0,0 +1,69 @@
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+import utils.ec2
+from benchmark.loadgen import (
+    InProcessTarget,
+    classify,
+    configure,
+    generate,
+    parse_mix,
+    report,
+    run,
+)
+from utils.metrics import MemorySink, set_metric_sink
+from utils.runtime import reset_runtime
+
+
+def test_parse_mix():
+    assert parse_mix("ping=3, status=1,duplicate") == {
+        "ping": 3.0,
+        "status": 1.0,
+        "duplicate": 1.0,
+    }
+    with pytest.raises(ValueError):
+        parse_mix("reboot=1")
+    with pytest.raises(ValueError):
+        parse_mix("ping=0")
+
+
+def test_generate():
+    requests = generate(400, parse_mix("ping=1,start=1,duplicate=1"), gap=8)
+    kinds = Counter(r.kind for r in requests)
+    # Duplicates before the first resendable command are sent as a status.
+    assert (
+        {"ping", "start", "duplicate"}
+        <= set(kinds)
+        <= {"ping", "start", "duplicate", "status"}
+    )
+    # Fresh commands never share an interaction id.
+    ids = [r.event["body"] for r in requests if r.kind == "start"]
+    assert len(ids) == len(set(ids))
+    for i, request in enumerate(requests):
+        if request.kind == "duplicate":
+            original = [r.event for r in requests[: i - 7]].index(request.event)
+            assert i - 32 <= original <= i - 8
+
+
+def test_classify():
+    assert classify(200, '{"type": 1}') == "pong"
+    assert classify(401, "") == "bad_request"
+    assert classify(500, "") == "http_500"
+    assert classify(200, '{"type": 4, "data": {"content": "ok"}}') == "ok"
+
+
+def test_inprocess_run_has_no_unexpected_outcomes():
+    previous_sink = set_metric_sink(MemorySink())
+    with patch.dict("os.environ"), patch.object(utils.ec2, "client", utils.ec2.client):
+        try:
+            configure(0.0)
+            requests = generate(300, parse_mix("ping=1,status=1,start=1,duplicate=1"))
+            samples, duration = run(InProcessTarget(), requests, None, 4)
+        finally:
+            set_metric_sink(previous_sink)
+            reset_runtime()
+    result = report("inprocess", None, 4, samples, duration)
+    assert result["requests"] == 300
+    assert result["errors"] == 0, result["outcomes"]
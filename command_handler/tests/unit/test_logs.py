@@ -0,0 +1,102 @@
+import json
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+from logging import DEBUG, INFO, getLogger
+
+from typedefs.enums import InteractionCallbackType
+from typedefs.models import DiscordInteractionResponse, InteractionResponseBody
+from utils.decorator import discord_command
+from utils.logs import REDACTED, Deferred, redact, redact_event, sampled
+from utils.metrics import MemorySink, set_metric_sink, set_properties
+
+TOKEN = "aW50ZXJhY3Rpb246MDAwMDAwMDAwMDAwMDAwMDAwMDpzZWNyZXQ"
+SIGNATURE = "ab" * 64
+
+
+def event() -> dict[str, Any]:
+    return {
+        "body": json.dumps({"id": "1", "type": 2, "token": TOKEN, "data": {}}),
+        "headers": {
+            "content-type": "application/json",
+            "x-signature-ed25519": SIGNATURE,
+            "x-signature-timestamp": "1748698092919",
+        },
+    }
+
+
+def test_redact_nested():
+    value = {"a": [{"Token": "t", "b": 1}], "Authorization": "Bot x", "c": "d"}
+    assert redact(value) == {
+        "a": [{"Token": REDACTED, "b": 1}],
+        "Authorization": REDACTED,
+        "c": "d",
+    }
+    assert value["Authorization"] == "Bot x"
+
+
+def test_redact_event():
+    redacted = redact_event(event())
+    assert redacted["headers"]["x-signature-ed25519"] == REDACTED
+    assert redacted["headers"]["x-signature-timestamp"] == "1748698092919"
+    assert redacted["body"] == {"id": "1", "type": 2, "token": REDACTED, "data": {}}
+    assert redact_event({"body": "not json"})["body"] == REDACTED
+
+
+def test_sampled():
+    assert not sampled(0)
+    assert sampled(1)
+    with patch("utils.logs.random", return_value=0.5):
+        assert sampled(0.6)
+        assert not sampled(0.4)
+
+
+def test_deferred_is_formatted_only_when_enabled(caplog: pytest.LogCaptureFixture):
+    func = Mock(return_value="formatted")
+    logger = getLogger("test_logs")
+    with caplog.at_level(INFO, logger="test_logs"):
+        logger.debug("value=%s", Deferred(func))
+        func.assert_not_called()
+    with caplog.at_level(DEBUG, logger="test_logs"):
+        # Formatted once, whatever the number of handlers.
+        logger.debug("value=%s", Deferred(func))
+    func.assert_called_once()
+    assert "value=formatted" in caplog.text
+
+
+@discord_command
+def handler(event: dict[str, Any], _: Any) -> DiscordInteractionResponse:
+    set_properties(interaction_id="1", interaction_type=2)
+    return DiscordInteractionResponse(
+        body=InteractionResponseBody(type=InteractionCallbackType.PONG)
+    )
+
+
+def test_summary_is_the_metric_record(caplog: pytest.LogCaptureFixture):
+    sink = MemorySink()
+    previous_sink = set_metric_sink(sink)
+    try:
+        with caplog.at_level(INFO, logger="utils.decorator"):
+            handler(event(), None)
+    finally:
+        set_metric_sink(previous_sink)
+    # No log line of its own: the EMF record describes the invocation.
+    assert caplog.messages == []
+    [record] = sink.records
+    assert record["interaction_id"] == "1"
+    assert record["interaction_type"] == 2
+    assert record["outcome"] == "ok"
+    assert record["TotalLatency"] >= 0
+
+
+def test_sampled_dumps_are_redacted(caplog: pytest.LogCaptureFixture):
+    with caplog.at_level(INFO, logger="utils.decorator"), patch(
+        "utils.logs.SAMPLE_RATE", 1.0
+    ):
+        handler(event(), None)
+    assert len(caplog.messages) == 2
+    assert caplog.messages[0].startswith("event=")
+    assert caplog.messages[1].startswith("response=")
+    assert TOKEN not in caplog.text
+    assert SIGNATURE not in caplog.text
@@ -0,0 +1,74 @@
+from typing import Generator
+
+import pytest
+
+from utils.metrics import (
+    MemorySink,
+    invocation,
+    set_dimensions,
+    set_metric_sink,
+    stage,
+)
+
+
+@pytest.fixture(scope="function")
+def sink() -> Generator[MemorySink, None, None]:
+    sink = MemorySink()
+    previous = set_metric_sink(sink)
+    yield sink
+    set_metric_sink(previous)
+
+
+def test_invocation_emits_one_emf_record(sink: MemorySink):
+    with invocation():
+        with stage("verify"):
+            pass
+        set_dimensions(command="be", action="start", outcome="ok")
+
+    [record] = sink.records
+    [directive] = record["_aws"]["CloudWatchMetrics"]
+    assert directive["Dimensions"] == [["command", "action", "outcome"]]
+    assert {m["Name"] for m in directive["Metrics"]} == {
+        "VerifyLatency",
+        "TotalLatency",
+        "ColdStart",
+    }
+    assert isinstance(record["_aws"]["Timestamp"], int)
+    assert (record["command"], record["action"], record["outcome"]) == (
+        "be",
+        "start",
+        "ok",
+    )
+    assert record["TotalLatency"] >= record["VerifyLatency"] >= 0
+
+
+def test_only_first_invocation_is_cold(sink: MemorySink):
+    for _ in range(2):
+        with invocation():
+            pass
+    assert sink.records[-1]["ColdStart"] == 0
+
+
+def test_unhandled_exception_is_recorded(sink: MemorySink):
+    with pytest.raises(RuntimeError), invocation():
+        raise RuntimeError()
+    assert sink.records[-1]["outcome"] == "error"
+
+
+def test_stage_outside_invocation_is_noop(sink: MemorySink):
+    with stage("ec2"):
+        set_dimensions(command="be")
+    assert sink.records == []
+
+
+def test_failing_sink_does_not_raise():
+    class FailingSink:
+        def emit(self, record):
+            raise OSError()
+
+    previous = set_metric_sink(FailingSink())
+    try:
+        with invocation():
+            pass
+    finally:
+        set_metric_sink(previous)
@@ -0,0 +1,58 @@
+from typing import Generator
+from unittest.mock import Mock, patch
+
+import pytest
+from botocore.endpoint import Endpoint  # type: ignore
+
+from unit.test_runtime import ENVIRON
+from utils.priming import prime
+from utils.runtime import RuntimeContext
+
+
+@pytest.fixture(autouse=True)
+def send() -> Generator[Mock, None, None]:
+    # Priming signs its calls, but must never send them.
+    with patch.dict(
+        "os.environ",
+        {
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "AWS_DEFAULT_REGION": "us-east-1",
+        },
+    ), patch.object(Endpoint, "_send", side_effect=AssertionError("sent")) as send:
+        yield send
+
+
+def assert_primed(runtime: RuntimeContext, caplog: pytest.LogCaptureFixture) -> None:
+    assert "Priming failed" not in caplog.text
+    for name in ("verify_key", "fleet", "bedrock", "status_aggregator"):
+        assert name in runtime.__dict__
+    # Nothing was started: the threads come with the first request.
+    assert runtime.status_aggregator._executor is None
+
+
+def test_prime(send: Mock, caplog: pytest.LogCaptureFixture):
+    runtime = RuntimeContext(ENVIRON)
+    prime(runtime)
+    assert_primed(runtime, caplog)
+    send.assert_not_called()
+
+    # Later calls are sent again.
+    with pytest.raises(AssertionError, match="sent"):
+        runtime.server_instance.refresh()
+
+
+def test_prime_dynamodb_store(send: Mock, caplog: pytest.LogCaptureFixture):
+    runtime = RuntimeContext({**ENVIRON, "STORE_URL": "dynamodb://state"})
+    prime(runtime)
+    assert_primed(runtime, caplog)
+    send.assert_not_called()
+    assert "store" in runtime.__dict__
+
+
+def test_prime_failure_is_logged(caplog: pytest.LogCaptureFixture):
+    runtime = RuntimeContext({**ENVIRON, "APP_PUBLIC_KEY": "00"})
+    prime(runtime)
+    assert "Priming failed" in caplog.text
+    # The other steps still ran.
+    assert "fleet" in runtime.__dict__
@@ -0,0 +1,121 @@
+import pytest
+
+from integration.resources.ec2 import INSTANCE_ID, state_change_event
+from utils.ec2 import InstanceStatus
+from utils.messages import server_status
+from utils.projection import (
+    StateChange,
+    StateProjection,
+    parse_state_change,
+    state_key,
+)
+from utils.store import MemoryStore
+
+RUNNING: InstanceStatus = {
+    "state_name": "running",
+    "public_ip_address": "203.0.113.10",
+    "launch_time": "2025-05-31T13:28:12+00:00",
+    "instance_type": "t3.medium",
+}
+
+
+def change(state: str, second: int):
+    return parse_state_change(
+        state_change_event(state, f"2025-05-31T13:28:{second:02d}Z")
+    )
+
+
+def test_parse_state_change():
+    assert change("pending", 12) == {
+        "instance_id": INSTANCE_ID,
+        "state_name": "pending",
+        "changed_at": 1748698092.0,
+    }
+    with pytest.raises(ValueError):
+        parse_state_change({"detail-type": "Scheduled Event", "detail": {}})
+
+
+def test_boot_is_projected():
+    store = MemoryStore()
+    projection = StateProjection(store)
+    assert projection.status(INSTANCE_ID) is None
+
+    projection.apply(change("pending", 12))
+    pending = projection.status(INSTANCE_ID)
+    assert pending is not None
+    assert pending["state_name"] == "pending"
+    assert "boot_seconds" not in pending
+
+    projection.apply(change("running", 52), RUNNING)
+    assert projection.status(INSTANCE_ID) == {**RUNNING, "boot_seconds": 40.0}
+    # One compact entry per instance.
+    assert " " not in (store.get(state_key(INSTANCE_ID)) or "")
+
+
+def test_late_notification_only_records_its_transition():
+    projection = StateProjection(MemoryStore())
+    projection.apply(change("running", 52), RUNNING)
+    record = projection.apply(change("pending", 12))
+    assert record["state_name"] == "running"
+    assert record["transitions"] == {"pending": 1748698092.0, "running": 1748698132.0}
+    assert projection.status(INSTANCE_ID) == {**RUNNING, "boot_seconds": 40.0}
+
+
+class InterleavingStore(MemoryStore):
+    """Applies another notification between the read and the write of the first."""
+
+    def __init__(self, concurrent: StateChange):
+        super().__init__()
+        self.concurrent: StateChange | None = concurrent
+        self.conflicts = 0
+
+    def _interleave(self) -> None:
+        if self.concurrent is not None:
+            concurrent, self.concurrent = self.concurrent, None
+            StateProjection(self).apply(concurrent, RUNNING)
+
+    def put_if_absent(self, key: str, value: str, ttl: float | None = None) -> bool:
+        self._interleave()
+        stored = super().put_if_absent(key, value, ttl)
+        self.conflicts += not stored
+        return stored
+
+    def put_if_equal(
+        self, key: str, value: str, expected: str, ttl: float | None = None
+    ) -> bool:
+        self._interleave()
+        stored = super().put_if_equal(key, value, expected, ttl)
+        self.conflicts += not stored
+        return stored
+
+
+@pytest.mark.parametrize("first_applied", [True, False])
+def test_concurrent_notifications_keep_both_transitions(first_applied: bool):
+    store = InterleavingStore(change("running", 52))
+    projection = StateProjection(store)
+    if first_applied:
+        # The entry exists: the conflict is on put_if_equal.
+        store.concurrent, concurrent = None, store.concurrent
+        projection.apply(change("pending", 11))
+        store.concurrent = concurrent
+    projection.apply(change("pending", 12))
+
+    assert store.conflicts == 1
+    record = projection.get(INSTANCE_ID)
+    assert record is not None
+    assert record["state_name"] == "running"
+    assert record["transitions"] == {"pending": 1748698092.0, "running": 1748698132.0}
+    assert projection.status(INSTANCE_ID) == {**RUNNING, "boot_seconds": 40.0}
+
+
+def test_details_kept_without_describe():
+    projection = StateProjection(MemoryStore())
+    projection.apply(change("running", 52), RUNNING)
+    projection.apply(change("stopping", 58))
+    status = projection.status(INSTANCE_ID)
+    assert status == {**RUNNING, "state_name": "stopping"}
+
+
+def test_boot_time_in_reply():
+    content = server_status({**RUNNING, "boot_seconds": 40.2}).content or ""
+    assert "Boot time: 40s" in content.splitlines()
@@ -0,0 +1,153 @@
+from typing import Any, Generator
+
+import boto3  # type: ignore
+import pytest
+from botocore.stub import Stubber  # type: ignore
+
+from integration.resources.bedrock import FakeBedrockServer, closed_udp_port
+from integration.resources.ec2 import (
+    DESCRIBE_INSTANCES_RESPONSE,
+    INSTANCE_ID,
+    REGION_NAME,
+)
+from utils.ec2 import Ec2Instance
+from utils.readiness import ReadinessTracker, udp_probe
+
+DESCRIBE_PARAMS = {"InstanceIds": [INSTANCE_ID]}
+
+
+def describe_response(state_name: str, ip: str | None = None) -> dict[str, Any]:
+    instance = {
+        **DESCRIBE_INSTANCES_RESPONSE["Reservations"][0]["Instances"][0],
+        "State": {"Code": 0, "Name": state_name},
+    }
+    instance.pop("PublicIpAddress")
+    if ip:
+        instance["PublicIpAddress"] = ip
+    return {"Reservations": [{"Instances": [instance]}]}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(scope="function")
+def ec2() -> Generator[tuple[Ec2Instance, Stubber], None, None]:
+    client = boto3.client("ec2", region_name=REGION_NAME)
+    with Stubber(client) as stubber:
+        yield Ec2Instance(INSTANCE_ID, REGION_NAME, ec2_client=client), stubber
+        stubber.assert_no_pending_responses()
+
+
+def tracker(instance: Ec2Instance, port: int, clock: FakeClock) -> ReadinessTracker:
+    return ReadinessTracker(
+        instance,
+        port=port,
+        initial_delay=2.0,
+        max_delay=5.0,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+def test_udp_probe():
+    with FakeBedrockServer() as server:
+        assert udp_probe(server.host, server.port, timeout=1.0)
+        assert server.datagrams[0][0] == 0x01
+    with FakeBedrockServer(silent=True) as server:
+        assert not udp_probe(server.host, server.port, timeout=0.05)
+    assert not udp_probe("127.0.0.1", closed_udp_port(), timeout=1.0)
+    with FakeBedrockServer(reply=b"\x00not a pong") as server:
+        assert not udp_probe(server.host, server.port, timeout=0.05)
+
+
+def test_wait_until_running_and_answering(ec2: tuple[Ec2Instance, Stubber]):
+    instance, stubber = ec2
+    for response in (
+        describe_response("pending"),
+        describe_response("pending"),
+        describe_response("running", "127.0.0.1"),
+        describe_response("running", "127.0.0.1"),
+    ):
+        stubber.add_response("describe_instances", response, DESCRIBE_PARAMS)
+    clock = FakeClock()
+    with FakeBedrockServer() as server:
+        # Running, but the server process is not up yet.
+        server.silent = True
+        probes: list[bool] = []
+
+        def probe(host: str, port: int, timeout: float) -> bool:
+            probes.append(udp_probe(host, port, 0.05))
+            server.silent = False
+            return probes[-1]
+
+        readiness = tracker(instance, server.port, clock)
+        readiness.probe = probe
+        result = readiness.wait(timeout=60)
+
+    assert result["ready"]
+    assert result["address"] == f"127.0.0.1:{server.port}"
+    assert result["attempts"] == 4
+    assert probes == [False, True]
+    # Capped exponential backoff
+    assert clock.sleeps == [2.0, 4.0, 5.0]
+    # The fresh status is cached for the status command.
+    assert instance.status()["state_name"] == "running"
+
+
+def test_wait_stops_at_deadline(ec2: tuple[Ec2Instance, Stubber]):
+    instance, stubber = ec2
+    for _ in range(4):
+        stubber.add_response(
+            "describe_instances", describe_response("pending"), DESCRIBE_PARAMS
+        )
+    clock = FakeClock()
+    result = tracker(instance, closed_udp_port(), clock).wait(timeout=10)
+
+    assert not result["ready"]
+    assert result["state_name"] == "pending"
+    assert result["attempts"] == 4
+    assert clock.sleeps == [2.0, 4.0, 4.0]
+    assert result["elapsed"] == 10
+
+
+def test_wait_ignores_replies_that_are_not_pongs(ec2: tuple[Ec2Instance, Stubber]):
+    instance, stubber = ec2
+    for _ in range(4):
+        stubber.add_response(
+            "describe_instances",
+            describe_response("running", "127.0.0.1"),
+            DESCRIBE_PARAMS,
+        )
+    clock = FakeClock()
+    with FakeBedrockServer(reply=b"\x00not a pong") as server:
+        readiness = tracker(instance, server.port, clock)
+        readiness.probe_timeout = 0.05
+        result = readiness.wait(timeout=10)
+
+    assert not result["ready"]
+    assert result["state_name"] == "running"
+    assert result["attempts"] == 4
+    assert len(server.datagrams) == 4
+
+
+def test_wait_gives_up_when_stopping(ec2: tuple[Ec2Instance, Stubber]):
+    instance, stubber = ec2
+    stubber.add_response(
+        "describe_instances", describe_response("stopping"), DESCRIBE_PARAMS
+    )
+    clock = FakeClock()
+    result = tracker(instance, closed_udp_port(), clock).wait(timeout=60)
+
+    assert not result["ready"]
+    assert result["state_name"] == "stopping"
+    assert clock.sleeps == []
@@ -0,0 +1,159 @@
+from typing import Any, Final
+
+import pytest
+
+from typedefs.enums import CommandOptionType, InteractionCommandType
+from typedefs.exceptions import BadRequest, InvalidOption
+from typedefs.models import (
+    CommandChoice,
+    CommandOptions,
+    DiscordInteractionResponse,
+    InteractionCommandData,
+)
+from utils.registry import CommandContext, CommandRegistry, OptionSpec
+
+BE_PAYLOAD: Final[dict[str, Any]] = {
+    "type": 1,
+    "name": "be",
+    "description": "BEサーバの起動や確認",
+    "options": [
+        {
+            "type": 3,
+            "name": "action",
+            "description": "開始(start)・停止(stop)・状態確認(status)",
+            "required": True,
+            "autocomplete": True,
+        },
+        {
+            "type": 3,
+            "name": "server",
+            "description": "対象サーバ名 (all: 全サーバ)",
+            "required": False,
+            "autocomplete": True,
+        },
+    ],
+}
+
+
+def command_data(name: str, **options: str) -> InteractionCommandData:
+    return InteractionCommandData(
+        id="0000000000000000000",
+        name=name,
+        options=[
+            CommandOptions(name=k, type=CommandOptionType.STRING, value=v)
+            for k, v in options.items()
+        ],
+        type=InteractionCommandType.CHAT_INTPUT,
+    )
+
+
+def handler(ctx: CommandContext) -> DiscordInteractionResponse:
+    return DiscordInteractionResponse()
+
+
+@pytest.fixture(scope="function")
+def registry() -> CommandRegistry:
+    registry = CommandRegistry()
+    hello = registry.command(
+        name="hello",
+        description="Say hello",
+        route=OptionSpec(name="greeting", description="Greeting"),
+        options=[OptionSpec(name="to", description="Recipient", required=False)],
+    )
+    hello.choice("hi")(handler)
+    return registry
+
+
+def test_registered_commands_payload():
+    from commands import registry
+
+    assert registry.payloads() == [BE_PAYLOAD]
+
+
+def test_resolve(registry: CommandRegistry):
+    resolved, options = registry.resolve(command_data("hello", greeting="hi", to="x"))
+    assert resolved is handler
+    assert options == {"greeting": "hi", "to": "x"}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        None,
+        command_data("bye", greeting="hi"),
+        command_data("hello"),
+        command_data("hello", to="x"),
+        command_data("hello", greeting="hi", unknown="x"),
+    ],
+)
+def test_resolve_invalid(registry: CommandRegistry, data: InteractionCommandData):
+    with pytest.raises(BadRequest):
+        registry.resolve(data)
+
+
+def test_resolve_unknown_choice(registry: CommandRegistry):
+    with pytest.raises(InvalidOption) as error:
+        registry.resolve(command_data("hello", greeting="yo"))
+    assert (error.value.name, error.value.value) == ("greeting", "yo")
+    assert error.value.valid == ["hi"]
+
+
+def test_duplicate_registration(registry: CommandRegistry):
+    with pytest.raises(ValueError):
+        registry.commands["hello"].choice("hi")(handler)
+    with pytest.raises(ValueError):
+        registry.command("hello", "Again", OptionSpec("greeting", "Greeting"))
+
+
+def test_payload_lists_optional_options(registry: CommandRegistry):
+    (payload,) = registry.payloads()
+    assert [o["name"] for o in payload["options"]] == ["greeting", "to"]
+    assert payload["options"][0]["choices"] == [{"name": "hi", "value": "hi"}]
+    assert payload["options"][1]["required"] is False
+
+
+def autocomplete_data(
+    name: str, focused: str, **options: str
+) -> InteractionCommandData:
+    data = command_data(name, **options)
+    for option in data.options or []:
+        option.focused = option.name == focused or None
+    return data
+
+
+def test_complete_route(registry: CommandRegistry):
+    command, completer, options, value = registry.complete(
+        autocomplete_data("hello", "greeting", greeting="h")
+    )
+    assert command is registry.commands["hello"]
+    assert options == {"greeting": "h"}
+    choices = completer(CommandContext(None, None, options), value)  # type: ignore
+    assert [c.value for c in choices] == ["hi"]
+
+
+def test_complete_registered_option(registry: CommandRegistry):
+    @registry.commands["hello"].completer("to")
+    def complete_to(ctx: CommandContext, value: str) -> list[CommandChoice]:
+        return [CommandChoice(name=value.upper(), value=value)]
+
+    _, completer, _, value = registry.complete(
+        autocomplete_data("hello", "to", greeting="hi", to="x")
+    )
+    assert completer is complete_to
+    assert value == "x"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        None,
+        autocomplete_data("bye", "greeting", greeting="h"),
+        # Nothing focused
+        command_data("hello", greeting="h"),
+        # No completer for the focused option
+        autocomplete_data("hello", "to", greeting="hi", to="x"),
+    ],
+)
+def test_complete_invalid(registry: CommandRegistry, data: InteractionCommandData):
+    with pytest.raises(BadRequest):
+        registry.complete(data)
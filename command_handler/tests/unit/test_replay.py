@@ -0,0 +1,31 @@
+import pytest
+
+from typedefs.exceptions import BadRequest
+from utils.replay import InteractionDeduplicator, check_timestamp
+from utils.store import SqliteStore
+
+
+def test_check_timestamp_within_window():
+    check_timestamp("1000", max_age=300, now=1299)
+    check_timestamp("1000", max_age=300, now=701)
+
+
+@pytest.mark.parametrize("timestamp", ["699", "1301", "not-a-number"])
+def test_check_timestamp_out_of_window(timestamp: str):
+    with pytest.raises(BadRequest):
+        check_timestamp(timestamp, max_age=300, now=1000)
+
+
+def test_deduplicator_local():
+    deduplicator = InteractionDeduplicator()
+    assert deduplicator.first_delivery("0000000000000000000")
+    assert not deduplicator.first_delivery("0000000000000000000")
+    assert deduplicator.first_delivery("1111111111111111111")
+
+
+def test_deduplicator_shared_between_containers():
+    shared = SqliteStore(":memory:")
+    container_a = InteractionDeduplicator(shared=shared)
+    container_b = InteractionDeduplicator(shared=shared)
+    assert container_a.first_delivery("0000000000000000000")
+    assert not container_b.first_delivery("0000000000000000000")
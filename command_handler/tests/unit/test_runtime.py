@@ -0,0 +1,66 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from nacl.signing import SigningKey
+
+from typedefs.exceptions import InvalidOption
+from utils.runtime import get_runtime, reset_runtime
+
+signing_key: SigningKey = SigningKey(b"0123456789abcdef0123456789abcdef")
+ENVIRON = {
+    "APP_PUBLIC_KEY": signing_key.verify_key.encode().hex(),
+    "SERVER_INSTANCE_ID": "i-0123456789abcdef0",
+    "SERVER_REGION_NAME": "us-east-1",
+}
+
+
+def test_get_runtime_is_cached():
+    with patch.dict("os.environ", ENVIRON):
+        reset_runtime()
+        runtime = get_runtime()
+        assert get_runtime() is runtime
+        assert runtime.verify_key is runtime.verify_key
+        assert runtime.verify_key == signing_key.verify_key
+        assert runtime.deferred_worker_function is None
+    reset_runtime()
+
+
+def test_reset_runtime_rereads_environ():
+    with patch.dict("os.environ", ENVIRON):
+        reset_runtime()
+        runtime = get_runtime()
+    with patch.dict("os.environ", {**ENVIRON, "DEFERRED_WORKER_FUNCTION": "worker"}):
+        assert get_runtime() is runtime
+        reset_runtime()
+        assert get_runtime().deferred_worker_function == "worker"
+    reset_runtime()
+
+
+def test_server_instance_is_lazy():
+    with patch.dict("os.environ", ENVIRON), patch("utils.ec2.client") as client:
+        reset_runtime()
+        runtime = get_runtime()
+        client.assert_not_called()
+        assert runtime.server_instance is runtime.server_instance
+        client.assert_called_once_with("ec2", region_name="us-east-1")
+    reset_runtime()
+
+
+def test_servers_from_environ():
+    servers = {
+        "be": {"instance_id": "i-0123456789abcdef0", "region_name": "us-east-1"},
+        "java": {"instance_id": "i-0123456789abcdef1", "region_name": "us-west-2"},
+    }
+    with patch.dict("os.environ", {**ENVIRON, "SERVERS": json.dumps(servers)}):
+        reset_runtime()
+        runtime = get_runtime()
+        assert runtime.default_server == "be"
+        assert runtime.resolve_servers(None, default_all=False) == ["be"]
+        assert runtime.resolve_servers(None, default_all=True) == ["be", "java"]
+        assert runtime.resolve_servers("all", default_all=False) == ["be", "java"]
+        assert runtime.resolve_servers("java", default_all=True) == ["java"]
+        with pytest.raises(InvalidOption) as error:
+            runtime.resolve_servers("unknown", default_all=True)
+        assert error.value.valid == ["be", "java", "all"]
+    reset_runtime()
@@ -0,0 +1,45 @@
+import pytest
+
+from typedefs.enums import InteractionCallbackType, MessageFlags
+from typedefs.models import (
+    DiscordInteractionResponse,
+    Embed,
+    InteractionCallbackData,
+    InteractionResponseBody,
+)
+from utils.serialize import dump_proxy_response
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        DiscordInteractionResponse(),
+        DiscordInteractionResponse(
+            body=InteractionResponseBody(type=InteractionCallbackType.PONG)
+        ),
+        DiscordInteractionResponse(
+            statusCode=401,
+            headers={"Content-Type": "application/json", "X-Extra": "1"},
+            body=InteractionResponseBody(
+                type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+                data=InteractionCallbackData(
+                    content='"引用" \\ 改行\n\ttab \x01',
+                    flags=MessageFlags.EPHEMERAL,
+                ),
+            ),
+        ),
+        DiscordInteractionResponse(
+            body=InteractionResponseBody(
+                type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+                data=InteractionCallbackData(
+                    embeds=[
+                        Embed(title="be", color=0x2ECC71),
+                        Embed(type="image", image={"url": "https://example.com"}),
+                    ]
+                ),
+            )
+        ),
+    ],
+)
+def test_dump_proxy_response_matches_to_dict(response: DiscordInteractionResponse):
+    assert dump_proxy_response(response) == response.to_dict()
@@ -0,0 +1,107 @@
+from threading import Event
+from time import perf_counter, sleep
+from typing import Any, Callable
+
+import pytest
+
+from utils.status import SourceUnavailable, StatusAggregator
+
+NAMES = ["a", "b"]
+
+
+def slow(seconds: float, values: dict[str, Any]) -> Callable[[], dict[str, Any]]:
+    def source() -> dict[str, Any]:
+        sleep(seconds)
+        return values
+
+    return source
+
+
+def failing() -> dict[str, Any]:
+    raise RuntimeError("source failed")
+
+
+def test_sources_run_concurrently():
+    aggregator = StatusAggregator({"x": 1.0, "y": 1.0})
+    gathering = aggregator.gather()
+    start = perf_counter()
+    gathering.submit("x", slow(0.2, {"a": 1}))
+    gathering.submit("y", slow(0.2, {"a": 2}))
+    results = gathering.results(NAMES)
+    # Bounded by the slowest source, not by their sum.
+    assert perf_counter() - start < 0.35
+    assert results["x"]["values"] == {"a": 1}
+    assert results["y"]["values"] == {"a": 2}
+    assert all(r["freshness"] == "fresh" for r in results.values())
+
+
+def test_late_source_is_unavailable_then_stale():
+    aggregator = StatusAggregator({"fast": 1.0, "slow": 0.05})
+    release = Event()
+    done = Event()
+
+    def blocked() -> dict[str, Any]:
+        release.wait(1)
+        return {"a": "late"}
+
+    gathering = aggregator.gather()
+    gathering.submit("fast", lambda: {"a": "now"})
+    gathering.submit("slow", blocked)
+    start = perf_counter()
+    results = gathering.results(NAMES)
+    assert perf_counter() - start < 0.5
+    assert results["fast"]["values"] == {"a": "now"}
+    assert results["fast"]["freshness"] == "fresh"
+    assert results["slow"]["values"] == {}
+    assert results["slow"]["freshness"] == "unavailable"
+
+    # The late source finishes in the background and is kept for the next reply.
+    gathering.futures["slow"].add_done_callback(lambda _: done.set())
+    release.set()
+    assert done.wait(1)
+    gathering = aggregator.gather()
+    gathering.submit("slow", failing)
+    result = gathering.result("slow", NAMES)
+    assert result["values"] == {"a": "late"}
+    assert result["freshness"] == "stale"
+
+
+def test_dependent_source():
+    aggregator = StatusAggregator({"base": 1.0, "derived": 1.0})
+    gathering = aggregator.gather()
+    gathering.submit("base", slow(0.05, {"a": 1, "b": 2}))
+    gathering.submit(
+        "derived", lambda: {k: v * 10 for k, v in gathering.wait("base").items()}
+    )
+    assert gathering.result("derived", NAMES)["values"] == {"a": 10, "b": 20}
+
+
+def test_dependent_source_of_failed_source():
+    aggregator = StatusAggregator({"base": 1.0, "derived": 1.0})
+    gathering = aggregator.gather()
+    gathering.submit("base", failing)
+
+    def derived() -> dict[str, Any]:
+        with pytest.raises(SourceUnavailable):
+            gathering.wait("base")
+        return {"a": "fallback"}
+
+    gathering.submit("derived", derived)
+    results = gathering.results(NAMES)
+    assert results["base"]["freshness"] == "unavailable"
+    assert results["derived"]["values"] == {"a": "fallback"}
+
+
+def test_stale_values_only_for_requested_servers():
+    aggregator = StatusAggregator({"x": 1.0})
+    gathering = aggregator.gather()
+    gathering.submit("x", lambda: {"a": 1, "b": 2})
+    gathering.results(NAMES)
+
+    gathering = aggregator.gather()
+    gathering.submit("x", failing)
+    assert gathering.result("x", ["b", "c"]) == {
+        "values": {"b": 2},
+        "freshness": "stale",
+        "elapsed": pytest.approx(0, abs=0.5),
+    }
@@ -0,0 +1,154 @@
+from pathlib import Path
+from typing import Callable
+from unittest.mock import patch
+
+import pytest
+from botocore.stub import Stubber  # type: ignore
+
+from utils.store import (
+    DynamoDbStore,
+    KeyValueStore,
+    MemoryStore,
+    SqliteStore,
+    open_store,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+STORES: dict[str, Callable[[FakeClock], KeyValueStore]] = {
+    "memory": lambda clock: MemoryStore(clock=clock),
+    "sqlite": lambda clock: SqliteStore(":memory:", clock=clock),
+}
+
+
+@pytest.mark.parametrize("make_store", STORES.values(), ids=STORES.keys())
+def test_store_get_put_delete(make_store: Callable[[FakeClock], KeyValueStore]):
+    store = make_store(FakeClock())
+    assert store.get("key") is None
+    store.put("key", "value")
+    assert store.get("key") == "value"
+    store.put("key", "other")
+    assert store.get("key") == "other"
+    store.delete("key")
+    assert store.get("key") is None
+
+
+@pytest.mark.parametrize("make_store", STORES.values(), ids=STORES.keys())
+def test_store_ttl(make_store: Callable[[FakeClock], KeyValueStore]):
+    clock = FakeClock()
+    store = make_store(clock)
+    store.put("key", "value", ttl=10)
+    clock.now += 9
+    assert store.get("key") == "value"
+    clock.now += 1
+    assert store.get("key") is None
+
+
+@pytest.mark.parametrize("make_store", STORES.values(), ids=STORES.keys())
+def test_store_put_if_absent(make_store: Callable[[FakeClock], KeyValueStore]):
+    clock = FakeClock()
+    store = make_store(clock)
+    assert store.put_if_absent("key", "first", ttl=10)
+    assert not store.put_if_absent("key", "second", ttl=10)
+    assert store.get("key") == "first"
+    # Expired entries can be taken over.
+    clock.now += 10
+    assert store.put_if_absent("key", "third", ttl=10)
+    assert store.get("key") == "third"
+    # Entries without TTL never expire.
+    store.put("permanent", "value")
+    clock.now += 10**6
+    assert not store.put_if_absent("permanent", "other")
+
+
+@pytest.mark.parametrize("make_store", STORES.values(), ids=STORES.keys())
+def test_store_put_if_equal(make_store: Callable[[FakeClock], KeyValueStore]):
+    clock = FakeClock()
+    store = make_store(clock)
+    assert not store.put_if_equal("key", "first", "")
+    store.put("key", "first", ttl=10)
+    assert not store.put_if_equal("key", "second", "other")
+    assert store.put_if_equal("key", "second", "first", ttl=10)
+    assert store.get("key") == "second"
+    # An expired entry holds nothing.
+    clock.now += 10
+    assert not store.put_if_equal("key", "third", "second")
+    assert store.get("key") is None
+
+
+def test_memory_store_is_bounded_lru():
+    store = MemoryStore(max_entries=2)
+    store.put("a", "1")
+    store.put("b", "2")
+    store.get("a")
+    store.put("c", "3")
+    assert store.get("a") == "1"
+    assert store.get("b") is None
+    assert store.get("c") == "3"
+
+
+def test_sqlite_store_is_shared_between_connections(tmp_path: Path):
+    path = str(tmp_path / "store.db")
+    first, second = SqliteStore(path), SqliteStore(path)
+    assert first.put_if_absent("key", "first", ttl=60)
+    assert not second.put_if_absent("key", "second", ttl=60)
+    assert second.get("key") == "first"
+
+
+def test_open_store():
+    assert isinstance(open_store("memory://"), MemoryStore)
+    assert isinstance(open_store("sqlite://:memory:"), SqliteStore)
+    with pytest.raises(ValueError):
+        open_store("redis://localhost")
+
+
+def test_dynamodb_expiry_is_rounded_up():
+    clock = FakeClock()
+    clock.now += 0.5
+    with patch.dict("os.environ", {"AWS_DEFAULT_REGION": "us-east-1"}):
+        store = DynamoDbStore("state", clock=clock)
+    with Stubber(store.client) as stubber:
+        stubber.add_response(
+            "put_item",
+            {},
+            {
+                "TableName": "state",
+                "Item": {
+                    "pk": {"S": "key"},
+                    "value": {"S": "value"},
+                    "expires_at": {"N": "1700000006"},
+                },
+            },
+        )
+        store.put("key", "value", ttl=5)
+        stubber.assert_no_pending_responses()
+
+
+def test_dynamodb_put_if_equal_conflict():
+    with patch.dict("os.environ", {"AWS_DEFAULT_REGION": "us-east-1"}):
+        store = DynamoDbStore("state", clock=FakeClock())
+    with Stubber(store.client) as stubber:
+        stubber.add_client_error(
+            "put_item",
+            "ConditionalCheckFailedException",
+            expected_params={
+                "TableName": "state",
+                "Item": {"pk": {"S": "key"}, "value": {"S": "second"}},
+                "ConditionExpression": "#value = :expected"
+                " AND (attribute_not_exists(expires_at) OR expires_at > :now)",
+                "ExpressionAttributeNames": {"#value": "value"},
+                "ExpressionAttributeValues": {
+                    ":expected": {"S": "first"},
+                    ":now": {"N": "1700000000"},
+                },
+            },
+        )
+        assert not store.put_if_equal("key", "second", "first")
+        stubber.assert_no_pending_responses()
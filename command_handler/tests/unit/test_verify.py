@@ -167,3 +167,41 @@ def test_get_verified_wrong_signature():
     # Should be wrapped in BadRequest
     with pytest.raises(BadRequest):
         get_verified(event, verify_key, DummyModel)
+
+
+def test_deserialize_request_ignores_bulky_fields():
+    json_text: str = json.dumps(
+        {
+            **REQUEST_BE_START,
+            "member": {"roles": [ID_0000000000000000000] * 100, "user": {}},
+            "guild": {"features": [], "id": ID_3333333333333333333},
+            "channel": {"id": ID_2222222222222222222, "name": "dummy"},
+        }
+    )
+    body: InteractionRequestBody = deserialize(json_text, InteractionRequestBody)
+    assert body.model_dump(exclude_none=True).keys() == {
+        "id",
+        "application_id",
+        "channel_id",
+        "guild_id",
+        "data",
+        "type",
+    }
+    assert body.model_extra is None
+
+
+def test_get_verified_timestamp_out_of_window():
+    body: str = DUMMY_MODEL.model_dump_json()
+    timestamp = "1234567890"
+    signature = signing_key.sign(f"{timestamp}{body}".encode()).signature.hex()
+    event: dict[str, Any] = {
+        "headers": {
+            "x-signature-ed25519": signature,
+            "x-signature-timestamp": timestamp,
+        },
+        "body": body,
+    }
+
+    # Signed, but far older than the allowed window
+    with pytest.raises(BadRequest):
+        get_verified(event, verify_key, DummyModel, max_age=300)
@@ -1,55 +1,148 @@
-from typing import Callable, Optional
+from typing import Any, Callable, Optional
 from os import environ
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from discord_typings import ApplicationCommandPayload
 from typeguard import typechecked
 
 import requests
+import hashlib
 import json
 import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "command_handler" / "src"))
+from commands import registry  # noqa: E402
 
 DISCORD_BOT_TOKEN = environ["DISCORD_BOT_TOKEN"]
-GUILD_ID = environ["GUILD_ID"]
+GUILD_ID = environ.get("GUILD_ID", "")
 APPLICATION_ID = environ["APPLICATION_ID"]
-base_url = f"https://discord.com/api/v10/applications/{APPLICATION_ID}/guilds/{GUILD_ID}/commands"
+DISCORD_API_BASE_URL = environ.get(
+    "DISCORD_API_BASE_URL", "https://discord.com/api/v10"
+)
+MAX_WORKERS = int(environ.get("MAX_WORKERS", "4"))
+MAX_RETRIES = 5
+# Subcommands that act on the guild of GUILD_ID
+GUILD_COMMANDS = ("list", "get", "register", "sync", "delete")
+
+
+def commands_url(guild_id: str) -> str:
+    return f"{DISCORD_API_BASE_URL}/applications/{APPLICATION_ID}/guilds/{guild_id}/commands"
+
+
+base_url = commands_url(GUILD_ID)
 headers = {
     "Authorization": f"Bot {DISCORD_BOT_TOKEN}",
     "Content-Type": "application/json",
 }
 
-# modify this dictionary to change the command
-commands: ApplicationCommandPayload = {
-    "type": 1,
-    "name": "be",
-    "description": "BEサーバの起動や確認",
-    "options": [
-        {
-            "type": 3,
-            "name": "action",
-            "description": "開始(start)・停止(stop)・状態確認(status)",
-            "required": True,
-            "choices": [
-                {"name": "start", "value": "start"},
-                {"name": "stop", "value": "stop"},
-                {"name": "status", "value": "status"},
-            ],
-        },
-    ],
-}
+# One keep-alive connection pool for every request of a run.
+session = requests.Session()
+session.headers.update(headers)
+session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS))
+session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS))
+
+
+class RateLimiter:
+    """Sends requests while honouring Discord's rate limits.
+
+    Buckets are learned from the X-RateLimit-* headers. A request waits while its
+    bucket (per guild) is exhausted, and 429 responses are retried after
+    retry_after with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        max_retries: int = MAX_RETRIES,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.session = session
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self.clock = clock
+        self._lock = Lock()
+        self._route_buckets: dict[str, str] = {}
+        self._resume_at: dict[str, float] = {}
+        self._global_resume_at = 0.0
+
+    def _bucket_key(self, route: str, major: str) -> str:
+        return f"{self._route_buckets.get(route, route)}:{major}"
+
+    def _wait(self, route: str, major: str) -> None:
+        with self._lock:
+            resume_at = max(
+                self._global_resume_at,
+                self._resume_at.get(self._bucket_key(route, major), 0.0),
+            )
+        delay = resume_at - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+    def _update(self, route: str, major: str, res: requests.Response) -> None:
+        bucket = res.headers.get("X-RateLimit-Bucket")
+        remaining = res.headers.get("X-RateLimit-Remaining")
+        reset_after = res.headers.get("X-RateLimit-Reset-After")
+        with self._lock:
+            if bucket:
+                self._route_buckets[route] = bucket
+            if remaining == "0" and reset_after:
+                self._resume_at[self._bucket_key(route, major)] = self.clock() + float(
+                    reset_after
+                )
+
+    def request(
+        self, method: str, url: str, major: str = "", **kwargs: Any
+    ) -> requests.Response:
+        route = f"{method} {url.split('?')[0]}"
+        attempt = 0
+        while True:
+            self._wait(route, major)
+            res = self.session.request(method, url, **kwargs)
+            self._update(route, major, res)
+            if res.status_code != 429 or attempt >= self.max_retries:
+                return res
+            body = res.json() if res.content else {}
+            retry_after = float(
+                body.get("retry_after") or res.headers.get("Retry-After") or 1
+            )
+            delay = retry_after * 2**attempt
+            if body.get("global") or res.headers.get("X-RateLimit-Global"):
+                with self._lock:
+                    self._global_resume_at = self.clock() + delay
+            print(f"Rate limited on {route}, retrying in {delay:.2f}s")
+            self.sleep(delay)
+            attempt += 1
+
+
+limiter = RateLimiter(session)
+
+# Commands are declared in command_handler/src/commands.py
+commands: list[ApplicationCommandPayload] = registry.payloads()  # type: ignore
 
 
 @typechecked
 def list_commands() -> requests.Response:
-    return requests.get(base_url, headers=headers)
+    return limiter.request("GET", base_url, major=GUILD_ID)
 
 
 @typechecked
 def get_command(command_id: str):
-    return requests.get(f"{base_url}/{command_id}", headers=headers)
+    return limiter.request("GET", f"{base_url}/{command_id}", major=GUILD_ID)
 
 
 @typechecked
 def register_command() -> requests.Response:
-    return requests.post(base_url, headers=headers, data=json.dumps(commands))
+    res = requests.Response()
+    for command in commands:
+        res = limiter.request(
+            "POST", base_url, major=GUILD_ID, data=json.dumps(command)
+        )
+        if not res.ok:
+            break
+    return res
 
 
 # @typechecked
@@ -61,15 +154,123 @@ def register_command() -> requests.Response:
 
 @typechecked
 def delete_command(command_id: str) -> requests.Response:
-    return requests.delete(f"{base_url}/{command_id}", headers=headers)
+    return limiter.request("DELETE", f"{base_url}/{command_id}", major=GUILD_ID)
+
+
+# Keys of a command (and its options) that are compared when syncing.
+# Discord adds ids, versions, localizations etc. to the commands it returns.
+COMMAND_KEYS = ("type", "name", "description", "options")
+OPTION_KEYS = (
+    "type",
+    "name",
+    "description",
+    "required",
+    "autocomplete",
+    "choices",
+    "options",
+)
+CHOICE_KEYS = ("name", "value")
+
+
+def normalize_option(option: dict[str, Any]) -> dict[str, Any]:
+    normalized: dict[str, Any] = {k: option[k] for k in OPTION_KEYS if k in option}
+    # Discord omits "required" and "autocomplete" when they are false.
+    normalized["required"] = bool(option.get("required", False))
+    normalized["autocomplete"] = bool(option.get("autocomplete", False))
+    if "choices" in option:
+        normalized["choices"] = [
+            {k: c[k] for k in CHOICE_KEYS} for c in option["choices"]
+        ]
+    if "options" in option:
+        normalized["options"] = [normalize_option(o) for o in option["options"]]
+    return normalized
+
+
+def normalize_command(command: dict[str, Any]) -> dict[str, Any]:
+    normalized: dict[str, Any] = {k: command[k] for k in COMMAND_KEYS if k in command}
+    normalized.setdefault("type", 1)
+    normalized["options"] = [normalize_option(o) for o in command.get("options", [])]
+    return normalized
+
+
+def command_hash(command: dict[str, Any]) -> str:
+    canonical = json.dumps(normalize_command(command), sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def diff_commands(
+    local: list[dict[str, Any]], remote: list[dict[str, Any]]
+) -> dict[str, list[str]]:
+    """Compare local and remote definitions by name and hash."""
+    local_hashes = {c["name"]: command_hash(c) for c in local}
+    remote_hashes = {c["name"]: command_hash(c) for c in remote}
+    return {
+        "added": [n for n in local_hashes if n not in remote_hashes],
+        "changed": [
+            n
+            for n, h in local_hashes.items()
+            if n in remote_hashes and remote_hashes[n] != h
+        ],
+        "removed": [n for n in remote_hashes if n not in local_hashes],
+    }
+
+
+def sync_guild(
+    guild_id: str,
+) -> tuple[dict[str, list[str]], Optional[requests.Response]]:
+    """Overwrite the commands of one guild in bulk, only if they differ.
+
+    The response is None when the remote commands are already up to date.
+    """
+    url = commands_url(guild_id)
+    res = limiter.request("GET", url, major=guild_id)
+    res.raise_for_status()
+    diff = diff_commands(commands, res.json())  # type: ignore
+    if not any(diff.values()):
+        return diff, None
+    return diff, limiter.request("PUT", url, major=guild_id, data=json.dumps(commands))
+
+
+@typechecked
+def sync_commands() -> Optional[requests.Response]:
+    """Sync the commands of GUILD_ID."""
+    diff, res = sync_guild(GUILD_ID)
+    if res is None:
+        print("Commands are up to date")
+        return None
+    print(json.dumps(diff))
+    return res
+
+
+def sync_guild_result(guild_id: str) -> str:
+    try:
+        diff, res = sync_guild(guild_id)
+    except requests.RequestException as e:
+        return f"failed: {e}"
+    if res is None:
+        return "up to date"
+    if not res.ok:
+        return f"failed: {res.status_code}"
+    return f"updated {json.dumps(diff)}"
+
+
+def sync_all_guilds(
+    guild_ids: list[str], max_workers: int = MAX_WORKERS
+) -> dict[str, str]:
+    """Sync many guilds concurrently. Return a result per guild id."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(sync_guild_result, guild_ids)
+        return dict(zip(guild_ids, results))
 
 
 def execute(
-    command: Callable[..., requests.Response],
+    command: Callable[..., Optional[requests.Response]],
     command_id: Optional[str] = None,
 ):
     try:
         res = command(command_id) if command_id else command()
+        if res is None:
+            return
         print(res.status_code)
         if res.content:
             print(json.dumps(res.json(), indent=2))
@@ -81,6 +282,9 @@ def main():
 
     command = sys.argv[1]
     command_id = sys.argv[2] if len(sys.argv) > 2 else None
+    if command in GUILD_COMMANDS and not GUILD_ID:
+        # Otherwise the requests go to .../guilds//commands.
+        sys.exit(f"GUILD_ID is required for {command}")
 
     if command == "list":
         execute(list_commands)
@@ -88,6 +292,17 @@ def main():
         execute(get_command, command_id)
     elif command == "register":
         execute(register_command)
+    elif command == "sync":
+        execute(sync_commands)
+    elif command == "sync-all":
+        # Comma separated guild ids, or GUILD_IDS from the environment
+        guild_ids = (command_id or environ.get("GUILD_IDS", "")).split(",")
+        guild_ids = [g.strip() for g in guild_ids if g.strip()]
+        if not guild_ids:
+            sys.exit("Guild ids are required for sync-all (argument or GUILD_IDS)")
+        results = sync_all_guilds(guild_ids)
+        for guild_id, result in results.items():
+            print(f"{guild_id}: {result}")
     # Not implemented for guild command. Use register instead.
     # elif command == "update":
     #     execute(update_command, command_id)